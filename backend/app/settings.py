@@ -2,6 +2,7 @@ import os
 from pathlib import Path
 
 import environ
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 env = environ.Env()
@@ -39,12 +40,17 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "django_extended.metrics.MetricsMiddleware",
+    "django_extended.timing.ServerTimingMiddleware",
+    "django_extended.query_budget.QueryBudgetMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "django_extended.db_router.ReplicaRoutingMiddleware",
+    "wallets.loaders.WalletLoaderMiddleware",
 ]
 
 ROOT_URLCONF = "app.urls"
@@ -67,6 +73,22 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "app.wsgi.application"
 
+# Redis
+REDIS_HOST = env.str("REDIS_HOST", "0.0.0.0")
+REDIS_PORT = env.str("REDIS_PORT", "6379")
+
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# Shared by all the workers; an empty REDIS_CACHE_URL falls back to a per-process cache
+REDIS_CACHE_URL = env.str("REDIS_CACHE_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/1")
+CACHES = {
+    "default": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": REDIS_CACHE_URL}
+        if REDIS_CACHE_URL
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
@@ -80,6 +102,22 @@ DATABASES = {
         "PORT": os.getenv("POSTGRES_PORT"),
     }
 }
+# Read replicas as "host[:port]" items, each one becomes the database alias replica_<n>.
+# The reads of the REPLICA_APPS models in GET requests go to a replica, unless the user wrote
+# within the last DATABASE_PRIMARY_PIN_SECONDS.
+REPLICA_DATABASES = []
+for index, address in enumerate(env.list("POSTGRES_REPLICAS", default=[])):
+    host, _, port = address.partition(":")
+    DATABASES[f"replica_{index}"] = {
+        **DATABASES["default"],
+        "HOST": host,
+        "PORT": port or DATABASES["default"]["PORT"],
+        "TEST": {"MIRROR": "default"},
+    }
+    REPLICA_DATABASES.append(f"replica_{index}")
+REPLICA_APPS = {"wallets"}
+DATABASE_PRIMARY_PIN_SECONDS = env.int("DATABASE_PRIMARY_PIN_SECONDS", 5)
+DATABASE_ROUTERS = ["django_extended.db_router.PrimaryReplicaRouter"]
 
 
 # Password validation
@@ -124,14 +162,96 @@ STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# The API renders and parses JSON with orjson, or with the standard library if API_ORJSON_ENABLED is off.
+# MessagePack is chosen by the clients with the application/msgpack Accept and Content-Type headers.
+API_ORJSON_ENABLED = env.bool("API_ORJSON_ENABLED", True)
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.BasicAuthentication",
-    ]
+        "users.authentication.AccessTokenAuthentication",
+        "users.authentication.BasicAuthentication",
+    ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "django_extended.renderers.ORJSONRenderer" if API_ORJSON_ENABLED else "rest_framework.renderers.JSONRenderer",
+        "django_extended.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "django_extended.parsers.ORJSONParser" if API_ORJSON_ENABLED else "rest_framework.parsers.JSONParser",
+        "django_extended.parsers.MessagePackParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
 }
+# Lifetime of the access tokens issued by the login, and cache of the users they authenticate: the user rows
+# are kept in the shared cache and, for AUTH_USER_CACHE_LOCAL_TTL seconds, in each process.
+ACCESS_TOKEN_TTL = env.int("ACCESS_TOKEN_TTL", 60 * 60)
+AUTH_USER_CACHE_TTL = env.int("AUTH_USER_CACHE_TTL", 5 * 60)
+AUTH_USER_CACHE_LOCAL_TTL = env.float("AUTH_USER_CACHE_LOCAL_TTL", 5.0)
+AUTH_USER_CACHE_LOCAL_SIZE = env.int("AUTH_USER_CACHE_LOCAL_SIZE", 1000)
+# Requests allowed per sliding window of each scope ("<number>/<s|min|hour|day>", empty for no limit):
+# login and registration per client IP, transaction creation per user and per sending wallet.
+# The counters are kept per process ("memory") or shared in Redis ("redis") by the cluster.
+THROTTLE_RATES = {
+    "login": env.str("THROTTLE_LOGIN_RATE", "10/min"),
+    "register": env.str("THROTTLE_REGISTER_RATE", "5/min"),
+    "transactions": env.str("THROTTLE_TRANSACTIONS_RATE", "600/min"),
+    "wallet_transactions": env.str("THROTTLE_WALLET_TRANSACTIONS_RATE", "120/min"),
+}
+THROTTLE_BACKEND = env.str("THROTTLE_BACKEND", "memory")
+THROTTLE_REDIS_URL = env.str("THROTTLE_REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/2")
+THROTTLE_MEMORY_MAX_KEYS = env.int("THROTTLE_MEMORY_MAX_KEYS", 100000)
+# Keyset pagination of the wallet and transaction lists: default and maximum ?limit=
+API_PAGE_SIZE = env.int("API_PAGE_SIZE", 100)
+API_MAX_PAGE_SIZE = env.int("API_MAX_PAGE_SIZE", 1000)
+# The wallet and transaction lists are built from values_list rows instead of serializing model instances
+API_VALUES_LISTS_ENABLED = env.bool("API_VALUES_LISTS_ENABLED", True)
+# Queries counted per request: views running more than their ``query_budget`` (or the default one)
+# or the same query as many times as the duplicates threshold are logged as warnings
+QUERY_BUDGET_ENABLED = env.bool("QUERY_BUDGET_ENABLED", True)
+QUERY_BUDGET_DEFAULT = env.int("QUERY_BUDGET_DEFAULT", 20)
+QUERY_BUDGET_DUPLICATES_THRESHOLD = env.int("QUERY_BUDGET_DUPLICATES_THRESHOLD", 5)
+# Share of the requests whose phases are timed in a Server-Timing header and a log line (0 to 1)
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", 0.01)
+# Bearer token required by the /metrics endpoint (empty leaves it open, for a port only Prometheus reaches)
+METRICS_TOKEN = env.str("METRICS_TOKEN", "")
 
 AUTH_USER_MODEL = "users.User"
 
+# Wallets ledger: balances are computed from append-only ledger entries instead of Wallet.balance
+WALLETS_LEDGER_ENABLED = env.bool("WALLETS_LEDGER_ENABLED", False)
+WALLETS_TRANSACTION_BATCH_MAX_SIZE = env.int("WALLETS_TRANSACTION_BATCH_MAX_SIZE", 5000)
+# Monthly statements: directory of the statement files and wallets per file, each file written by a Celery task
+WALLETS_STATEMENTS_DIR = env.str("WALLETS_STATEMENTS_DIR", os.path.join(BASE_DIR, "statements"))
+WALLETS_STATEMENT_CHUNK_SIZE = env.int("WALLETS_STATEMENT_CHUNK_SIZE", 1000)
+# Balance reconciliation: wallets per range of ids, each checked by a Celery task or a worker process, and seconds
+# the changes of the wallets are checked again before the start of the last run
+WALLETS_RECONCILIATION_CHUNK_SIZE = env.int("WALLETS_RECONCILIATION_CHUNK_SIZE", 10000)
+WALLETS_RECONCILIATION_OVERLAP = env.int("WALLETS_RECONCILIATION_OVERLAP", 10 * 60)
+# Rows each daily summary is split over: a transaction updates one of them at random, so the concurrent transactions
+# of a wallet do not queue on the lock of a single row
+WALLETS_SUMMARY_SHARDS = env.int("WALLETS_SUMMARY_SHARDS", 4)
+# Days of the /wallets/analytics/ totals by default and at most
+WALLETS_ANALYTICS_DEFAULT_DAYS = env.int("WALLETS_ANALYTICS_DEFAULT_DAYS", 30)
+WALLETS_ANALYTICS_MAX_DAYS = env.int("WALLETS_ANALYTICS_MAX_DAYS", 366)
+# Rows read from the server-side cursor and rendered at a time by the transaction exports
+WALLETS_EXPORT_CHUNK_SIZE = env.int("WALLETS_EXPORT_CHUNK_SIZE", 2000)
+# Monthly partitions of the transactions: months created ahead, months kept attached (0 keeps all of them)
+# and directory the detached partitions are archived to (empty keeps them as standalone tables)
+WALLETS_TRANSACTION_PARTITIONS_AHEAD = env.int("WALLETS_TRANSACTION_PARTITIONS_AHEAD", 3)
+WALLETS_TRANSACTION_RETENTION_MONTHS = env.int("WALLETS_TRANSACTION_RETENTION_MONTHS", 0)
+WALLETS_TRANSACTION_ARCHIVE_DIR = env.str("WALLETS_TRANSACTION_ARCHIVE_DIR", "")
+
+# Idempotency-Key handling of the transaction creation
+IDEMPOTENCY_KEY_TTL = env.int("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60)
+IDEMPOTENCY_LOCAL_CACHE_SIZE = env.int("IDEMPOTENCY_LOCAL_CACHE_SIZE", 10000)
+
+# Balances served from the cache: the shared cache entries are replaced after each balance change, and the
+# in-process copies, kept up to BALANCE_CACHE_LOCAL_TTL seconds, are used while their version is the shared one.
+BALANCE_CACHE_ENABLED = env.bool("BALANCE_CACHE_ENABLED", True)
+BALANCE_CACHE_TTL = env.int("BALANCE_CACHE_TTL", 5 * 60)
+BALANCE_CACHE_LOCAL_TTL = env.float("BALANCE_CACHE_LOCAL_TTL", 1.0)
+BALANCE_CACHE_LOCAL_SIZE = env.int("BALANCE_CACHE_LOCAL_SIZE", 10000)
+
 # SMTP
 EMAIL_USE_TLS = True
 EMAIL_HOST = "smtp.gmail.com"
@@ -142,11 +262,31 @@ EMAIL_PORT = 587
 # Celery run
 CELERY_RUN = env.bool("CELERY_RUN", False)
 
-REDIS_HOST = "0.0.0.0"
-REDIS_PORT = "6379"
 CELERY_BROKER_URL = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
 CELERY_BROKER_TRANSPORT_OPTIONS = {"visibility_timeout": 3600}
 CELERY_RESULT_BACKEND = f"redis://{REDIS_HOST}:{REDIS_PORT}/0"
 CELERY_ACCEPT_CONTENT = ["application/json"]
 CELERY_TASK_SERIALIZER = "json"
 CELERY_RESULT_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    "snapshot-wallet-balances": {
+        "task": "wallets.tasks.snapshot_wallet_balances",
+        "schedule": env.int("WALLETS_LEDGER_SNAPSHOT_INTERVAL", 300),
+    },
+    "purge-idempotency-keys": {
+        "task": "wallets.tasks.purge_idempotency_keys",
+        "schedule": env.int("IDEMPOTENCY_PURGE_INTERVAL", 60 * 60),
+    },
+    "maintain-transaction-partitions": {
+        "task": "wallets.tasks.maintain_transaction_partitions",
+        "schedule": 24 * 60 * 60,
+    },
+    "generate-monthly-statements": {
+        "task": "wallets.tasks.generate_monthly_statements",
+        "schedule": crontab(minute=0, hour=1, day_of_month=1),
+    },
+    "reconcile-wallet-balances": {
+        "task": "wallets.tasks.reconcile_wallet_balances",
+        "schedule": env.int("WALLETS_RECONCILIATION_INTERVAL", 60 * 60),
+    },
+}
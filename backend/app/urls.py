@@ -1,15 +1,18 @@
 from django.contrib import admin
 from django.urls import include, path
+from django_extended.metrics import metrics_view
 from django_extended.swagger_view import schema_view
 
 api = [
     path("users/", include("users.urls")),
     path("wallets/", include("wallets.urls")),
+    path("async/wallets/", include("wallets.async_urls")),
 ]
 
 urlpatterns = [
     path("api/", include(api)),
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view, name="metrics"),
 ]
 
 urlpatterns += [
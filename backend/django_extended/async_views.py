@@ -0,0 +1,80 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+
+class AsyncAPIView(View):
+    """
+    Async counterpart of a DRF ``APIView`` for the endpoints served under ASGI.
+
+    Requests are authenticated by the API's DRF authentication classes and parsed by its
+    parsers, and the handlers return DRF ``Response`` objects rendered with the API's
+    renderer negotiated from the Accept header, so the responses are the same as those
+    of the sync views. The browsable API is not served. The handlers must be coroutines.
+    """
+
+    authentication_classes = api_settings.DEFAULT_AUTHENTICATION_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+    renderer_classes = [renderer for renderer in api_settings.DEFAULT_RENDERER_CLASSES if renderer.format != "api"]
+    throttle_classes: tuple = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        view = super().as_view(**initkwargs)
+        # Authentication is not session based, as for the DRF views.
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request: HttpRequest, *args, **kwargs):
+        authenticators = [authentication() for authentication in self.authentication_classes]
+        parsers = [parser() for parser in self.parser_classes]
+        drf_request = Request(request, parsers=parsers, authenticators=authenticators)
+        renderers = [renderer() for renderer in self.renderer_classes]
+        self.accepted_renderer, self.accepted_media_type = renderers[0], renderers[0].media_type
+        try:
+            self.accepted_renderer, self.accepted_media_type = DefaultContentNegotiation().select_renderer(
+                drf_request, renderers
+            )
+            # Authenticating reads the user from the database, so it runs in the sync thread.
+            user = await sync_to_async(lambda: drf_request.user)()
+            if not user or not user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            if self.throttle_classes:
+                await sync_to_async(self.check_throttles)(drf_request)
+            response = await super().dispatch(drf_request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(drf_request, exc)
+        return self.finalize_response(response)
+
+    def check_throttles(self, request: Request) -> None:
+        """Raise ``Throttled`` with the longest wait if a throttle rejects the request, as the DRF views do."""
+        waits = []
+        for throttle in (throttle_class() for throttle_class in self.throttle_classes):
+            if not throttle.allow_request(request, self):
+                waits.append(throttle.wait())
+        if waits:
+            raise exceptions.Throttled(max((wait for wait in waits if wait is not None), default=None))
+
+    def handle_exception(self, request: Request, exc: Exception) -> Response:
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            auth_header = request.authenticators[0].authenticate_header(request) if request.authenticators else None
+            if auth_header:
+                exc.auth_header = auth_header
+            else:
+                exc.status_code = 403
+        response = exception_handler(exc, {"view": self, "request": request})
+        if response is None:
+            raise exc
+        return response
+
+    def finalize_response(self, response: Response) -> Response:
+        response.accepted_renderer = self.accepted_renderer
+        response.accepted_media_type = self.accepted_media_type
+        response.renderer_context = {"view": self}
+        return response.render()
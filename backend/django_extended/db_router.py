@@ -0,0 +1,119 @@
+import random
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+@dataclass
+class ReplicaRouting:
+    """Routing state of a request that may read from a replica, until its user turns out to be pinned."""
+
+    request: HttpRequest
+    pinned: bool | None = None
+
+
+_routing: ContextVar[ReplicaRouting | None] = ContextVar("replica_routing", default=None)
+
+
+def _pin_key(user_id: int) -> str:
+    return f"db-primary-pin:{user_id}"
+
+
+def pin_user_to_primary(user_id: int) -> None:
+    """Send the reads of the user's requests to the primary for ``DATABASE_PRIMARY_PIN_SECONDS``."""
+    cache.set(_pin_key(user_id), True, timeout=settings.DATABASE_PRIMARY_PIN_SECONDS)
+
+
+def is_user_pinned_to_primary(user_id: int) -> bool:
+    return bool(cache.get(_pin_key(user_id)))
+
+
+@contextmanager
+def primary_reads() -> Iterator[None]:
+    """Send the reads of the block to the primary, in a request that may read from a replica."""
+    token = _routing.set(None)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Send the reads of the ``REPLICA_APPS`` models to a random ``REPLICA_DATABASES`` alias.
+
+    Only the reads of the safe requests marked by ``ReplicaRoutingMiddleware`` are routed to a
+    replica: everything else, including the authentication of the request, reads the primary.
+    A request of a user pinned to the primary after a write reads the primary too. The user is
+    checked at the first routed read, when the API view has authenticated the request.
+    """
+
+    def db_for_read(self, model, **hints) -> str | None:
+        routing = _routing.get()
+        if routing is None or not settings.REPLICA_DATABASES or model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        if routing.pinned is None:
+            user = getattr(routing.request, "user", None)
+            routing.pinned = bool(user and user.is_authenticated and is_user_pinned_to_primary(user.pk))
+        if routing.pinned:
+            return None
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints) -> str | None:
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool | None:
+        # A replica holds the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints) -> bool | None:
+        return db not in settings.REPLICA_DATABASES
+
+
+class ReplicaRoutingMiddleware:
+    """Let the safe requests read from the replicas and pin the user to the primary after an unsafe one."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _routing.set(ReplicaRouting(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            _routing.reset(token)
+        self.pin_after_write(request)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        token = _routing.set(ReplicaRouting(request) if request.method in SAFE_METHODS else None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _routing.reset(token)
+        await sync_to_async(self.pin_after_write)(request)
+        return response
+
+    @staticmethod
+    def pin_after_write(request: HttpRequest) -> None:
+        if request.method in SAFE_METHODS or not settings.REPLICA_DATABASES:
+            return
+        # The API views set the user they authenticated on the Django request.
+        user = getattr(request, "user", None)
+        if user is not None and user.is_authenticated:
+            pin_user_to_primary(user.pk)
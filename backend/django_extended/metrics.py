@@ -0,0 +1,126 @@
+import os
+import time
+from collections.abc import Iterable
+from contextlib import contextmanager
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django.utils.crypto import constant_time_compare
+from django_extended.query_budget import QueryStats, request_queries_counted
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# With PROMETHEUS_MULTIPROC_DIR set, each process writes its samples to its own files in the directory,
+# which the metrics endpoint of any process adds up.
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Latency of the requests.", ["view", "method", "status"])
+DB_QUERIES = Counter("db_queries", "Queries run by the requests.", ["view"])
+DB_QUERY_SECONDS = Counter("db_query_duration_seconds", "Time spent running the queries of the requests.", ["view"])
+TRANSACTIONS = Counter("wallet_transactions", "Committed transactions and cancellations.", ["transaction_type"])
+LOCK_WAIT = Histogram(
+    "wallet_lock_wait_seconds",
+    "Time spent locking the wallet rows and balance shards, mostly waiting for other transactions.",
+    ["mode"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+TASK_DURATION = Histogram("celery_task_duration_seconds", "Duration of the Celery tasks.", ["task", "state"])
+
+# Start times of the tasks running in this process, by task id.
+_task_started: dict[str, float] = {}
+
+
+def get_view_label(request: HttpRequest) -> str:
+    # The paths of unmatched requests would make a series per path.
+    match = request.resolver_match
+    return match.view_name if match and match.view_name else "unmatched"
+
+
+@contextmanager
+def observe_lock_wait(mode: str):
+    """Count the time spent in the block, a locking query, as waiting on ``mode`` locks."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        LOCK_WAIT.labels(mode).observe(time.perf_counter() - started)
+
+
+def count_transactions(transaction_types: Iterable[str]) -> None:
+    for transaction_type in transaction_types:
+        TRANSACTIONS.labels(transaction_type).inc()
+
+
+def observe_request_queries(sender, request: HttpRequest, stats: QueryStats, **kwargs) -> None:
+    view = get_view_label(request)
+    DB_QUERIES.labels(view).inc(stats.count)
+    DB_QUERY_SECONDS.labels(view).inc(stats.duration)
+
+
+request_queries_counted.connect(observe_request_queries)
+
+
+@task_prerun.connect
+def start_task_timer(task_id: str, **kwargs) -> None:
+    _task_started[task_id] = time.perf_counter()
+
+
+@task_postrun.connect
+def observe_task_duration(task_id: str, task, state: str | None = None, **kwargs) -> None:
+    started = _task_started.pop(task_id, None)
+    if started is not None:
+        TASK_DURATION.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """Observe the latency of every request by view, method and status."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        response = self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        started = time.perf_counter()
+        response = await self.get_response(request)
+        self.observe(request, response, time.perf_counter() - started)
+        return response
+
+    @staticmethod
+    def observe(request: HttpRequest, response: HttpResponse, duration: float) -> None:
+        REQUEST_LATENCY.labels(get_view_label(request), request.method, response.status_code).observe(duration)
+
+
+def get_registry() -> CollectorRegistry:
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    """The metrics of all the processes in the Prometheus text format, behind ``METRICS_TOKEN`` when it is set."""
+    if settings.METRICS_TOKEN and not constant_time_compare(
+        request.headers.get("Authorization", ""), f"Bearer {settings.METRICS_TOKEN}"
+    ):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": 'Bearer realm="metrics"'})
+    return HttpResponse(generate_latest(get_registry()), content_type=CONTENT_TYPE_LATEST)
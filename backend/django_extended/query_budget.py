@@ -0,0 +1,160 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import Signal
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Sent after each request counted by ``QueryBudgetMiddleware``, with the ``request``, its ``view`` name and ``stats``.
+request_queries_counted = Signal()
+
+# Lists of placeholders and of value rows, whose length varies between the queries of a pattern.
+PLACEHOLDER_LISTS = re.compile(r"\((?:%s, )*%s\)")
+VALUE_ROWS = re.compile(r"\(\.\.\.\)(?:, \(\.\.\.\))+")
+
+
+def get_query_pattern(sql: str) -> str:
+    """The SQL of a query with its lists of parameters collapsed, the same for every query of an N+1."""
+    return VALUE_ROWS.sub("(...)", PLACEHOLDER_LISTS.sub("(...)", sql))
+
+
+@dataclass
+class QueryStats:
+    """Queries run on all the databases while counting: their number, total duration and repeated patterns."""
+
+    count: int = 0
+    duration: float = 0.0
+    patterns: Counter = field(default_factory=Counter)
+
+    def add(self, sql: str, duration: float) -> None:
+        self.duration += duration
+        self.count += 1
+        self.patterns[get_query_pattern(sql)] += 1
+
+    def get_duplicates(self, threshold: int) -> list[tuple[str, int]]:
+        """The query patterns run at least ``threshold`` times, most repeated first: likely N+1s."""
+        return [(pattern, count) for pattern, count in self.patterns.most_common() if count >= threshold]
+
+
+# The stats of the ``count_queries`` blocks the current context runs in, the innermost last.
+_counting: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper of every connection, adding the query to the stats counted by the current context."""
+    counting = _counting.get()
+    if not counting:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - started
+        for stats in counting:
+            stats.add(sql, duration)
+
+
+def install_query_recorder(connection, **kwargs) -> None:
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+# Each thread has its own connections, such as the threads running the sync code of an ASGI request.
+connection_created.connect(install_query_recorder)
+
+
+@contextmanager
+def count_queries():
+    """
+    Count the queries run on every database by the current thread or task while in the block.
+
+    The wrapper of the connections reports to the stats of the context, which ``sync_to_async``
+    copies: under ASGI the queries of a view, run by a worker thread on its own connections, are
+    counted by the request, and not those of the other requests served by the thread meanwhile.
+    """
+    # The connections opened before the recorder was connected.
+    for connection in connections.all():
+        install_query_recorder(connection)
+    stats = QueryStats()
+    token = _counting.set((*_counting.get(), stats))
+    try:
+        yield stats
+    finally:
+        _counting.reset(token)
+
+
+def get_view_name(request: HttpRequest) -> str:
+    match = request.resolver_match
+    return match.view_name if match and match.view_name else request.path
+
+
+def get_query_budget(request: HttpRequest) -> int:
+    """The ``query_budget`` declared by the view class of the request, or ``QUERY_BUDGET_DEFAULT``."""
+    view = request.resolver_match.func if request.resolver_match else None
+    view_class = getattr(view, "cls", None) or getattr(view, "view_class", None)
+    return getattr(view_class, "query_budget", settings.QUERY_BUDGET_DEFAULT)
+
+
+class QueryBudgetMiddleware:
+    """
+    Count the queries of each request and log the views over their query budget or repeating a query.
+
+    A view declares its budget with a ``query_budget`` class attribute. The queries of a streaming
+    response run while it is sent, after the middleware returned, so those responses are not checked.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_BUDGET_ENABLED:
+            return self.get_response(request)
+        with count_queries() as stats:
+            response = self.get_response(request)
+        self.check(request, response, stats)
+        return response
+
+    async def __acall__(self, request: HttpRequest):
+        if not settings.QUERY_BUDGET_ENABLED:
+            return await self.get_response(request)
+        with count_queries() as stats:
+            response = await self.get_response(request)
+        self.check(request, response, stats)
+        return response
+
+    @staticmethod
+    def check(request: HttpRequest, response: HttpResponse, stats: QueryStats) -> None:
+        if isinstance(response, StreamingHttpResponse):
+            return
+        view = get_view_name(request)
+        request_queries_counted.send(QueryBudgetMiddleware, request=request, view=view, stats=stats)
+        budget = get_query_budget(request)
+        duplicates = stats.get_duplicates(settings.QUERY_BUDGET_DUPLICATES_THRESHOLD)
+        if stats.count > budget:
+            logger.warning(
+                "%s %s ran %d queries in %.1fms, over its budget of %d",
+                request.method,
+                view,
+                stats.count,
+                stats.duration * 1000,
+                budget,
+            )
+        for pattern, count in duplicates:
+            logger.warning("%s %s ran the same query %d times, a likely N+1: %s", request.method, view, count, pattern)
@@ -0,0 +1,97 @@
+import csv
+import decimal
+import io
+
+import msgpack
+import orjson
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+_encoder = JSONEncoder()
+
+
+def encode_default(obj):
+    """Encode the types the fast serializers do not know as the DRF JSON encoder does, but decimals exactly."""
+    if isinstance(obj, decimal.Decimal):
+        return str(obj)
+    return _encoder.default(obj)
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer based on orjson, a drop-in replacement of DRF's ``JSONRenderer``.
+
+    The output is the compact, UTF-8 JSON of ``JSONRenderer`` with ``UNICODE_JSON`` and ``COMPACT_JSON``,
+    except for ``Decimal`` values, which are rendered exactly as strings instead of floats, as the
+    ``DecimalField`` of the serializers already does. ``; indent=<n>`` in the Accept header indents by 2.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+    options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        options = self.options
+        if accepted_media_type and "indent=" in accepted_media_type:
+            options |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=encode_default, option=options)
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack renderer of the ``Accept: application/msgpack`` responses, with exact decimals as strings."""
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        return msgpack.packb(data, default=encode_default, datetime=False)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """Newline-delimited JSON: one line per item of a list, decimals exact as in ``ORJSONRenderer``."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+    options = ORJSONRenderer.options | orjson.OPT_APPEND_NEWLINE
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if data is None:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        return b"".join(orjson.dumps(item, default=encode_default, option=self.options) for item in items)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    CSV of a list of flat dicts, with a header row of the keys of the first one unless the renderer
+    context sets ``header`` to False. Values are written as in the JSON responses, ``None`` as an empty cell.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None) -> bytes:
+        if not data:
+            return b""
+        items = data if isinstance(data, list) else [data]
+        output = io.StringIO()
+        writer = csv.writer(output)
+        if (renderer_context or {}).get("header", True):
+            writer.writerow(items[0].keys())
+        for item in items:
+            writer.writerow(
+                [
+                    "" if value is None else value if isinstance(value, str | int | float) else encode_default(value)
+                    for value in item.values()
+                ]
+            )
+        return output.getvalue().encode()
@@ -0,0 +1,85 @@
+import decimal
+from collections.abc import Callable, Iterable, Sequence
+from functools import cached_property
+from operator import attrgetter
+from typing import Any
+
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+
+def _compile_decimal(field: serializers.DecimalField) -> Callable[[Any], Any] | None:
+    coerce_to_string = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce_to_string or field.localize or getattr(field, "normalize_output", False):
+        return None
+    if field.decimal_places is None:
+        return "{:f}".format
+    quantum = decimal.Decimal(".1") ** field.decimal_places
+    rounding = field.rounding
+    context = decimal.getcontext().copy()
+    if field.max_digits is not None:
+        context.prec = field.max_digits
+    return lambda value: f"{value.quantize(quantum, rounding=rounding, context=context):f}"
+
+
+def _compile_choice(field: serializers.ChoiceField) -> Callable[[Any], Any]:
+    values = field.choice_strings_to_values
+    return lambda value: values.get(str(value), value)
+
+
+def compile_converter(field: serializers.Field) -> Callable[[Any], Any]:
+    """Return a function representing the values of ``field`` as its ``to_representation`` does, minus the checks."""
+    converter = None
+    if isinstance(field, serializers.DecimalField):
+        converter = _compile_decimal(field)
+    elif isinstance(field, serializers.ChoiceField):
+        converter = _compile_choice(field)
+    elif isinstance(field, serializers.UUIDField):
+        converter = str if field.uuid_format == "hex_verbose" else None
+    elif isinstance(field, serializers.IntegerField):
+        converter = int
+    elif type(field) is serializers.CharField:
+        converter = str
+    return converter or field.to_representation
+
+
+class ValuesRepresentation:
+    """
+    Representation of ``values_list(named=True)`` rows as returned by the list of a serializer.
+
+    The fields of the serializer are read once: each one becomes the ORM lookup of its source
+    and a converter compiled for its type, so a row costs a tuple and a function call per field
+    instead of a model instance and a tree of fields. The output is the same as the one of the
+    serializer, key order included. Only fields with a plain or dotted ``source`` are supported.
+    """
+
+    def __init__(self, serializer_class: type[serializers.Serializer]):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def fields(self) -> list[tuple[str, str, Callable[[Any], Any]]]:
+        fields = []
+        for name, field in self.serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if field.source == "*" or isinstance(field, serializers.BaseSerializer):
+                raise ValueError(f"{self.serializer_class.__name__}.{name} cannot be read from a values row.")
+            fields.append((name, field.source.replace(".", "__"), compile_converter(field)))
+        return fields
+
+    def get_lookups(self, *extra_lookups: str) -> list[str]:
+        """Lookups to pass to ``values_list``: those of the fields, then ``extra_lookups`` not already in them."""
+        return list(dict.fromkeys([lookup for _, lookup, _ in self.fields] + list(extra_lookups)))
+
+    def to_representation(self, rows: Iterable[Sequence[Any]], **getters: Callable[[Any], Any]) -> list[dict[str, Any]]:
+        """
+        Represent the rows, read with the ``get_lookups`` of this representation.
+
+        ``getters`` replace the value of a field by the one computed from the row, such as a
+        balance that is not the column of the row.
+        """
+        fields = [(name, getters.get(name) or attrgetter(lookup), convert) for name, lookup, convert in self.fields]
+        return [
+            {name: None if (value := get(row)) is None else convert(value) for name, get, convert in fields}
+            for row in rows
+        ]
@@ -0,0 +1,182 @@
+import functools
+import threading
+import time
+from collections.abc import Iterable
+
+import redis
+from django.conf import settings
+from django_extended.cache import LRUCache
+from rest_framework.request import Request
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 60 * 60, "d": 24 * 60 * 60}
+# The wait of a request rejected right at the limit, which a zero wait would allow.
+MIN_WAIT = 0.001
+
+
+def parse_rate(rate: str) -> tuple[int, int]:
+    """Parse a DRF rate such as ``"10/min"`` into the number of requests and the period in seconds."""
+    limit, period = rate.split("/")
+    return int(limit), PERIODS[period[0]]
+
+
+def get_window_estimate(previous: int, current: int, period: int, now: float) -> float:
+    """
+    Requests counted over the last ``period`` seconds by a sliding window.
+
+    The requests of the previous fixed window are weighted by the part of it the sliding window still covers.
+    """
+    return previous * (1 - (now % period) / period) + current
+
+
+def get_wait(previous: int, current: int, limit: int, period: int, now: float) -> float:
+    """Seconds until the sliding window estimate falls below ``limit``, always positive for a rejected request."""
+    elapsed = now % period
+    if current < limit and previous:
+        # The previous window slides out first.
+        wait = period * (1 - (limit - current) / previous) - elapsed
+    else:
+        # The current window becomes the previous one.
+        wait = period - elapsed + (period * (1 - limit / current) if current else 0.0)
+    return max(wait, MIN_WAIT)
+
+
+class ThrottleBackend:
+    """Counters of the requests of each throttle key over a sliding window."""
+
+    def hit(self, key: str, limit: int, period: int) -> float:
+        """Count a request of ``key``, unless ``limit`` requests were counted over the last ``period`` seconds.
+
+        Returns ``0`` if the request is allowed, or the seconds to wait before the next one is.
+        """
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Counters of this process, for the deployments with a single process. The least recent keys are evicted."""
+
+    def __init__(self, maxsize: int):
+        self._counters = LRUCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, period: int) -> float:
+        now = time.time()
+        window = int(now // period)
+        with self._lock:
+            counted_window, previous, current = self._counters.get(key, (window, 0, 0))
+            if counted_window != window:
+                previous = current if counted_window == window - 1 else 0
+                current = 0
+            if get_window_estimate(previous, current, period, now) >= limit:
+                self._counters.set(key, (window, previous, current), ttl=2 * period)
+                return get_wait(previous, current, limit, period, now)
+            self._counters.set(key, (window, previous, current + 1), ttl=2 * period)
+        return 0.0
+
+    def clear(self) -> None:
+        self._counters.clear()
+
+
+class RedisThrottleBackend(ThrottleBackend):
+    """
+    Counters shared by the processes of a cluster, one Redis key per key and fixed window.
+
+    An allowed request costs one round trip, which increments the current window and reads
+    the previous one. A rejected request is then uncounted with a second round trip.
+    """
+
+    def __init__(self, client: redis.Redis):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisThrottleBackend":
+        return cls(redis.Redis.from_url(url))
+
+    def hit(self, key: str, limit: int, period: int) -> float:
+        now = time.time()
+        window = int(now // period)
+        current_key = f"throttle:{key}:{window}"
+        pipeline = self.client.pipeline(transaction=False)
+        pipeline.incr(current_key)
+        pipeline.expire(current_key, 2 * period)
+        pipeline.get(f"throttle:{key}:{window - 1}")
+        current, _, previous = pipeline.execute()
+        previous = int(previous or 0)
+        # The estimate counts this request: it is allowed if the others were fewer than the limit.
+        if get_window_estimate(previous, current - 1, period, now) >= limit:
+            self.client.decr(current_key)
+            return get_wait(previous, current - 1, limit, period, now)
+        return 0.0
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter("throttle:*"):
+            self.client.delete(key)
+
+
+@functools.cache
+def _create_backend(name: str, redis_url: str) -> ThrottleBackend:
+    if name == "redis":
+        return RedisThrottleBackend.from_url(redis_url)
+    return MemoryThrottleBackend(maxsize=settings.THROTTLE_MEMORY_MAX_KEYS)
+
+
+def get_throttle_backend() -> ThrottleBackend:
+    """The ``THROTTLE_BACKEND`` of the process: ``"memory"`` or ``"redis"`` at ``THROTTLE_REDIS_URL``."""
+    return _create_backend(settings.THROTTLE_BACKEND, settings.THROTTLE_REDIS_URL)
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
+    """
+    Allow ``THROTTLE_RATES[scope]`` requests per key of the request, such as ``"10/min"``, over a sliding window.
+
+    A scope without a rate is not throttled. Each request costs one counter update of the
+    throttle backend, whatever the traffic, so the rejected requests stop before any other work.
+    """
+
+    scope: str = ""
+    # The methods of the requests throttled, or all of them.
+    methods: tuple[str, ...] | None = None
+
+    def get_key(self, request: Request, view) -> str | None:
+        """The key the requests are counted by, or ``None`` for a request that is not throttled."""
+        raise NotImplementedError
+
+    def allow_request(self, request: Request, view) -> bool:
+        self.wait_seconds = None
+        if self.methods is not None and request.method not in self.methods:
+            return True
+        key = self.get_key(request, view)
+        return key is None or self.allow_keys([key])
+
+    def allow_keys(self, keys: Iterable[str]) -> bool:
+        """Count a request of each of the ``keys``, allowed if none of them is over the rate of the scope."""
+        self.wait_seconds = None
+        rate = settings.THROTTLE_RATES.get(self.scope)
+        if not rate:
+            return True
+        limit, period = parse_rate(rate)
+        backend = get_throttle_backend()
+        self.wait_seconds = max((backend.hit(f"{self.scope}:{key}", limit, period) for key in keys), default=0.0)
+        return not self.wait_seconds
+
+    def wait(self) -> float | None:
+        return self.wait_seconds
+
+
+class IPRateThrottle(SlidingWindowRateThrottle):
+    """Throttle the requests per client IP address."""
+
+    def get_key(self, request: Request, view) -> str | None:
+        return f"ip:{self.get_ident(request)}"
+
+
+class UserRateThrottle(SlidingWindowRateThrottle):
+    """Throttle the requests per authenticated user, and the anonymous ones per client IP address."""
+
+    def get_key(self, request: Request, view) -> str | None:
+        if request.user and request.user.is_authenticated:
+            return f"user:{request.user.pk}"
+        return f"ip:{self.get_ident(request)}"
@@ -0,0 +1,118 @@
+import json
+import logging
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse
+from django_extended.query_budget import QueryStats, count_queries, get_view_name
+
+logger = logging.getLogger(__name__)
+
+# Seconds spent in each phase of the request being timed, unset for the requests left out of the sample.
+_timings: ContextVar[defaultdict | None] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def timed(phase: str):
+    """
+    Add the time spent in the block, or in the decorated function, to ``phase`` of the current request.
+
+    Outside of a sampled request only the context variable is read, so the hooks stay in the code.
+    """
+    timings = _timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[phase] += time.perf_counter() - started
+
+
+def get_server_timing(timings: dict[str, float], stats: QueryStats, total: float) -> str:
+    metrics = [f"{phase};dur={duration * 1000:.2f}" for phase, duration in timings.items()]
+    metrics.append(f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} queries"')
+    metrics.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(metrics)
+
+
+class ServerTimingMiddleware:
+    """
+    Time the phases of a sample of the requests, ``SERVER_TIMING_SAMPLE_RATE`` of them.
+
+    The phases are timed by the ``timed`` hooks of the authentication, serializers, services and
+    models, and the rendering of the response here; their queries are timed as ``db``. The times
+    are sent in the ``Server-Timing`` header and logged as one JSON line.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return self.get_response(request)
+        token = _timings.set(defaultdict(float))
+        started = time.perf_counter()
+        try:
+            with count_queries() as stats:
+                response = self.get_response(request)
+            self.add_timings(request, response, stats, time.perf_counter() - started)
+            return response
+        finally:
+            _timings.reset(token)
+
+    async def __acall__(self, request: HttpRequest):
+        if random.random() >= settings.SERVER_TIMING_SAMPLE_RATE:
+            return await self.get_response(request)
+        token = _timings.set(defaultdict(float))
+        started = time.perf_counter()
+        try:
+            with count_queries() as stats:
+                response = await self.get_response(request)
+            self.add_timings(request, response, stats, time.perf_counter() - started)
+            return response
+        finally:
+            _timings.reset(token)
+
+    def process_template_response(self, request: HttpRequest, response: HttpResponse) -> HttpResponse:
+        # The response is rendered right after the template response hooks.
+        timings = _timings.get()
+        if timings is not None:
+            started = time.perf_counter()
+
+            def add_render_timing(rendered: HttpResponse) -> None:
+                timings["render"] += time.perf_counter() - started
+
+            response.add_post_render_callback(add_render_timing)
+        return response
+
+    @staticmethod
+    def add_timings(request: HttpRequest, response: HttpResponse, stats: QueryStats, total: float) -> None:
+        timings = _timings.get()
+        response["Server-Timing"] = get_server_timing(timings, stats, total)
+        logger.info(
+            json.dumps(
+                {
+                    "method": request.method,
+                    "view": get_view_name(request),
+                    "status": response.status_code,
+                    "total_ms": round(total * 1000, 2),
+                    "db_ms": round(stats.duration * 1000, 2),
+                    "queries": stats.count,
+                    **{f"{phase}_ms": round(duration * 1000, 2) for phase, duration in timings.items()},
+                }
+            )
+        )
@@ -0,0 +1,107 @@
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django_extended.cache import LRUCache
+from django_extended.timing import timed
+from rest_framework import authentication, exceptions
+from rest_framework.request import Request
+from users.models import CachedUser, User
+
+ACCESS_TOKEN_SALT = "users.access-token"
+
+# The fields of the users read by the authentication and the permissions: no password hash is cached.
+AUTH_USER_FIELDS = ("id", "role", "is_active", "is_staff", "is_superuser", "token_version")
+
+local_cache = LRUCache(maxsize=settings.AUTH_USER_CACHE_LOCAL_SIZE)
+
+
+def create_access_token(user: User) -> str:
+    """
+    Signed token of the user, valid for ``ACCESS_TOKEN_TTL`` seconds.
+
+    It is revoked before by a change of the password of the user or by ``revoke_access_tokens``.
+    """
+    return signing.dumps({"user_id": user.pk, "version": user.token_version}, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def revoke_access_tokens(user_id: int) -> None:
+    """Reject the access tokens of the user issued so far, once committed."""
+    User.objects.filter(pk=user_id).update(token_version=F("token_version") + 1)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+def _cache_key(user_id: int) -> str:
+    return f"auth-user-fields:{user_id}"
+
+
+def get_cached_user(user_id: int) -> CachedUser | None:
+    """
+    Return the user with its ``AUTH_USER_FIELDS``, read from the database at most once per ``AUTH_USER_CACHE_TTL``.
+
+    The ``CachedUser`` returned is read-only and its other fields cannot be read.
+    ``invalidate_cached_user`` drops the row when the user is saved or deleted. The
+    per-process copies of another process may lag such a change by ``AUTH_USER_CACHE_LOCAL_TTL``.
+    """
+    cache_key = _cache_key(user_id)
+    fields = local_cache.get(cache_key)
+    if fields is None:
+        fields = cache.get(cache_key)
+        if fields is None:
+            fields = User.objects.filter(pk=user_id).values(*AUTH_USER_FIELDS).first()
+            if fields is None:
+                return None
+            cache.set(cache_key, fields, timeout=settings.AUTH_USER_CACHE_TTL)
+        local_cache.set(cache_key, fields, ttl=settings.AUTH_USER_CACHE_LOCAL_TTL)
+    # ``from_db`` takes the values in the order of the fields of the model.
+    names = [field.attname for field in CachedUser._meta.concrete_fields if field.attname in fields]
+    return CachedUser.from_db(None, names, [fields[name] for name in names])
+
+
+def invalidate_cached_user(user_id: int) -> None:
+    cache.delete(_cache_key(user_id))
+    local_cache.delete(_cache_key(user_id))
+
+
+class AccessTokenAuthentication(authentication.BaseAuthentication):
+    """
+    Authenticate the requests with ``Authorization: Bearer <token>`` headers issued by the login.
+
+    The signature of the token is checked with HMAC and the user is read from the user cache,
+    so no password is hashed and the database is usually not queried.
+    """
+
+    keyword = "Bearer"
+
+    @timed("auth")
+    def authenticate(self, request: Request) -> tuple[CachedUser, str] | None:
+        auth = authentication.get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid token header.")
+        token = auth[1].decode(errors="replace")
+        try:
+            payload = signing.loads(token, salt=ACCESS_TOKEN_SALT, max_age=settings.ACCESS_TOKEN_TTL)
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed("Token expired.")
+        except signing.BadSignature:
+            raise exceptions.AuthenticationFailed("Invalid token.")
+        user = get_cached_user(payload["user_id"])
+        if user is None or not user.is_active:
+            raise exceptions.AuthenticationFailed("User inactive or deleted.")
+        if payload.get("version") != user.token_version:
+            raise exceptions.AuthenticationFailed("Token revoked.")
+        return user, token
+
+    def authenticate_header(self, request: Request) -> str:
+        return f'{self.keyword} realm="api"'
+
+
+class BasicAuthentication(authentication.BasicAuthentication):
+    """Basic authentication, with the hashing of the password timed as the ``auth`` phase of the request."""
+
+    @timed("auth")
+    def authenticate(self, request: Request):
+        return super().authenticate(request)
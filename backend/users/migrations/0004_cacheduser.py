@@ -0,0 +1,22 @@
+# Generated by Django 4.2.13 on 2024-06-10 09:30
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0003_user_token_version"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CachedUser",
+            fields=[],
+            options={
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("users.user",),
+        ),
+    ]
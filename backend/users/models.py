@@ -13,6 +13,8 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     role = models.CharField(max_length=25, choices=UserRole.choices, default=UserRole.WALLET_OWNER)
+    # Signed into the access tokens: incrementing it revokes the tokens issued before.
+    token_version = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = "email"
 
@@ -21,6 +23,14 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
     class Meta:
         db_table = "users"
 
+    def save(self, *args, **kwargs) -> None:
+        # Set by ``set_password`` until saved; a hash upgraded by ``check_password`` leaves it unset.
+        if self._password is not None:
+            self.token_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "token_version"}
+        super().save(*args, **kwargs)
+
     def get_wallets_ids(self) -> list[int]:
         return self.wallets.values_list("id", flat=True)
 
@@ -34,3 +44,28 @@ class User(AbstractBaseUser, PermissionsMixin, BaseModel):
 
     def __str__(self) -> models.EmailField:
         return self.email
+
+
+class CachedUser(User):
+    """
+    User rebuilt by the authentication from its cached fields, which holds nothing else.
+
+    It is read-only: saving or deleting it raises, and so does reading a field that was not
+    cached, rather than writing blank fields or querying the database.
+    """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs) -> None:
+        raise TypeError("A cached user is read-only, save the user read from the database instead.")
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("A cached user is read-only, delete the user read from the database instead.")
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs) -> None:
+        # Called by the field descriptors to load a field that was not cached.
+        raise AttributeError(f"The fields {fields or 'all'} of the user {self.pk} are not cached.")
+
+    def __str__(self) -> str:
+        return f"User {self.pk}"
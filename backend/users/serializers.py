@@ -53,4 +53,5 @@ class LoginSerializer(serializers.ModelSerializer):
         return {
             "id": user.id,
             "email": user.email,
+            "user": user,
         }
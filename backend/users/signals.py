@@ -0,0 +1,13 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.authentication import invalidate_cached_user
+from users.models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def drop_cached_user(sender, instance: User, **kwargs) -> None:
+    # A change of the role or of is_active applies to the next request once committed.
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
@@ -0,0 +1,9 @@
+from django_extended.throttling import IPRateThrottle
+
+
+class LoginRateThrottle(IPRateThrottle):
+    scope = "login"
+
+
+class RegisterRateThrottle(IPRateThrottle):
+    scope = "register"
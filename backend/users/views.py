@@ -1,17 +1,25 @@
 from django.conf import settings
 from django.contrib.auth import logout
 from rest_framework import generics, permissions, status
+from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from users.authentication import AccessTokenAuthentication, create_access_token, revoke_access_tokens
 from users.models import User
 from users.serializers import LoginSerializer, RegisterSerializer
 from users.tasks import send_registration_email
-from rest_framework.request import Request
+from users.throttling import LoginRateThrottle, RegisterRateThrottle
 
 
 class RegisterApiView(generics.CreateAPIView):
     serializer_class = RegisterSerializer
     queryset = User.objects.all()
+    throttle_classes = (RegisterRateThrottle,)
+
+    def perform_authentication(self, request: Request) -> None:
+        # The user is not needed: skipping the authentication, the throttle rejects a request before any
+        # password is hashed.
+        pass
 
     def post(self, request: Request, *args, **kwargs) -> Response:
         user = super().post(request, *args, **kwargs)
@@ -24,16 +32,28 @@ class RegisterApiView(generics.CreateAPIView):
 class LoginApiView(generics.GenericAPIView):
     serializer_class = LoginSerializer
     queryset = User.objects.all()
+    throttle_classes = (LoginRateThrottle,)
+
+    def perform_authentication(self, request: Request) -> None:
+        pass
 
     def post(self, request: Request) -> Response:
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        user = serializer.validated_data["user"]
+        data = {
+            **serializer.data,
+            "access_token": create_access_token(user),
+            "token_type": AccessTokenAuthentication.keyword,
+            "expires_in": settings.ACCESS_TOKEN_TTL,
+        }
+        return Response(data, status=status.HTTP_200_OK)
 
 
 class LogoutAPIView(APIView):
     permission_classes = (permissions.IsAuthenticated,)
 
     def post(self, request: Request) -> Response:
+        revoke_access_tokens(request.user.pk)
         logout(request)
         return Response({"success": "Successfully logged out"}, status=status.HTTP_200_OK)
@@ -0,0 +1,20 @@
+from django.urls import path
+from wallets.async_views import (
+    AsyncTransactionCreateAPIView,
+    AsyncWalletsBalanceAPIView,
+    AsyncWalletsListAPIView,
+)
+
+urlpatterns = [
+    path("", AsyncWalletsListAPIView.as_view(), name="async-list-wallets"),
+    path(
+        "<int:pk>/balance/",
+        AsyncWalletsBalanceAPIView.as_view(),
+        name="async-retrieve-wallet-balance",
+    ),
+    path(
+        "transactions/",
+        AsyncTransactionCreateAPIView.as_view(),
+        name="async-create-transactions",
+    ),
+]
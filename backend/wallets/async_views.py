@@ -0,0 +1,82 @@
+from contextlib import nullcontext
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import QuerySet
+from django.http import Http404
+from django_extended.async_views import AsyncAPIView
+from django_extended.db_router import primary_reads
+from django_extended.pagination import KeysetPagination
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from wallets.balance_cache import afill_balance, aget_balance
+from wallets.idempotency import idempotent_response
+from wallets.models import Wallet
+from wallets.serializers.transaction_serialziers import TransactionListCreateSerializer
+from wallets.serializers.wallet_serializers import (
+    WalletsBalanceSerializer,
+    WalletsListCreateSerializer,
+    wallets_list_representation,
+)
+from wallets.services import aget_current_balances, aload_current_balances
+from wallets.throttling import TransactionUserRateThrottle, check_wallet_throttle
+
+
+def get_user_wallets(request: Request) -> QuerySet:
+    user = request.user
+    if user.is_admin:
+        return Wallet.objects.all()
+    return Wallet.objects.filter(owner=user.pk).order_by("id")
+
+
+class AsyncWalletsListAPIView(AsyncAPIView):
+    ordering = ("created_at", "id")
+
+    async def get(self, request: Request) -> Response:
+        paginator = KeysetPagination()
+        if not settings.API_VALUES_LISTS_ENABLED:
+            wallets = await paginator.apaginate_queryset(get_user_wallets(request), request, self)
+            await aload_current_balances(wallets)
+            return paginator.get_paginated_response(WalletsListCreateSerializer(wallets, many=True).data)
+        lookups = wallets_list_representation.get_lookups("shard_count", "created_at")
+        rows = await paginator.apaginate_queryset(
+            get_user_wallets(request).values_list(*lookups, named=True), request, self
+        )
+        balances = await aget_current_balances([(row.id, row.balance, row.shard_count) for row in rows])
+        data = wallets_list_representation.to_representation(rows, balance=lambda row: balances[row.id])
+        return paginator.get_paginated_response(data)
+
+
+class AsyncWalletsBalanceAPIView(AsyncAPIView):
+    async def get(self, request: Request, pk: int) -> Response:
+        cached, version = await aget_balance(pk) if settings.BALANCE_CACHE_ENABLED else (None, None)
+        wallet = cached.get_wallet(request.user) if cached else None
+        if wallet is None:
+            fill = version is not None and cached is None
+            # A balance cached for ``version`` is read from the primary, see ``fill_balance``.
+            with primary_reads() if fill else nullcontext():
+                try:
+                    wallet = await get_user_wallets(request).aget(pk=pk)
+                except Wallet.DoesNotExist:
+                    raise Http404(f"No {Wallet._meta.object_name} matches the given query.")
+                await aload_current_balances([wallet])
+            if fill:
+                await afill_balance(wallet, version)
+        return Response(WalletsBalanceSerializer(wallet).data)
+
+
+class AsyncTransactionCreateAPIView(AsyncAPIView):
+    throttle_classes = (TransactionUserRateThrottle,)
+
+    async def post(self, request: Request) -> Response:
+        # The balance changes run in one database transaction, which the async ORM cannot hold.
+        return await sync_to_async(idempotent_response)(request, partial(self.create, request))
+
+    def create(self, request: Request) -> Response:
+        serializer = TransactionListCreateSerializer(data=request.data, context={"request": request})
+        serializer.is_valid(raise_exception=True)
+        check_wallet_throttle([serializer.validated_data])
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,181 @@
+import threading
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django_extended.cache import LRUCache
+from wallets.models import Wallet
+
+local_cache = LRUCache(maxsize=settings.BALANCE_CACHE_LOCAL_SIZE)
+
+metrics: Counter[str] = Counter()
+_metrics_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CachedBalance:
+    """Balance of a wallet read from the database when the version of its cache entry was ``version``."""
+
+    version: int
+    wallet_id: int
+    owner_id: int
+    balance: Decimal
+
+    def get_wallet(self, user) -> Wallet | None:
+        """The wallet with its cached balance, unless the user may not read it."""
+        if not (user.is_admin or self.owner_id == user.pk):
+            return None
+        wallet = Wallet(id=self.wallet_id, owner_id=self.owner_id, balance=self.balance)
+        wallet._current_balance_loaded = True
+        return wallet
+
+
+def _entry_key(wallet_id: int) -> str:
+    return f"wallet-balance:{wallet_id}"
+
+
+def _version_key(wallet_id: int) -> str:
+    return f"wallet-balance-version:{wallet_id}"
+
+
+def _count(name: str) -> None:
+    with _metrics_lock:
+        metrics[name] += 1
+
+
+def get_metrics() -> dict[str, int | float]:
+    """Hits and misses of the balance cache in this process."""
+    with _metrics_lock:
+        counts = dict(metrics)
+    lookups = counts.get("local_hits", 0) + counts.get("shared_hits", 0) + counts.get("misses", 0)
+    return {
+        "local_hits": counts.get("local_hits", 0),
+        "shared_hits": counts.get("shared_hits", 0),
+        "misses": counts.get("misses", 0),
+        "writes": counts.get("writes", 0),
+        "invalidations": counts.get("invalidations", 0),
+        "hit_ratio": round((lookups - counts.get("misses", 0)) / lookups, 4) if lookups else 0.0,
+    }
+
+
+def _lookup_local(wallet_id: int, version: int) -> CachedBalance | None:
+    entry = local_cache.get(_entry_key(wallet_id))
+    # The copy of another process's change is outdated once that change bumped the shared version.
+    if entry is None or entry.version != version:
+        return None
+    _count("local_hits")
+    return entry
+
+
+def _lookup_shared(wallet_id: int, version: int, entry: CachedBalance | None) -> tuple[CachedBalance | None, int]:
+    # An entry written before the last balance change of the wallet is never used. It is dropped,
+    # as ``fill_balance`` only adds a missing entry.
+    if entry is None or entry.version != version:
+        if entry is not None:
+            cache.delete(_entry_key(wallet_id))
+        _count("misses")
+        return None, version
+    _count("shared_hits")
+    local_cache.set(_entry_key(wallet_id), entry, ttl=settings.BALANCE_CACHE_LOCAL_TTL)
+    return entry, version
+
+
+def get_balance(wallet_id: int) -> tuple[CachedBalance | None, int]:
+    """
+    Return the cached balance of the wallet, or ``None``, and the current version of its entry.
+
+    The version is always read from the shared cache, so the copy kept in the process is only
+    used while no balance change was made since, in any process. On a miss, the balance read
+    from the primary database afterwards is stored with ``fill_balance`` and that version.
+    """
+    version = cache.get(_version_key(wallet_id), 0)
+    entry = _lookup_local(wallet_id, version)
+    if entry is not None:
+        return entry, version
+    return _lookup_shared(wallet_id, version, cache.get(_entry_key(wallet_id)))
+
+
+async def aget_balance(wallet_id: int) -> tuple[CachedBalance | None, int]:
+    version = await cache.aget(_version_key(wallet_id), 0)
+    entry = _lookup_local(wallet_id, version)
+    if entry is not None:
+        return entry, version
+    return _lookup_shared(wallet_id, version, await cache.aget(_entry_key(wallet_id)))
+
+
+def _entry(wallet: Wallet, version: int) -> CachedBalance:
+    return CachedBalance(version=version, wallet_id=wallet.id, owner_id=wallet.owner_id, balance=wallet.balance)
+
+
+def fill_balance(wallet: Wallet, version: int) -> None:
+    """
+    Cache the balance of ``wallet`` read after a miss of ``get_balance`` returned ``version``.
+
+    The balance must be read from the primary: the version is incremented once a change commits,
+    so the primary holds that change, when a lagging replica may not. The entry is only added
+    when missing, so it never replaces the entry written through by a balance change. It only
+    goes to the shared cache: when a balance change raced the read, its version is outdated
+    and the next lookup misses instead of keeping it in the process.
+    """
+    cache.add(_entry_key(wallet.id), _entry(wallet, version), timeout=settings.BALANCE_CACHE_TTL)
+
+
+async def afill_balance(wallet: Wallet, version: int) -> None:
+    await cache.aadd(_entry_key(wallet.id), _entry(wallet, version), timeout=settings.BALANCE_CACHE_TTL)
+
+
+def _bump_version(wallet_id: int) -> int:
+    """Increment the version of the wallet's entry, which invalidates the entries cached before."""
+    key = _version_key(wallet_id)
+    cache.add(key, 0, timeout=None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        # The version was evicted between the two calls.
+        cache.add(key, 1, timeout=None)
+        return cache.incr(key)
+
+
+def _write_through(wallet_ids: set[int]) -> None:
+    # Imported here: the services module writes through this cache.
+    from wallets.services import load_current_balances
+
+    versions = {wallet_id: _bump_version(wallet_id) for wallet_id in wallet_ids}
+    wallets = list(Wallet.objects.filter(id__in=wallet_ids).only("id", "owner_id", "balance", "shard_count"))
+    load_current_balances(wallets)
+    for wallet in wallets:
+        entry = _entry(wallet, versions[wallet.id])
+        cache.set(_entry_key(wallet.id), entry, timeout=settings.BALANCE_CACHE_TTL)
+        local_cache.set(_entry_key(wallet.id), entry, ttl=settings.BALANCE_CACHE_LOCAL_TTL)
+        _count("writes")
+
+
+def _invalidate(wallet_ids: set[int]) -> None:
+    for wallet_id in wallet_ids:
+        _bump_version(wallet_id)
+        cache.delete(_entry_key(wallet_id))
+        local_cache.delete(_entry_key(wallet_id))
+        _count("invalidations")
+
+
+def write_through_balances(wallet_ids: Iterable[int]) -> None:
+    """
+    Cache the new balances of the wallets once the current database transaction commits.
+
+    The version of each entry is incremented before the balance is read back, so an entry
+    cached from an older read, by a reader or a slower writer, is ignored by ``get_balance``.
+    """
+    wallet_ids = set(wallet_ids)
+    if settings.BALANCE_CACHE_ENABLED and wallet_ids:
+        transaction.on_commit(lambda: _write_through(wallet_ids))
+
+
+def invalidate_balances(wallet_ids: Iterable[int]) -> None:
+    """Drop the cached balances of the wallets once the current database transaction commits."""
+    wallet_ids = set(wallet_ids)
+    if settings.BALANCE_CACHE_ENABLED and wallet_ids:
+        transaction.on_commit(lambda: _invalidate(wallet_ids))
@@ -0,0 +1,16 @@
+class InsufficientFundsError(Exception):
+    def __init__(self, wallet_id: int):
+        self.wallet_id = wallet_id
+        super().__init__(f"There are not enough funds on the balance of the wallet {wallet_id}")
+
+
+class WalletDoesNotExistError(Exception):
+    def __init__(self, wallet_id: int):
+        self.wallet_id = wallet_id
+        super().__init__(f"Wallet {wallet_id} does not exist.")
+
+
+class ShardCountChangedError(Exception):
+    def __init__(self, wallet_ids: list[int]):
+        self.wallet_ids = wallet_ids
+        super().__init__(f"The sharding of the wallets {wallet_ids} kept changing while they were locked.")
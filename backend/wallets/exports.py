@@ -0,0 +1,84 @@
+from collections.abc import AsyncIterator, Iterator
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, QuerySet, Value
+from django.http import HttpRequest, StreamingHttpResponse
+from django_extended.pagination import Row
+from rest_framework.renderers import BaseRenderer
+
+EXPORT_FIELDS = ("id", "created_at", "wallet_id", "receiver_id", "amount", "transaction_type")
+
+
+def stream_transactions(queryset: QuerySet, renderer: BaseRenderer, chunk_size: int) -> Iterator[bytes]:
+    """
+    Render the transactions of ``queryset`` ``chunk_size`` rows at a time.
+
+    The rows are read through a server-side cursor, so a chunk is all that is held in memory.
+    The cursor lives in a transaction: outside of one Postgres would copy the whole result
+    set of a holdable cursor before returning the first row.
+    """
+    with transaction.atomic(using=queryset.db):
+        rows = queryset.values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+        header = True
+        while chunk := list(islice(rows, chunk_size)):
+            items = [dict(zip(EXPORT_FIELDS, row, strict=True)) for row in chunk]
+            yield renderer.render(items, renderer_context={"header": header})
+            header = False
+
+
+def get_transactions_page(queryset: QuerySet, after: tuple | None, chunk_size: int) -> list[tuple]:
+    """The ``EXPORT_FIELDS`` of the first ``chunk_size`` transactions after the ``(created_at, id)`` of ``after``."""
+    queryset = queryset.order_by("created_at", "id")
+    if after is not None:
+        queryset = queryset.alias(keyset_position=Row(F("created_at"), F("id"))).filter(
+            keyset_position__gt=Row(Value(after[0]), Value(after[1])),
+            # A plain bound lets Postgres prune the partitions of the table.
+            created_at__gte=after[0],
+        )
+    return list(queryset.values_list(*EXPORT_FIELDS)[:chunk_size])
+
+
+async def astream_transactions(queryset: QuerySet, renderer: BaseRenderer, chunk_size: int) -> AsyncIterator[bytes]:
+    """
+    Render the transactions of ``queryset``, oldest first, ``chunk_size`` rows at a time for an ASGI server.
+
+    An ASGI server reads a sync iterator whole before sending it, so the chunks are yielded by
+    an async iterator instead. Each one is a keyset page read in the sync thread: no cursor or
+    transaction is held between the chunks, and the event loop serves other requests meanwhile.
+    """
+    after = None
+    header = True
+    while chunk := await sync_to_async(get_transactions_page)(queryset, after, chunk_size):
+        items = [dict(zip(EXPORT_FIELDS, row, strict=True)) for row in chunk]
+        yield renderer.render(items, renderer_context={"header": header})
+        header = False
+        after = (items[-1]["created_at"], items[-1]["id"])
+
+
+def is_served_over_asgi(request: HttpRequest) -> bool:
+    """Whether the request is served under ASGI, which gives it the ``scope`` of the connection."""
+    return getattr(request, "scope", None) is not None
+
+
+def export_transactions(
+    queryset: QuerySet, renderer: BaseRenderer, filename: str, asynchronous: bool = False
+) -> StreamingHttpResponse:
+    """
+    Stream the transactions as a ``<filename>.<format>`` attachment rendered by ``renderer``.
+
+    ``asynchronous`` streams them with ``astream_transactions``, for the requests served under ASGI.
+    """
+    # The database is chosen now: the request is routed to a replica until the view returns, before the streaming.
+    queryset = queryset.using(queryset.db)
+    content_type = (
+        renderer.media_type if renderer.charset is None else f"{renderer.media_type}; charset={renderer.charset}"
+    )
+    stream = astream_transactions if asynchronous else stream_transactions
+    response = StreamingHttpResponse(
+        stream(queryset, renderer, settings.WALLETS_EXPORT_CHUNK_SIZE), content_type=content_type
+    )
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{renderer.format}"'
+    return response
@@ -0,0 +1,106 @@
+import hashlib
+import json
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django_extended.cache import LRUCache
+from rest_framework import serializers, status
+from rest_framework.request import Request
+from rest_framework.response import Response
+from wallets.models import IdempotencyKey
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+
+local_cache = LRUCache(maxsize=settings.IDEMPOTENCY_LOCAL_CACHE_SIZE)
+
+
+def get_request_hash(request: Request) -> str:
+    payload = json.dumps([request.method, request.path, request.data], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _cache_key(user_id: int, key: str) -> str:
+    return f"idempotency:{user_id}:{key}"
+
+
+def _store(user_id: int, key: str, stored: tuple[str, int, Any]) -> None:
+    local_cache.set(_cache_key(user_id, key), stored, ttl=settings.IDEMPOTENCY_KEY_TTL)
+    cache.set(_cache_key(user_id, key), stored, timeout=settings.IDEMPOTENCY_KEY_TTL)
+
+
+def _lookup(user_id: int, key: str) -> tuple[str, int, Any] | None:
+    cache_key = _cache_key(user_id, key)
+    stored = local_cache.get(cache_key)
+    if stored is None:
+        stored = cache.get(cache_key)
+        if stored is not None:
+            local_cache.set(cache_key, stored, ttl=settings.IDEMPOTENCY_KEY_TTL)
+    return stored
+
+
+def _replay(stored: tuple[str, int, Any], request_hash: str) -> Response:
+    stored_hash, response_status, response_body = stored
+    if stored_hash != request_hash:
+        return Response(
+            {"detail": f"The {IDEMPOTENCY_KEY_HEADER} was already used with a different request."},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(response_body, status=response_status, headers={"Idempotent-Replayed": "true"})
+
+
+def idempotent_response(request: Request, handler: Callable[[], Response]) -> Response:
+    """
+    Run ``handler`` once per ``Idempotency-Key`` of the user and replay its response on a retry.
+
+    The key row is inserted in the same database transaction as the handler's writes.
+    A concurrent duplicate blocks on the unique constraint until the first request
+    commits and then replays its response; if the first request fails, nothing was
+    stored and the duplicate runs the handler itself.
+    """
+    key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+    if not key:
+        return handler()
+    if len(key) > IdempotencyKey._meta.get_field("key").max_length:
+        raise serializers.ValidationError({IDEMPOTENCY_KEY_HEADER: ["The key is too long."]})
+
+    user_id = request.user.pk
+    request_hash = get_request_hash(request)
+    stored = _lookup(user_id, key)
+    if stored is not None:
+        return _replay(stored, request_hash)
+
+    expired_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    IdempotencyKey.objects.filter(user_id=user_id, key=key, created_at__lt=expired_before).delete()
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(user_id=user_id, key=key, request_hash=request_hash)
+        except IntegrityError:
+            record = IdempotencyKey.objects.filter(user_id=user_id, key=key).first()
+            if record is None or record.response_status is None:
+                return Response(
+                    {"detail": f"A request with this {IDEMPOTENCY_KEY_HEADER} is already being processed."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            stored = (record.request_hash, record.response_status, record.response_body)
+            _store(user_id, key, stored)
+            return _replay(stored, request_hash)
+
+        response = handler()
+        record.response_status = response.status_code
+        record.response_body = dict(response.data)
+        record.save(update_fields=["response_status", "response_body"])
+        stored = (request_hash, record.response_status, record.response_body)
+        transaction.on_commit(lambda: _store(user_id, key, stored))
+    return response
+
+
+def purge_expired_idempotency_keys() -> int:
+    expired_before = timezone.now() - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    deleted, _ = IdempotencyKey.objects.filter(created_at__lt=expired_before).delete()
+    return deleted
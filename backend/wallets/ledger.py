@@ -0,0 +1,79 @@
+from collections.abc import Iterable
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from wallets.models import BalanceSnapshot, LedgerEntry, Wallet
+
+
+def _last_snapshot_entry_id() -> Coalesce:
+    last_entry_id = (
+        BalanceSnapshot.objects.filter(wallet_id=OuterRef("wallet_id"))
+        .order_by("-last_entry_id")
+        .values("last_entry_id")[:1]
+    )
+    return Coalesce(Subquery(last_entry_id), 0)
+
+
+def get_ledger_balances(wallet_ids: Iterable[int], until_entry_id: int | None = None) -> dict[int, Decimal]:
+    """
+    Return the balances of the wallets as the latest snapshot plus the entries written since.
+
+    A wallet without a snapshot starts from its ``Wallet.balance`` column, which is
+    no longer written once the ledger is enabled and keeps the balance at cut-over.
+    """
+    wallet_ids = set(wallet_ids)
+    if not wallet_ids:
+        return {}
+    snapshots = (
+        BalanceSnapshot.objects.filter(wallet_id__in=wallet_ids)
+        .order_by("wallet_id", "-last_entry_id")
+        .distinct("wallet_id")
+        .values_list("wallet_id", "balance")
+    )
+    balances = dict(snapshots)
+    missing_ids = wallet_ids - balances.keys()
+    if missing_ids:
+        balances.update(Wallet.objects.filter(id__in=missing_ids).values_list("id", "balance"))
+
+    entries = LedgerEntry.objects.filter(wallet_id__in=wallet_ids, id__gt=_last_snapshot_entry_id())
+    if until_entry_id is not None:
+        entries = entries.filter(id__lte=until_entry_id)
+    totals = entries.values("wallet_id").annotate(total=Sum("amount")).values_list("wallet_id", "total")
+    for wallet_id, total in totals:
+        balances[wallet_id] += total
+    return balances
+
+
+def get_ledger_balance(wallet_id: int) -> Decimal:
+    return get_ledger_balances([wallet_id])[wallet_id]
+
+
+def create_balance_snapshots(chunk_size: int = 1000) -> int:
+    """
+    Snapshot every wallet with ledger entries newer than its latest snapshot.
+
+    The wallets of a chunk are locked ``FOR UPDATE`` before their last entry id is read.
+    Every ledger writer holds a lock on the wallets it writes entries for until it commits,
+    so the lock waits for the entries in flight and no entry at or below the snapshotted id
+    can commit afterwards. Older snapshots of the wallets are removed once the new ones are written.
+    """
+    wallet_ids = list(
+        LedgerEntry.objects.filter(id__gt=_last_snapshot_entry_id())
+        .values_list("wallet_id", flat=True)
+        .distinct()
+        .order_by("wallet_id")
+    )
+    for start in range(0, len(wallet_ids), chunk_size):
+        chunk = wallet_ids[start : start + chunk_size]
+        with transaction.atomic():
+            list(Wallet.objects.select_for_update().filter(id__in=chunk).order_by("id").values_list("id", flat=True))
+            until_entry_id = LedgerEntry.objects.filter(wallet_id__in=chunk).aggregate(last_id=Max("id"))["last_id"]
+            balances = get_ledger_balances(chunk, until_entry_id=until_entry_id)
+            BalanceSnapshot.objects.bulk_create(
+                BalanceSnapshot(wallet_id=wallet_id, balance=balance, last_entry_id=until_entry_id)
+                for wallet_id, balance in balances.items()
+            )
+            BalanceSnapshot.objects.filter(wallet_id__in=chunk, last_entry_id__lt=until_entry_id).delete()
+    return len(wallet_ids)
@@ -0,0 +1,84 @@
+from collections.abc import Iterable
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.http import HttpRequest
+from wallets.models import Wallet
+
+
+class WalletLoader:
+    """
+    Identity map of the wallets read while serving one request.
+
+    A wallet is read from the database once, together with the other wallets requested
+    at the same time, and the same instance is returned afterwards. The loaded rows are
+    not locked: the services still lock and re-read the balances they change, then
+    replace the loaded wallets with the updated rows.
+    """
+
+    def __init__(self):
+        self._wallets: dict[int, Wallet | None] = {}
+
+    def load(self, wallet_ids: Iterable[int]) -> dict[int, Wallet]:
+        """Return the existing wallets of ``wallet_ids``, reading the ones not loaded yet with one query."""
+        wallet_ids = {wallet_id for wallet_id in wallet_ids if wallet_id is not None}
+        missing_ids = wallet_ids - self._wallets.keys()
+        if missing_ids:
+            self._wallets.update(dict.fromkeys(missing_ids))
+            self._wallets.update((wallet.id, wallet) for wallet in Wallet.objects.filter(id__in=missing_ids))
+        return {wallet_id: self._wallets[wallet_id] for wallet_id in wallet_ids if self._wallets[wallet_id]}
+
+    def get(self, wallet_id: int) -> Wallet | None:
+        return self.load([wallet_id]).get(wallet_id)
+
+    def get_loaded(self, wallet_ids: Iterable[int]) -> dict[int, Wallet] | None:
+        """Return the existing wallets of ``wallet_ids`` if all of them were loaded already, else ``None``."""
+        wallet_ids = set(wallet_ids)
+        if not wallet_ids <= self._wallets.keys():
+            return None
+        return {wallet_id: self._wallets[wallet_id] for wallet_id in wallet_ids if self._wallets[wallet_id]}
+
+    def add(self, wallets: Iterable[Wallet]) -> None:
+        """Replace the loaded wallets with rows read since, such as the rows locked to change their balance."""
+        self._wallets.update((wallet.id, wallet) for wallet in wallets)
+
+    def discard(self, wallet_ids: Iterable[int]) -> None:
+        """Forget the loaded wallets found stale, so they are read again."""
+        for wallet_id in wallet_ids:
+            self._wallets.pop(wallet_id, None)
+
+
+_loader: ContextVar[WalletLoader | None] = ContextVar("wallet_loader", default=None)
+
+
+def get_wallet_loader() -> WalletLoader:
+    """The wallet loader of the current request, or a new one, used once, outside requests."""
+    return _loader.get() or WalletLoader()
+
+
+class WalletLoaderMiddleware:
+    """Give each request its own ``WalletLoader``, shared by its serializers and the services they call."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        token = _loader.set(WalletLoader())
+        try:
+            return self.get_response(request)
+        finally:
+            _loader.reset(token)
+
+    async def __acall__(self, request: HttpRequest):
+        token = _loader.set(WalletLoader())
+        try:
+            return await self.get_response(request)
+        finally:
+            _loader.reset(token)
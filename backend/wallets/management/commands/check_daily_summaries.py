@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+from wallets.management.commands.rebuild_daily_summaries import get_days
+from wallets.summaries import check_daily_summaries
+
+
+class Command(BaseCommand):
+    help = "Compare the daily wallet summaries with the transactions and fail on any difference."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to check, YYYY-MM-DD (default: day of the first transaction)")
+        parser.add_argument("--until", help="Last day to check, YYYY-MM-DD (default: today)")
+
+    def handle(self, *args, **options):
+        days = get_days(options)
+        if days is None:
+            self.stdout.write(self.style.SUCCESS("There are no transactions to check"))
+            return
+        since, until = days
+        mismatches = check_daily_summaries(since, until)
+        for mismatch in mismatches:
+            self.stderr.write(
+                "Wallet {wallet_id} on {day}, {transaction_type}: transactions {expected}, summary {summary}".format(
+                    **mismatch
+                )
+            )
+        if mismatches:
+            raise CommandError(
+                f"{len(mismatches)} daily summaries differ from the transactions, "
+                "run rebuild_daily_summaries on their days."
+            )
+        self.stdout.write(self.style.SUCCESS(f"The daily summaries from {since} to {until} match the transactions"))
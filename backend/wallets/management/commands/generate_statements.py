@@ -0,0 +1,38 @@
+from datetime import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from wallets.partitions import add_months
+from wallets.statements import get_pending_ranges, get_statements_path, write_statements
+from wallets.tasks import generate_monthly_statements
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the monthly statements of the wallets, by Celery chunk tasks or in this process with --inline. "
+        "The chunks already written are skipped, so an interrupted run can be resumed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--month", help="Month of the statements, YYYY-MM (default: last month)")
+        parser.add_argument("--inline", action="store_true", help="Write the statements in this process")
+        parser.add_argument("--chunk-size", type=int, default=settings.WALLETS_STATEMENT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        if options["month"]:
+            try:
+                month = datetime.strptime(options["month"], "%Y-%m").date()
+            except ValueError:
+                raise CommandError(f'"{options["month"]}" is not a month in the YYYY-MM format.')
+        else:
+            month = add_months(timezone.now().date().replace(day=1), -1)
+        if not options["inline"]:
+            sent = generate_monthly_statements.delay(f"{month:%Y-%m}", options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(f"Sent the statements of {month:%Y-%m} to Celery ({sent.id})"))
+            return
+        written = 0
+        for first_id, last_id in get_pending_ranges(month, options["chunk_size"]):
+            written += write_statements(month, first_id, last_id)
+            self.stdout.write(f"Wrote {get_statements_path(month, first_id, last_id)}")
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} statements of {month:%Y-%m}"))
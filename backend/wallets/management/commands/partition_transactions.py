@@ -0,0 +1,56 @@
+from datetime import date, datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from wallets.partitions import add_months, create_partitions, detach_partitions
+
+
+def parse_month(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m").date()
+    except ValueError:
+        raise CommandError(f'"{value}" is not a month in the YYYY-MM format.')
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the monthly partitions of the transactions ahead of time "
+        "and detach or archive the partitions past the retention period"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First month to create a partition for, YYYY-MM (default: this month)")
+        parser.add_argument("--months-ahead", type=int, default=settings.WALLETS_TRANSACTION_PARTITIONS_AHEAD)
+        parser.add_argument(
+            "--detach-before",
+            help="Detach the partitions of the months before this one, YYYY-MM "
+            "(default: WALLETS_TRANSACTION_RETENTION_MONTHS before this month, if set)",
+        )
+        parser.add_argument(
+            "--archive-dir",
+            default=settings.WALLETS_TRANSACTION_ARCHIVE_DIR or None,
+            help="Write the detached partitions to <partition>.csv.gz files in this directory and drop them",
+        )
+
+    def handle(self, *args, **options):
+        archive_dir = Path(options["archive_dir"]) if options["archive_dir"] else None
+        if archive_dir is not None and not archive_dir.is_dir():
+            raise CommandError(f"The archive directory {archive_dir} does not exist.")
+        this_month = timezone.now().date().replace(day=1)
+        since = parse_month(options["since"]) if options["since"] else this_month
+        if options["detach_before"]:
+            detach_before = parse_month(options["detach_before"])
+        elif settings.WALLETS_TRANSACTION_RETENTION_MONTHS:
+            detach_before = add_months(this_month, -settings.WALLETS_TRANSACTION_RETENTION_MONTHS)
+        else:
+            detach_before = None
+
+        created = create_partitions(since, add_months(this_month, options["months_ahead"]))
+        for name in created:
+            self.stdout.write(f"Created {name}")
+        detached = detach_partitions(detach_before, archive_dir) if detach_before else []
+        for name in detached:
+            self.stdout.write(f"{'Archived' if archive_dir else 'Detached'} {name}")
+        self.stdout.write(self.style.SUCCESS(f"Created {len(created)} and detached {len(detached)} partitions"))
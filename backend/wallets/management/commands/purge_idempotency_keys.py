@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from wallets.idempotency import purge_expired_idempotency_keys
+
+
+class Command(BaseCommand):
+    help = "Delete the idempotency keys older than IDEMPOTENCY_KEY_TTL"
+
+    def handle(self, *args, **options):
+        deleted = purge_expired_idempotency_keys()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} idempotency keys"))
@@ -0,0 +1,44 @@
+from datetime import date, datetime, timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from wallets.models import Transaction
+from wallets.summaries import rebuild_daily_summaries
+
+
+def parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise CommandError(f'"{value}" is not a day in the YYYY-MM-DD format.')
+
+
+def get_days(options: dict) -> tuple[date, date] | None:
+    """The ``--since`` and ``--until`` days, from the day of the first transaction to today by default."""
+    until = parse_day(options["until"]) if options["until"] else datetime.now(timezone.utc).date()
+    if options["since"]:
+        return parse_day(options["since"]), until
+    first = Transaction.objects.aggregate(first=Min("created_at"))["first"]
+    if first is None:
+        return None
+    return first.astimezone(timezone.utc).date(), until
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily wallet summaries from the transactions, a day at a time. "
+        "Transactions can keep being created while it runs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="First day to rebuild, YYYY-MM-DD (default: day of the first transaction)")
+        parser.add_argument("--until", help="Last day to rebuild, YYYY-MM-DD (default: today)")
+
+    def handle(self, *args, **options):
+        days = get_days(options)
+        if days is None:
+            self.stdout.write(self.style.SUCCESS("There are no transactions to summarize"))
+            return
+        since, until = days
+        written = rebuild_daily_summaries(since, until)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} daily summaries from {since} to {until}"))
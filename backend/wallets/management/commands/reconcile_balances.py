@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from wallets.models import BalanceMismatch, ReconciliationRun
+from wallets.reconciliation import accept_mismatches, reconcile_in_processes, reconcile_range, start_reconciliation
+from wallets.tasks import reconcile_wallet_balances
+
+# Mismatches of a run written to the output, the others are left to the report table.
+MISMATCHES_SHOWN = 100
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that the balance of every wallet equals the net of its transactions, by Celery chunk tasks, "
+        "in a pool of --processes or in this process with --inline. Only the wallets changed since the last run "
+        "are checked, unless --full. The mismatches are written to the wallets_balancemismatch table; --accept takes "
+        "the balances of the mismatched wallets as correct once they are explained."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Check all the wallets")
+        parser.add_argument("--inline", action="store_true", help="Check the wallets in this process")
+        parser.add_argument("--processes", type=int, help="Check the wallets in a pool of processes")
+        parser.add_argument("--chunk-size", type=int, default=settings.WALLETS_RECONCILIATION_CHUNK_SIZE)
+        parser.add_argument(
+            "--accept",
+            nargs="*",
+            type=int,
+            metavar="WALLET_ID",
+            help="Take the balances of the mismatched wallets, or of the given ones, as correct instead of checking",
+        )
+
+    def handle(self, *args, **options):
+        if options["accept"] is not None:
+            accepted = accept_mismatches(options["accept"] or None)
+            self.stdout.write(self.style.SUCCESS(f"Accepted the balances of {accepted} mismatched wallets"))
+            return
+        if not options["inline"] and not options["processes"]:
+            sent = reconcile_wallet_balances.delay(options["full"], options["chunk_size"])
+            self.stdout.write(self.style.SUCCESS(f"Sent the reconciliation to Celery ({sent.id})"))
+            return
+        run, ranges = start_reconciliation(options["full"], options["chunk_size"])
+        if options["processes"]:
+            reconcile_in_processes(run, ranges, options["processes"])
+        else:
+            for first_id, last_id in ranges:
+                reconcile_range(run.pk, first_id, last_id)
+        run = ReconciliationRun.objects.get(pk=run.pk)
+        checked = "all the wallets" if run.since is None else f"the wallets changed since {run.since:%Y-%m-%d %H:%M}"
+        mismatches = BalanceMismatch.objects.filter(run=run).order_by("wallet_id")
+        for mismatch in mismatches[:MISMATCHES_SHOWN]:
+            self.stderr.write(
+                f"Wallet {mismatch.wallet_id}: balance {mismatch.balance}, transactions {mismatch.expected}"
+            )
+        if run.mismatches:
+            raise CommandError(
+                f"{run.mismatches} of the {run.wallets_checked} balances checked differ from their transactions "
+                f"(run {run.pk}, {checked})."
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"The {run.wallets_checked} balances checked, {checked}, match their transactions")
+        )
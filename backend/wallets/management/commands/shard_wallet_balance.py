@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from wallets.models import Wallet
+from wallets.sharding import set_shard_count
+
+
+class Command(BaseCommand):
+    help = "Split the balance of a hot wallet over several shard rows, or merge it back with --shards 0"
+
+    def add_arguments(self, parser):
+        parser.add_argument("wallet_id", type=int)
+        parser.add_argument("--shards", type=int, required=True)
+
+    def handle(self, *args, **options):
+        if settings.WALLETS_LEDGER_ENABLED:
+            raise CommandError("Sharding is not used with the ledger enabled, where credits do not lock the wallet.")
+        if not 0 <= options["shards"] <= 256:
+            raise CommandError("The number of shards must be between 0 and 256.")
+        try:
+            set_shard_count(options["wallet_id"], options["shards"])
+        except Wallet.DoesNotExist:
+            raise CommandError(f"Wallet {options['wallet_id']} does not exist.")
+        self.stdout.write(self.style.SUCCESS(f"Wallet {options['wallet_id']} has {options['shards']} shards"))
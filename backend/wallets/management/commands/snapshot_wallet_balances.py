@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from wallets.ledger import create_balance_snapshots
+
+
+class Command(BaseCommand):
+    help = "Write balance snapshots for the wallets with new ledger entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        count = create_balance_snapshots(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Snapshotted {count} wallets"))
@@ -0,0 +1,62 @@
+# Generated by Django 4.2.13 on 2026-10-17 14:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0002_alter_wallet_balance_alter_wallet_wallet_number"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("amount", models.DecimalField(decimal_places=2, max_digits=32)),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        blank=True,
+                        choices=[
+                            ("WITHDRAW", "Withdraw"),
+                            ("DEPOSIT", "Deposit"),
+                            ("TRANSFER", "Transfer"),
+                            ("CANCELLATION", "Cancellation"),
+                        ],
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="ledger_entries", to="wallets.wallet"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["wallet", "id"], name="wallets_ledger_wallet_id_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="BalanceSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=32)),
+                ("last_entry_id", models.BigIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_snapshots",
+                        to="wallets.wallet",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["wallet", "-last_entry_id"], name="wallets_snapshot_wallet_idx")],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.13 on 2026-10-17 14:55
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0004_idempotency_key"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="wallet",
+            name="shard_count",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name="WalletBalanceShard",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("index", models.PositiveSmallIntegerField()),
+                ("balance", models.DecimalField(decimal_places=2, default=Decimal("0.0"), max_digits=32)),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="balance_shards", to="wallets.wallet"
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="walletbalanceshard",
+            constraint=models.UniqueConstraint(fields=("wallet", "index"), name="wallets_shard_wallet_idx_uniq"),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.13 on 2026-10-17 15:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0005_wallet_balance_shards"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["created_at", "id"], name="wallets_tx_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="wallet",
+            index=models.Index(fields=["created_at", "id"], name="wallets_wallet_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="wallet",
+            index=models.Index(fields=["owner", "created_at", "id"], name="wallets_owner_created_idx"),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.13 on 2026-10-17 15:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0006_keyset_pagination_indexes"),
+    ]
+
+    operations = [
+        # The composite indexes are created before the single-column foreign key indexes are dropped.
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["wallet", "created_at", "id"], name="wallets_tx_wallet_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                condition=models.Q(("receiver__isnull", False)),
+                fields=["receiver", "created_at", "id"],
+                name="wallets_tx_recv_created_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["transaction_type", "created_at", "id"], name="wallets_tx_type_created_idx"),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="receiver",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="incoming_transactions",
+                to="wallets.wallet",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="transaction",
+            name="wallet",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to="wallets.wallet",
+            ),
+        ),
+    ]
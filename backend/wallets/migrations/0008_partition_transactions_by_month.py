@@ -0,0 +1,75 @@
+from datetime import date
+
+from django.db import migrations
+from django.utils import timezone
+
+TABLE = "wallets_transaction"
+PARTITIONS_AHEAD = 3
+
+INDEXES = [
+    "CREATE INDEX wallets_tx_created_idx ON wallets_transaction (created_at, id)",
+    "CREATE INDEX wallets_tx_wallet_created_idx ON wallets_transaction (wallet_id, created_at, id)",
+    "CREATE INDEX wallets_tx_recv_created_idx ON wallets_transaction (receiver_id, created_at, id) "
+    "WHERE receiver_id IS NOT NULL",
+    "CREATE INDEX wallets_tx_type_created_idx ON wallets_transaction (transaction_type, created_at, id)",
+    "ALTER TABLE wallets_transaction ADD CONSTRAINT wallets_transaction_receiver_id_a6cbc9cf_fk_wallets_wallet_id "
+    "FOREIGN KEY (receiver_id) REFERENCES wallets_wallet (id) DEFERRABLE INITIALLY DEFERRED",
+    "ALTER TABLE wallets_transaction ADD CONSTRAINT wallets_transaction_wallet_id_f5bd9420_fk_wallets_wallet_id "
+    "FOREIGN KEY (wallet_id) REFERENCES wallets_wallet (id) DEFERRABLE INITIALLY DEFERRED",
+]
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def copy_table(cursor, primary_key: str, partitioned: bool) -> None:
+    """Replace the transaction table by a copy of it, partitioned by month of ``created_at`` or not."""
+    cursor.execute(f"ALTER TABLE {TABLE} RENAME TO {TABLE}_old")
+    cursor.execute(f"ALTER TABLE {TABLE}_old RENAME CONSTRAINT {TABLE}_pkey TO {TABLE}_old_pkey")
+    cursor.execute(
+        f"CREATE TABLE {TABLE} (LIKE {TABLE}_old INCLUDING DEFAULTS INCLUDING IDENTITY, "
+        f"CONSTRAINT {TABLE}_pkey PRIMARY KEY ({primary_key}))"
+        + (" PARTITION BY RANGE (created_at)" if partitioned else "")
+    )
+    if partitioned:
+        cursor.execute(f"SELECT MIN(created_at) FROM {TABLE}_old")
+        (first_created_at,) = cursor.fetchone()
+        today = timezone.now().date()
+        month = (first_created_at.date() if first_created_at else today).replace(day=1)
+        while month <= add_months(today.replace(day=1), PARTITIONS_AHEAD):
+            cursor.execute(
+                f"CREATE TABLE {TABLE}_p{month:%Y_%m} PARTITION OF {TABLE} FOR VALUES FROM (%s) TO (%s)",
+                [f"{month} 00:00+00", f"{add_months(month, 1)} 00:00+00"],
+            )
+            month = add_months(month, 1)
+        cursor.execute(f"CREATE TABLE {TABLE}_default PARTITION OF {TABLE} DEFAULT")
+    cursor.execute(f"INSERT INTO {TABLE} SELECT * FROM {TABLE}_old")
+    cursor.execute(
+        f"SELECT setval(pg_get_serial_sequence('{TABLE}', 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}"
+    )
+    cursor.execute(f"DROP TABLE {TABLE}_old")
+    for statement in INDEXES:
+        cursor.execute(statement)
+
+
+def partition_transactions(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        copy_table(cursor, "id, created_at", partitioned=True)
+
+
+def unpartition_transactions(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        copy_table(cursor, "id", partitioned=False)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0007_transaction_access_indexes"),
+    ]
+
+    operations = [
+        # The table is copied, which takes a lock on the transactions for the duration of the copy.
+        migrations.RunPython(partition_transactions, unpartition_transactions),
+    ]
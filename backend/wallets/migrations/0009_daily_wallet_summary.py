@@ -0,0 +1,53 @@
+# Generated by Django 4.2.13 on 2026-10-17 16:20
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0008_partition_transactions_by_month"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyWalletSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("day", models.DateField()),
+                (
+                    "transaction_type",
+                    models.CharField(
+                        choices=[
+                            ("WITHDRAW", "Withdraw"),
+                            ("DEPOSIT", "Deposit"),
+                            ("TRANSFER", "Transfer"),
+                            ("CANCELLATION", "Cancellation"),
+                        ]
+                    ),
+                ),
+                ("count", models.BigIntegerField(default=0)),
+                ("amount", models.DecimalField(decimal_places=2, default=Decimal("0.0"), max_digits=32)),
+                (
+                    "wallet",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_summaries",
+                        to="wallets.wallet",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="dailywalletsummary",
+            index=models.Index(fields=["day", "transaction_type"], name="wallets_summary_day_idx"),
+        ),
+        migrations.AddConstraint(
+            model_name="dailywalletsummary",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "day", "transaction_type"), name="wallets_summary_wallet_day_uniq"
+            ),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2.13 on 2026-10-17 17:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0009_daily_wallet_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReconciliationRun",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("since", models.DateTimeField(blank=True, null=True)),
+                ("ranges", models.PositiveIntegerField(default=0)),
+                ("ranges_done", models.PositiveIntegerField(default=0)),
+                ("wallets_checked", models.BigIntegerField(default=0)),
+                ("mismatches", models.BigIntegerField(default=0)),
+                ("finished_at", models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                "abstract": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="BalanceMismatch",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("balance", models.DecimalField(decimal_places=2, max_digits=32)),
+                ("expected", models.DecimalField(decimal_places=2, max_digits=32)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "run",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_mismatches",
+                        to="wallets.reconciliationrun",
+                    ),
+                ),
+                (
+                    "wallet",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_mismatch",
+                        to="wallets.wallet",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 4.2.13 on 2026-10-17 17:53
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0010_balance_reconciliation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OpeningBalance",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("balance", models.DecimalField(decimal_places=2, default=Decimal("0.0"), max_digits=32)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "wallet",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE, related_name="opening_balance", to="wallets.wallet"
+                    ),
+                ),
+            ],
+        ),
+    ]
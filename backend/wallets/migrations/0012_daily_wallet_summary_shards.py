@@ -0,0 +1,27 @@
+# Generated by Django 4.2.13 on 2026-10-17 18:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("wallets", "0011_opening_balance"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dailywalletsummary",
+            name="shard",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddConstraint(
+            model_name="dailywalletsummary",
+            constraint=models.UniqueConstraint(
+                fields=("wallet", "day", "transaction_type", "shard"), name="wallets_summary_wallet_day_shard_uniq"
+            ),
+        ),
+        migrations.RemoveConstraint(
+            model_name="dailywalletsummary",
+            name="wallets_summary_wallet_day_uniq",
+        ),
+    ]
@@ -6,6 +6,7 @@ from django.core.validators import MinValueValidator
 from django.db import models
 from django_extended.constants import MINIMUM_TRANSFER_RATE, TransactionType
 from django_extended.models import BaseModel
+from django_extended.timing import timed
 from users.models import User
 
 
@@ -19,6 +20,15 @@ class Wallet(BaseModel):
         validators=[MinValueValidator(0.0)],
         default=Decimal("0.0"),
     )
+    # With shards the balance is kept in ``WalletBalanceShard`` rows and this column stays at zero.
+    shard_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of the wallet lists of the admins and of the owners.
+            models.Index(fields=["created_at", "id"], name="wallets_wallet_created_idx"),
+            models.Index(fields=["owner", "created_at", "id"], name="wallets_owner_created_idx"),
+        ]
 
     def clean(self):
         if self.balance < Decimal("0.0") and self.balance != Decimal("0.0"):
@@ -26,15 +36,18 @@ class Wallet(BaseModel):
         return super().clean()
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        with timed("clean"):
+            self.full_clean()
         return super().save(*args, **kwargs)
 
 
 class Transaction(BaseModel):
+    # The foreign keys are indexed by the composite indexes of ``Meta.indexes``.
     wallet = models.ForeignKey(
         "Wallet",
         on_delete=models.CASCADE,
         related_name="transactions",
+        db_index=False,
     )
     receiver = models.ForeignKey(
         "Wallet",
@@ -42,15 +55,168 @@ class Transaction(BaseModel):
         related_name="incoming_transactions",
         blank=True,
         null=True,
+        db_index=False,
     )
     amount = models.DecimalField(max_digits=32, decimal_places=2)
     transaction_type = models.CharField(choices=TransactionType.choices)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the transaction list of the admins.
+            models.Index(fields=["created_at", "id"], name="wallets_tx_created_idx"),
+            # Outgoing and incoming transactions of the owner's wallets, newest first.
+            models.Index(fields=["wallet", "created_at", "id"], name="wallets_tx_wallet_created_idx"),
+            # Only transfers have a receiver, so the other transactions are left out of the index.
+            models.Index(
+                fields=["receiver", "created_at", "id"],
+                name="wallets_tx_recv_created_idx",
+                condition=models.Q(receiver__isnull=False),
+            ),
+            # The ``?transaction_type=`` filter of the transaction list.
+            models.Index(fields=["transaction_type", "created_at", "id"], name="wallets_tx_type_created_idx"),
+        ]
+
     def clean(self):
         if self.amount < MINIMUM_TRANSFER_RATE:
             raise ValidationError({"amount": "Insufficient transfer amount, the minimum amount is 0.1"})
         return super().clean()
 
     def save(self, *args, **kwargs):
-        self.full_clean()
+        # The wallets set as instances were read already: their foreign key constraints are left to the database.
+        with timed("clean"):
+            self.full_clean(
+                exclude=[name for name in ("wallet", "receiver") if self._meta.get_field(name).is_cached(self)]
+            )
         return super().save(*args, **kwargs)
+
+
+class WalletBalanceShard(models.Model):
+    """Part of the balance of a sharded wallet, so concurrent credits of one wallet update different rows."""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="balance_shards",
+    )
+    index = models.PositiveSmallIntegerField()
+    balance = models.DecimalField(max_digits=32, decimal_places=2, default=Decimal("0.0"))
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["wallet", "index"], name="wallets_shard_wallet_idx_uniq")]
+
+
+class DailyWalletSummary(models.Model):
+    """Number and amount of the transactions sent from a wallet on a day (UTC) by type, updated as they commit."""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="daily_summaries",
+        db_index=False,
+    )
+    day = models.DateField()
+    transaction_type = models.CharField(choices=TransactionType.choices)
+    # The totals of a key are split over ``WALLETS_SUMMARY_SHARDS`` rows, so its concurrent updates lock different rows.
+    shard = models.PositiveSmallIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+    amount = models.DecimalField(max_digits=32, decimal_places=2, default=Decimal("0.0"))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["wallet", "day", "transaction_type", "shard"], name="wallets_summary_wallet_day_shard_uniq"
+            )
+        ]
+        # The totals of all the wallets over a range of days.
+        indexes = [models.Index(fields=["day", "transaction_type"], name="wallets_summary_day_idx")]
+
+
+class LedgerEntry(models.Model):
+    """Append-only balance change of a wallet: positive amounts credit it, negative amounts debit it."""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="ledger_entries",
+    )
+    amount = models.DecimalField(max_digits=32, decimal_places=2)
+    transaction_type = models.CharField(choices=TransactionType.choices, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["wallet", "id"], name="wallets_ledger_wallet_id_idx")]
+
+
+class BalanceSnapshot(models.Model):
+    """Balance of a wallet including every ledger entry up to ``last_entry_id``."""
+
+    wallet = models.ForeignKey(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="balance_snapshots",
+    )
+    balance = models.DecimalField(max_digits=32, decimal_places=2)
+    last_entry_id = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["wallet", "-last_entry_id"], name="wallets_snapshot_wallet_idx")]
+
+
+class IdempotencyKey(BaseModel):
+    """First response to a request sent with an ``Idempotency-Key`` header, replayed on a retry."""
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(null=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["user", "key"], name="wallets_idempotency_user_key_unique")]
+        indexes = [models.Index(fields=["created_at"], name="wallets_idemp_created_idx")]
+
+
+class ReconciliationRun(BaseModel):
+    """Check of the balances against the transactions, of all the wallets or of those changed since ``since``."""
+
+    since = models.DateTimeField(null=True, blank=True)
+    ranges = models.PositiveIntegerField(default=0)
+    ranges_done = models.PositiveIntegerField(default=0)
+    wallets_checked = models.BigIntegerField(default=0)
+    mismatches = models.BigIntegerField(default=0)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+
+class BalanceMismatch(models.Model):
+    """Wallet whose balance differed from the net of its transactions when last reconciled."""
+
+    wallet = models.OneToOneField(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="balance_mismatch",
+    )
+    run = models.ForeignKey(
+        "ReconciliationRun",
+        on_delete=models.CASCADE,
+        related_name="balance_mismatches",
+    )
+    balance = models.DecimalField(max_digits=32, decimal_places=2)
+    expected = models.DecimalField(max_digits=32, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+
+class OpeningBalance(models.Model):
+    """
+    Part of the balance of a wallet its stored transactions do not account for, which reconciliation starts from.
+
+    It holds the net of the transactions of the detached partitions and the balance edits of the admins.
+    """
+
+    wallet = models.OneToOneField(
+        "Wallet",
+        on_delete=models.CASCADE,
+        related_name="opening_balance",
+    )
+    balance = models.DecimalField(max_digits=32, decimal_places=2, default=Decimal("0.0"))
+    updated_at = models.DateTimeField(auto_now=True)
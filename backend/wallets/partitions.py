@@ -0,0 +1,123 @@
+import gzip
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from wallets.models import Transaction
+from wallets.reconciliation import add_opening_balances
+from wallets.services import get_transactions_net
+
+TRANSACTION_TABLE = Transaction._meta.db_table
+DEFAULT_PARTITION = f"{TRANSACTION_TABLE}_default"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(month: date) -> str:
+    return f"{TRANSACTION_TABLE}_p{month:%Y_%m}"
+
+
+def get_partition_months() -> list[date]:
+    """First days of the months that have a partition of the transaction table, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT child.relname FROM pg_inherits JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = %s::regclass",
+            [TRANSACTION_TABLE],
+        )
+        names = [name for (name,) in cursor.fetchall() if name != DEFAULT_PARTITION]
+    prefix = f"{TRANSACTION_TABLE}_p"
+    return sorted(date(int(name[len(prefix) :][:4]), int(name[-2:]), 1) for name in names)
+
+
+def create_partition(month: date) -> None:
+    """
+    Add the partition of the transactions created in ``month``.
+
+    The rows of the month already stored in the default partition are moved to the new one.
+    Inserts of other rows into the default partition wait until the partition is attached.
+    """
+    name = get_partition_name(month)
+    bounds = [f"{month} 00:00+00", f"{add_months(month, 1)} 00:00+00"]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {DEFAULT_PARTITION} IN SHARE ROW EXCLUSIVE MODE")
+        cursor.execute(f"CREATE TABLE {name} (LIKE {TRANSACTION_TABLE} INCLUDING DEFAULTS)")
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE created_at >= %s AND created_at < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            bounds,
+        )
+        # With the constraint in place, attaching does not scan the partition to check its rows.
+        cursor.execute(
+            f"ALTER TABLE {name} ADD CONSTRAINT {name}_bounds CHECK (created_at >= %s AND created_at < %s)", bounds
+        )
+        cursor.execute(f"ALTER TABLE {TRANSACTION_TABLE} ATTACH PARTITION {name} FOR VALUES FROM (%s) TO (%s)", bounds)
+        cursor.execute(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bounds")
+
+
+def create_partitions(since: date, until: date) -> list[str]:
+    """Create the missing monthly partitions from the month of ``since`` to the month of ``until``."""
+    existing = set(get_partition_months())
+    created = []
+    month = since.replace(day=1)
+    while month <= until:
+        if month not in existing:
+            create_partition(month)
+            created.append(get_partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def archive_partition(name: str, archive_dir: Path) -> Path:
+    path = archive_dir / f"{name}.csv.gz"
+    with gzip.open(path, "wt", newline="") as archive, connection.cursor() as cursor:
+        cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+    return path
+
+
+def detach_partitions(before: date, archive_dir: Path | None = None) -> list[str]:
+    """
+    Detach the monthly partitions of the transactions created before the month of ``before``.
+
+    A detached partition is a standalone table the API no longer reads. With ``archive_dir``
+    its rows are written to ``<partition>.csv.gz`` in that directory and the table is dropped.
+    The net of its transactions is first added to the opening balances of their wallets, so
+    their reconciliation still accounts for them.
+    """
+    detached = []
+    for month in get_partition_months():
+        if add_months(month, 1) > before:
+            break
+        name = get_partition_name(month)
+        with transaction.atomic(), connection.cursor() as cursor:
+            # The rows of the partition cannot change between their sum and the detach.
+            cursor.execute(f"LOCK TABLE {name} IN SHARE ROW EXCLUSIVE MODE")
+            transactions = Transaction.objects.filter(
+                created_at__gte=f"{month} 00:00+00", created_at__lt=f"{add_months(month, 1)} 00:00+00"
+            )
+            add_opening_balances(get_transactions_net(transactions))
+            cursor.execute(f"ALTER TABLE {TRANSACTION_TABLE} DETACH PARTITION {name}")
+            if archive_dir is not None:
+                archive_partition(name, archive_dir)
+                cursor.execute(f"DROP TABLE {name}")
+        detached.append(name)
+    return detached
+
+
+def maintain_partitions() -> tuple[list[str], list[str]]:
+    """Create the partitions of the next months and detach the partitions past the retention period."""
+    this_month = timezone.now().date().replace(day=1)
+    created = create_partitions(this_month, add_months(this_month, settings.WALLETS_TRANSACTION_PARTITIONS_AHEAD))
+    if not settings.WALLETS_TRANSACTION_RETENTION_MONTHS:
+        return created, []
+    archive_dir = settings.WALLETS_TRANSACTION_ARCHIVE_DIR
+    detached = detach_partitions(
+        add_months(this_month, -settings.WALLETS_TRANSACTION_RETENTION_MONTHS),
+        Path(archive_dir) if archive_dir else None,
+    )
+    return created, detached
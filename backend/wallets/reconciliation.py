@@ -0,0 +1,202 @@
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import django
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F, Max, Min, Q
+from django.utils import timezone
+from wallets.models import BalanceMismatch, LedgerEntry, OpeningBalance, ReconciliationRun, Transaction, Wallet
+from wallets.services import get_current_balances, get_transactions_net
+
+OPENING_BALANCE_TABLE = OpeningBalance._meta.db_table
+# Opening balances upserted by one statement.
+OPENING_BALANCES_BATCH_SIZE = 1000
+
+
+def get_wallet_id_ranges(chunk_size: int) -> list[tuple[int, int]]:
+    """Ranges of ``chunk_size`` wallet ids, bounds included, covering all the wallets."""
+    bounds = Wallet.objects.aggregate(first_id=Min("id"), last_id=Max("id"))
+    if bounds["first_id"] is None:
+        return []
+    return [
+        (first_id, min(first_id + chunk_size - 1, bounds["last_id"]))
+        for first_id in range(bounds["first_id"], bounds["last_id"] + 1, chunk_size)
+    ]
+
+
+def get_watermark() -> datetime | None:
+    """
+    Time from which the wallets changed must be checked again: the start of the last finished run.
+
+    It is moved back by ``WALLETS_RECONCILIATION_OVERLAP`` seconds for the transactions created
+    before that run started but committed after it read their wallets.
+    """
+    last_run = ReconciliationRun.objects.filter(finished_at__isnull=False).order_by("-created_at").first()
+    if last_run is None:
+        return None
+    return last_run.created_at - timedelta(seconds=settings.WALLETS_RECONCILIATION_OVERLAP)
+
+
+def get_changed_wallet_ids(first_id: int, last_id: int, since: datetime) -> set[int]:
+    """
+    The wallets of the range with a transaction, a ledger entry or a change of their row
+    or of their opening balance since ``since``.
+    """
+    transactions = Transaction.objects.filter(created_at__gte=since)
+    wallet_ids = set(transactions.filter(wallet__id__range=(first_id, last_id)).values_list("wallet_id", flat=True))
+    wallet_ids.update(
+        transactions.filter(receiver__id__range=(first_id, last_id)).values_list("receiver_id", flat=True)
+    )
+    wallet_ids.update(
+        Wallet.objects.filter(id__range=(first_id, last_id), updated_at__gte=since).values_list("id", flat=True)
+    )
+    wallet_ids.update(
+        OpeningBalance.objects.filter(wallet__id__range=(first_id, last_id), updated_at__gte=since).values_list(
+            "wallet_id", flat=True
+        )
+    )
+    if settings.WALLETS_LEDGER_ENABLED:
+        wallet_ids.update(
+            LedgerEntry.objects.filter(wallet__id__range=(first_id, last_id), created_at__gte=since).values_list(
+                "wallet_id", flat=True
+            )
+        )
+    return wallet_ids
+
+
+def get_net_balances(first_id: int, last_id: int, wallet_ids: set[int] | None = None) -> list[tuple]:
+    """
+    The ``(id, balance, shard_count, net)`` rows of the wallets of the range, or of ``wallet_ids`` among them.
+
+    ``net`` is the opening balance of the wallet plus the balance change left by all its
+    stored transactions, as counted by ``get_transaction_deltas``: a cancellation reversed
+    the transaction it replaced, so it counts for nothing.
+    """
+    if wallet_ids is None:
+        wallet_ids = range(first_id, last_id + 1)
+        wallets = Wallet.objects.filter(id__range=(first_id, last_id))
+        transactions = Transaction.objects.filter(
+            Q(wallet__id__range=(first_id, last_id)) | Q(receiver__id__range=(first_id, last_id))
+        )
+    else:
+        wallets = Wallet.objects.filter(id__in=wallet_ids)
+        transactions = Transaction.objects.filter(Q(wallet_id__in=wallet_ids) | Q(receiver_id__in=wallet_ids))
+    net_changes = get_transactions_net(transactions, wallet_ids)
+    rows = wallets.order_by("id").values_list("id", "balance", "shard_count", "opening_balance__balance")
+    return [
+        (wallet_id, balance, shard_count, (opening_balance or Decimal("0.00")) + net_changes[wallet_id])
+        for wallet_id, balance, shard_count, opening_balance in rows
+    ]
+
+
+def add_opening_balances(changes: dict[int, Decimal]) -> None:
+    """
+    Add the ``changes`` to the opening balances of the wallets, for the balance changes no stored transaction records.
+
+    The rows are upserted in wallet id order, as the wallets are locked.
+    """
+    rows = [(wallet_id, change) for wallet_id, change in sorted(changes.items()) if change]
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), OPENING_BALANCES_BATCH_SIZE):
+            batch = rows[start : start + OPENING_BALANCES_BATCH_SIZE]
+            values = ", ".join(["(%s, %s, %s)"] * len(batch))
+            cursor.execute(
+                f"INSERT INTO {OPENING_BALANCE_TABLE} (wallet_id, balance, updated_at) VALUES {values} "
+                f"ON CONFLICT (wallet_id) DO UPDATE SET "
+                f"balance = {OPENING_BALANCE_TABLE}.balance + EXCLUDED.balance, updated_at = EXCLUDED.updated_at",
+                [value for wallet_id, change in batch for value in (wallet_id, change, now)],
+            )
+
+
+def accept_mismatches(wallet_ids: list[int] | None = None) -> int:
+    """
+    Take the balances of the mismatched wallets, or of ``wallet_ids`` among them, as correct.
+
+    The difference found by their last check is added to their opening balance, so a balance
+    edited outside of the API is reported once and then reconciled. Returns the wallets accepted.
+    """
+    mismatches = BalanceMismatch.objects.order_by("wallet_id")
+    if wallet_ids is not None:
+        mismatches = mismatches.filter(wallet_id__in=wallet_ids)
+    with transaction.atomic():
+        differences = {
+            wallet_id: balance - expected
+            for wallet_id, balance, expected in mismatches.select_for_update().values_list(
+                "wallet_id", "balance", "expected"
+            )
+        }
+        add_opening_balances(differences)
+        BalanceMismatch.objects.filter(wallet_id__in=differences).delete()
+    return len(differences)
+
+
+def reconcile_range(run_id: int, first_id: int, last_id: int) -> int:
+    """
+    Compare the balances of the wallets of the range with the net of their transactions.
+
+    A run with a ``since`` checks only the wallets changed since. The balances and the
+    transactions are read from one snapshot of the database. The mismatches of the checked
+    wallets replace their previous ones in ``BalanceMismatch``. Returns the mismatches found.
+    """
+    run = ReconciliationRun.objects.get(pk=run_id)
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ")
+        wallet_ids = None if run.since is None else get_changed_wallet_ids(first_id, last_id, run.since)
+        # No wallet of the range changed since the watermark.
+        rows = [] if wallet_ids == set() else get_net_balances(first_id, last_id, wallet_ids)
+        balances = get_current_balances(
+            (wallet_id, balance, shard_count) for wallet_id, balance, shard_count, _ in rows
+        )
+        mismatches = [
+            BalanceMismatch(wallet_id=wallet_id, run_id=run_id, balance=balances[wallet_id], expected=net)
+            for wallet_id, _, _, net in rows
+            if balances[wallet_id] != net
+        ]
+        BalanceMismatch.objects.filter(wallet_id__in=[row[0] for row in rows]).delete()
+        BalanceMismatch.objects.bulk_create(mismatches)
+    # Counted after the snapshot is released: the ranges of a run update its row concurrently.
+    ReconciliationRun.objects.filter(pk=run_id).update(
+        ranges_done=F("ranges_done") + 1,
+        wallets_checked=F("wallets_checked") + len(rows),
+        mismatches=F("mismatches") + len(mismatches),
+        updated_at=timezone.now(),
+    )
+    ReconciliationRun.objects.filter(pk=run_id, ranges_done=F("ranges"), finished_at__isnull=True).update(
+        finished_at=timezone.now()
+    )
+    return len(mismatches)
+
+
+def start_reconciliation(
+    full: bool = False, chunk_size: int | None = None
+) -> tuple[ReconciliationRun, list[tuple[int, int]]]:
+    """
+    Create a run and return it with its wallet id ranges, which ``reconcile_range`` checks one at a time.
+
+    The run checks the wallets changed since the watermark, or all of them when ``full`` or on
+    the first run.
+    """
+    ranges = get_wallet_id_ranges(chunk_size or settings.WALLETS_RECONCILIATION_CHUNK_SIZE)
+    run = ReconciliationRun.objects.create(since=None if full else get_watermark(), ranges=len(ranges))
+    if not ranges:
+        run.finished_at = timezone.now()
+        run.save(update_fields=["finished_at", "updated_at"])
+    return run, ranges
+
+
+def _reconcile_range(arguments: tuple[int, int, int]) -> int:
+    return reconcile_range(*arguments)
+
+
+def reconcile_in_processes(run: ReconciliationRun, ranges: list[tuple[int, int]], processes: int) -> int:
+    """Check the ranges of the run in a pool of ``processes`` processes, each with its own connection."""
+    # The connections of this process must not be shared with the forked workers.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=processes, initializer=django.setup) as executor:
+        return sum(executor.map(_reconcile_range, [(run.pk, first_id, last_id) for first_id, last_id in ranges]))
@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from django.conf import settings
+from rest_framework import serializers
+
+
+class DailyTotalsQuerySerializer(serializers.Serializer):
+    since = serializers.DateField(required=False)
+    until = serializers.DateField(required=False)
+    wallet_id = serializers.IntegerField(required=False)
+
+    def validate(self, attrs: dict[str, Any]):
+        until = attrs.setdefault("until", datetime.now(timezone.utc).date())
+        since = attrs.setdefault("since", until - timedelta(days=settings.WALLETS_ANALYTICS_DEFAULT_DAYS - 1))
+        if since > until:
+            raise serializers.ValidationError({"since": "The first day must not be after the last day."})
+        if (until - since).days >= settings.WALLETS_ANALYTICS_MAX_DAYS:
+            raise serializers.ValidationError(
+                {"since": f"The range must not be longer than {settings.WALLETS_ANALYTICS_MAX_DAYS} days."}
+            )
+        return attrs
+
+
+class TypeTotalsSerializer(serializers.Serializer):
+    count = serializers.IntegerField()
+    amount = serializers.DecimalField(max_digits=32, decimal_places=2)
+
+
+class DayTotalsSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    totals = serializers.DictField(child=TypeTotalsSerializer())
+
+
+class DailyTotalsSerializer(serializers.Serializer):
+    """Represents ``get_daily_totals``, with the amounts as strings whatever the renderer."""
+
+    since = serializers.DateField()
+    until = serializers.DateField()
+    days = DayTotalsSerializer(many=True)
+    totals = serializers.DictField(child=TypeTotalsSerializer())
@@ -1,36 +1,72 @@
+from collections.abc import Collection
 from decimal import Decimal
 from typing import Any
 
+from django.db import transaction
+from django.db.models import prefetch_related_objects
 from django_extended.constants import (
     MINIMUM_TRANSFER_RATE,
     RequestMethods,
     TransactionType,
 )
+from django_extended.metrics import count_transactions
+from django_extended.representations import ValuesRepresentation
+from django_extended.timing import timed
 from rest_framework import serializers
 from users.models import User
+from wallets.exceptions import InsufficientFundsError
+from wallets.loaders import get_wallet_loader
 from wallets.models import Transaction, Wallet
-from wallets.services import cancel_wallet_transactions, wallet_transactions
+from wallets.serializers.wallet_serializers import (
+    CurrentBalanceListSerializer,
+    CurrentBalanceSerializerMixin,
+)
+from wallets.services import (
+    cancel_wallet_transactions,
+    get_wallet_balance,
+    wallet_transactions,
+)
+from wallets.summaries import get_summary_item, update_daily_summaries
 
 
-class TransactionBaseSerializer(serializers.ModelSerializer):
+class TransactionBaseSerializer(CurrentBalanceSerializerMixin, serializers.ModelSerializer):
     wallet_balance = serializers.DecimalField(source="wallet.balance", max_digits=32, decimal_places=2, read_only=True)
 
+    @staticmethod
+    def get_balance_wallets(items: list[Transaction]) -> list[Wallet]:
+        # One query for the wallets of all the items, which are sharded or read from the ledger in one batch too.
+        prefetch_related_objects(items, "wallet")
+        return [item.wallet for item in items]
+
+    @timed("validate")
+    def run_validation(self, data=serializers.empty):
+        return super().run_validation(data)
+
     def validate_amount(self, amount: Decimal) -> Decimal:
         if amount < MINIMUM_TRANSFER_RATE:
             raise serializers.ValidationError({"amount": "Insufficient transfer amount, the minimum amount is 0.1"})
         return amount
 
+    def get_wallet(self, wallet_id: int | None) -> Wallet | None:
+        """Load the wallet from the request's ``WalletLoader``, together with the other wallets of the data."""
+        wallet_ids = {wallet_id}
+        if isinstance(self.initial_data, dict):
+            for field_name in ("wallet_id", "receiver_id"):
+                try:
+                    wallet_ids.add(int(self.initial_data.get(field_name)))
+                except (TypeError, ValueError):
+                    pass
+        return get_wallet_loader().load(wallet_ids).get(wallet_id)
+
     def validate_wallet_id(self, wallet_id: int) -> int:
-        wallet_exists = Wallet.objects.filter(id=wallet_id).exists()
-        if not wallet_exists:
+        if self.get_wallet(wallet_id) is None:
             raise serializers.ValidationError({"wallet_id": "The wallet does not exist."})
         return wallet_id
 
     def validate_receiver_id(self, receiver_id: int) -> int | None:
         if receiver_id is None:
             return
-        wallet_exists = Wallet.objects.filter(id=receiver_id).exists()
-        if not wallet_exists:
+        if self.get_wallet(receiver_id) is None:
             raise serializers.ValidationError({"receiver_id": "The wallet does not exist."})
         return receiver_id
 
@@ -45,10 +81,12 @@ class TransactionBaseSerializer(serializers.ModelSerializer):
             return
         if request_method == RequestMethods.PATCH and wallet_id is None:
             return
-        wallet = Wallet.objects.get(id=wallet_id)
+        wallet = self.get_wallet(wallet_id)
+        if wallet is None:
+            raise Wallet.DoesNotExist(f"Wallet {wallet_id} does not exist.")
         if (
             transaction_type == TransactionType.TRANSFER or transaction_type == TransactionType.WITHDRAW
-        ) and amount > wallet.balance:
+        ) and amount > get_wallet_balance(wallet):
             raise serializers.ValidationError(
                 {"amount": "There are not enough funds on the balance, enter a smaller amount"}
             )
@@ -60,13 +98,16 @@ class TransactionBaseSerializer(serializers.ModelSerializer):
         receiver_id: int,
         transaction_type: str,
         request_method: str,
+        user_wallets_ids: Collection[int] | None = None,
     ):
         if not transaction_type:
             return
+        if user_wallets_ids is None:
+            user_wallets_ids = user.get_wallets_ids()
         if (
             (transaction_type == TransactionType.WITHDRAW or transaction_type == TransactionType.TRANSFER)
             and not user.is_admin
-            and wallet_id not in user.get_wallets_ids()
+            and wallet_id not in user_wallets_ids
         ):
             raise serializers.ValidationError({"wallet_id": "The user must be the owner of the wallet."})
         if transaction_type == TransactionType.TRANSFER and not receiver_id:
@@ -89,11 +130,15 @@ class TransactionBaseSerializer(serializers.ModelSerializer):
         user = self.context["request"].user
         request_method = self.context["request"].method
         wallet_id = attrs.get("wallet_id", None)
-        receiver_id = attrs["receiver_id"]
+        receiver_id = attrs.get("receiver_id")
         amount = attrs.get("amount")
         transaction_type = attrs.get("transaction_type", "")
         self.validation_wallet_balance(wallet_id, amount, transaction_type, request_method)
-        self.validate_wallet_transaction(user, wallet_id, receiver_id, transaction_type, request_method)
+        wallet = self.get_wallet(wallet_id)
+        user_wallets_ids = {wallet.id} if wallet is not None and wallet.owner_id == user.pk else set()
+        self.validate_wallet_transaction(
+            user, wallet_id, receiver_id, transaction_type, request_method, user_wallets_ids
+        )
         return attrs
 
 
@@ -108,6 +153,7 @@ class TransactionListCreateSerializer(TransactionBaseSerializer):
 
     class Meta:
         model = Transaction
+        list_serializer_class = CurrentBalanceListSerializer
         fields = (
             "id",
             "wallet_id",
@@ -122,8 +168,25 @@ class TransactionListCreateSerializer(TransactionBaseSerializer):
         receiver_id = validated_data.get("receiver_id")
         amount = validated_data["amount"]
         transaction_type = validated_data["transaction_type"]
-        wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
-        return super().create(validated_data)
+        try:
+            with transaction.atomic():
+                wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
+                # The wallets loaded by the validation, updated by the services, are not read again.
+                wallets = get_wallet_loader().load([wallet_id, receiver_id])
+                validated_data["wallet"] = wallets[validated_data.pop("wallet_id")]
+                if receiver_id is not None:
+                    validated_data["receiver"] = wallets[validated_data.pop("receiver_id")]
+                instance = super().create(validated_data)
+                update_daily_summaries([instance])
+                transaction.on_commit(lambda: count_transactions([transaction_type]))
+                return instance
+        except InsufficientFundsError:
+            raise serializers.ValidationError(
+                {"amount": "There are not enough funds on the balance, enter a smaller amount"}
+            )
+
+
+transactions_list_representation = ValuesRepresentation(TransactionListCreateSerializer)
 
 
 class TransactionRetrieveUpdateSerializer(TransactionBaseSerializer):
@@ -134,6 +197,7 @@ class TransactionRetrieveUpdateSerializer(TransactionBaseSerializer):
 
     class Meta:
         model = Transaction
+        list_serializer_class = CurrentBalanceListSerializer
         fields = (
             "id",
             "wallet_id",
@@ -151,10 +215,88 @@ class TransactionRetrieveUpdateSerializer(TransactionBaseSerializer):
         amount = validated_data.get("amount", instance.amount)
         transaction_type = instance.transaction_type
         cancellation_type = validated_data.get("transaction_type")
-        wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
-        if cancellation_type and receiver_id is not None:
-            cancel_wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
-            instance.transaction_type = cancellation_type
-        instance.amount = amount
-        instance.save()
-        return super().update(instance, validated_data)
+        if cancellation_type and amount != instance.amount:
+            raise serializers.ValidationError({"amount": "A transaction is cancelled with its amount."})
+        previous = get_summary_item(instance)
+        try:
+            with transaction.atomic():
+                if cancellation_type:
+                    # The balance changes of the transaction are reversed, with the wallets locked once.
+                    cancel_wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
+                    instance.transaction_type = cancellation_type
+                else:
+                    wallet_transactions(wallet_id, receiver_id, amount, transaction_type)
+                instance.amount = amount
+                instance.save()
+                instance = super().update(instance, validated_data)
+                update_daily_summaries([instance], removed=[previous])
+                if cancellation_type:
+                    transaction.on_commit(lambda: count_transactions([cancellation_type]))
+                return instance
+        except InsufficientFundsError:
+            raise serializers.ValidationError(
+                {"amount": "There are not enough funds on the balance, enter a smaller amount"}
+            )
+
+
+class TransactionBatchItemSerializer(serializers.Serializer):
+    wallet_id = serializers.IntegerField()
+    receiver_id = serializers.IntegerField(required=False, allow_null=True)
+    amount = serializers.DecimalField(max_digits=32, decimal_places=2)
+    transaction_type = serializers.ChoiceField(choices=TransactionType.choices)
+
+    def validate_amount(self, amount: Decimal) -> Decimal:
+        if amount < MINIMUM_TRANSFER_RATE:
+            raise serializers.ValidationError("Insufficient transfer amount, the minimum amount is 0.1")
+        return amount
+
+
+@timed("validate")
+def validate_transactions_batch(user: User, data: list[Any]) -> tuple[list[dict[str, Any] | None], dict[int, Any]]:
+    """
+    Validate every item of a batch with one query for all the referenced wallets.
+
+    Returns the validated items, with ``None`` in place of an invalid one, and the errors by item index.
+    """
+    items: list[dict[str, Any] | None] = []
+    errors: dict[int, Any] = {}
+    # One serializer validates all the items, building its fields once instead of per item.
+    serializer = TransactionBatchItemSerializer()
+    for index, item in enumerate(data):
+        try:
+            items.append(dict(serializer.run_validation(item)))
+        except serializers.ValidationError as error:
+            items.append(None)
+            errors[index] = serializers.as_serializer_error(error)
+
+    wallets_ids = {item["wallet_id"] for item in items if item} | {
+        item["receiver_id"] for item in items if item and item.get("receiver_id") is not None
+    }
+    owners = dict(Wallet.objects.filter(id__in=wallets_ids).values_list("id", "owner_id"))
+    user_wallets_ids = {wallet_id for wallet_id, owner_id in owners.items() if owner_id == user.pk}
+    for index, item in enumerate(items):
+        if item is None:
+            continue
+        wallet_id = item["wallet_id"]
+        receiver_id = item.get("receiver_id")
+        item_errors = {}
+        if wallet_id not in owners:
+            item_errors["wallet_id"] = ["The wallet does not exist."]
+        if receiver_id is not None and receiver_id not in owners:
+            item_errors["receiver_id"] = ["The wallet does not exist."]
+        if not item_errors:
+            try:
+                TransactionBaseSerializer.validate_wallet_transaction(
+                    user,
+                    wallet_id,
+                    receiver_id,
+                    item["transaction_type"],
+                    RequestMethods.POST,
+                    user_wallets_ids,
+                )
+            except serializers.ValidationError as error:
+                item_errors = serializers.as_serializer_error(error)
+        if item_errors:
+            items[index] = None
+            errors[index] = item_errors
+    return items, errors
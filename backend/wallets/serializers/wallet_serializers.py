@@ -1,13 +1,40 @@
 from decimal import Decimal
 from typing import Any
 
+from django.conf import settings
 from django.core.validators import MinValueValidator
+from django.db import models, transaction
 from django_extended.constants import RequestMethods
+from django_extended.representations import ValuesRepresentation
 from rest_framework import serializers
+from wallets.balance_cache import invalidate_balances
 from wallets.models import Wallet
+from wallets.reconciliation import add_opening_balances
+from wallets.services import get_current_balances, load_current_balances, lock_wallets, set_wallet_balance
 
 
-class WalletsListCreateSerializer(serializers.ModelSerializer):
+class CurrentBalanceListSerializer(serializers.ListSerializer):
+    """Loads the current balances of the wallets of all items at once before the items are represented."""
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        load_current_balances(self.child.get_balance_wallets(items))
+        return super().to_representation(items)
+
+
+class CurrentBalanceSerializerMixin:
+    """Represents the wallets with their current balance, which is read from the ledger when it is enabled."""
+
+    @staticmethod
+    def get_balance_wallets(items: list[Wallet]) -> list[Wallet]:
+        return items
+
+    def to_representation(self, instance):
+        load_current_balances(self.get_balance_wallets([instance]))
+        return super().to_representation(instance)
+
+
+class WalletsListCreateSerializer(CurrentBalanceSerializerMixin, serializers.ModelSerializer):
     owner_id = serializers.IntegerField(required=False)
     balance = serializers.DecimalField(
         max_digits=32,
@@ -18,6 +45,7 @@ class WalletsListCreateSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Wallet
+        list_serializer_class = CurrentBalanceListSerializer
         fields = (
             "id",
             "owner_id",
@@ -41,11 +69,15 @@ class WalletsListCreateSerializer(serializers.ModelSerializer):
         return Wallet.objects.create(**validated_data)
 
 
-class WalletsRetrieveUpdateDestroySerializer(serializers.ModelSerializer):
+wallets_list_representation = ValuesRepresentation(WalletsListCreateSerializer)
+
+
+class WalletsRetrieveUpdateDestroySerializer(CurrentBalanceSerializerMixin, serializers.ModelSerializer):
     balance = serializers.DecimalField(max_digits=32, decimal_places=2, validators=[MinValueValidator(0.0)])
 
     class Meta:
         model = Wallet
+        list_serializer_class = CurrentBalanceListSerializer
         fields = (
             "id",
             "name",
@@ -58,10 +90,24 @@ class WalletsRetrieveUpdateDestroySerializer(serializers.ModelSerializer):
             raise serializers.ValidationError({"balance": "The user cannot change the balance"})
         return balance
 
+    def update(self, instance: Wallet, validated_data: dict[str, Any]):
+        if "balance" not in validated_data:
+            return super().update(instance, validated_data)
+        with transaction.atomic():
+            wallet = lock_wallets([instance.id])[instance.id]
+            balance = get_current_balances([(wallet.id, wallet.balance, wallet.shard_count)])[wallet.id]
+            # No transaction records the edit: the reconciliation of the wallet starts from it.
+            add_opening_balances({instance.id: validated_data["balance"] - balance})
+            if settings.WALLETS_LEDGER_ENABLED or wallet.shard_count:
+                set_wallet_balance(instance, validated_data.pop("balance"))
+            invalidate_balances([instance.id])
+            return super().update(instance, validated_data)
+
 
-class WalletsBalanceSerializer(serializers.ModelSerializer):
+class WalletsBalanceSerializer(CurrentBalanceSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Wallet
+        list_serializer_class = CurrentBalanceListSerializer
         fields = (
             "id",
             "balance",
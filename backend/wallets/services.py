@@ -1,38 +1,407 @@
+import functools
+import random
+from collections import defaultdict
+from collections.abc import Callable, Container, Iterable
 from decimal import Decimal
+from typing import Any
 
-from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import QuerySet, Sum
+from django.utils import timezone
 from django_extended.constants import TransactionType
-from wallets.models import Wallet
+from django_extended.metrics import count_transactions, observe_lock_wait
+from django_extended.timing import timed
+from wallets.balance_cache import write_through_balances
+from wallets.exceptions import InsufficientFundsError, ShardCountChangedError, WalletDoesNotExistError
+from wallets.ledger import get_ledger_balance, get_ledger_balances
+from wallets.loaders import get_wallet_loader
+from wallets.models import LedgerEntry, Transaction, Wallet, WalletBalanceShard
+from wallets.sharding import (
+    apply_shard_delta,
+    get_sharded_balances,
+    set_sharded_balance,
+)
+from wallets.summaries import update_daily_summaries
 
+# Attempts to lock the balances of wallets whose sharding changes in between, before giving up.
+LOCK_ATTEMPTS = 3
 
-def wallet_transactions(wallet_id: int, receiver_id: int | None, amount: Decimal, transaction_type: str):
-    wallet = Wallet.objects.get(id=wallet_id)
+
+def get_transaction_deltas(
+    wallet_id: int, receiver_id: int | None, amount: Decimal, transaction_type: str
+) -> dict[int, Decimal]:
+    """Return the balance change of every wallet touched by the transaction."""
     match transaction_type:
         case TransactionType.DEPOSIT:
-            wallet.balance += amount
+            return {wallet_id: amount}
         case TransactionType.WITHDRAW:
-            wallet.balance -= amount
+            return {wallet_id: -amount}
         case TransactionType.TRANSFER:
             if receiver_id is None:
-                return
-            with transaction.atomic():
-                receiver_wallet = Wallet.objects.get(id=receiver_id)
-                wallet.balance -= amount
-                receiver_wallet.balance += amount
-                receiver_wallet.save()
-    wallet.save()
+                return {}
+            return {wallet_id: -amount, receiver_id: amount}
+    return {}
 
 
-def cancel_wallet_transactions(wallet_id: int, receiver_id: int, amount: Decimal, transaction_type: str):
-    wallet = Wallet.objects.get(id=wallet_id)
-    match transaction_type:
-        case TransactionType.DEPOSIT:
-            wallet.balance -= amount
-        case TransactionType.WITHDRAW:
-            wallet.balance += amount
-        case TransactionType.TRANSFER:
-            receiver_wallet = Wallet.objects.get(id=receiver_id)
-            wallet.balance += amount
-            receiver_wallet.balance -= amount
-            receiver_wallet.save()
-    wallet.save()
+def get_transactions_net(
+    transactions: QuerySet[Transaction], wallet_ids: Container[int] | None = None
+) -> dict[int, Decimal]:
+    """
+    Return the net balance change left by the transactions on each wallet of ``wallet_ids``, or on every wallet.
+
+    The amounts are summed by sender, receiver and type in one grouped query.
+    """
+    net_changes: dict[int, Decimal] = defaultdict(Decimal)
+    totals = (
+        transactions.order_by()
+        .values("wallet_id", "receiver_id", "transaction_type")
+        .annotate(total=Sum("amount"))
+        .values_list("wallet_id", "receiver_id", "transaction_type", "total")
+    )
+    for wallet_id, receiver_id, transaction_type, total in totals:
+        for changed_id, delta in get_transaction_deltas(wallet_id, receiver_id, total, transaction_type).items():
+            if wallet_ids is None or changed_id in wallet_ids:
+                net_changes[changed_id] += delta
+    return net_changes
+
+
+def lock_wallets(wallet_ids: Iterable[int]) -> dict[int, Wallet]:
+    """
+    Lock the wallet rows in ascending id order.
+
+    Every writer takes its locks in the same order, so two concurrent transfers
+    between the same wallets wait for each other instead of deadlocking.
+    Must be called inside ``transaction.atomic()``.
+    """
+    with observe_lock_wait("update"):
+        wallets = list(Wallet.objects.select_for_update().filter(id__in=set(wallet_ids)).order_by("id"))
+    return {wallet.id: wallet for wallet in wallets}
+
+
+def lock_ledger_wallets(debited_ids: Iterable[int], credited_ids: Iterable[int]) -> set[int]:
+    """
+    Lock the wallet rows touched by new ledger entries in ascending id order and return the existing ids.
+
+    Debited wallets are locked ``FOR NO KEY UPDATE``, so the funds checks of one wallet
+    run one at a time. Credited wallets are only locked ``FOR KEY SHARE``, which does not
+    conflict with either lock, so credits never wait for other writers. Both conflict with
+    the ``FOR UPDATE`` lock of the snapshotter, which therefore waits for the entries in
+    flight to commit. Must be called inside ``transaction.atomic()``.
+    """
+    debited_ids = set(debited_ids)
+    modes = {wallet_id: "NO KEY UPDATE" for wallet_id in debited_ids}
+    modes.update((wallet_id, "KEY SHARE") for wallet_id in set(credited_ids) - debited_ids)
+    existing_ids = set()
+    run: list[int] = []
+    with connection.cursor() as cursor:
+        for wallet_id in sorted(modes) + [None]:
+            if run and (wallet_id is None or modes[wallet_id] != modes[run[0]]):
+                with observe_lock_wait(modes[run[0]].lower().replace(" ", "_")):
+                    cursor.execute(
+                        f"SELECT id FROM {Wallet._meta.db_table} WHERE id = ANY(%s) ORDER BY id FOR {modes[run[0]]}",
+                        [run],
+                    )
+                existing_ids.update(row[0] for row in cursor.fetchall())
+                run = []
+            run.append(wallet_id)
+    return existing_ids
+
+
+def lock_row_balances(
+    wallet_ids: Iterable[int], debited_ids: set[int]
+) -> tuple[dict[int, Wallet], dict[int, list[WalletBalanceShard]]]:
+    """
+    Lock the balances of the wallets in ascending id order and return the locked rows.
+
+    A plain wallet is locked by its row. A sharded wallet is locked by its shards
+    instead: a credit locks one random shard, so concurrent credits of a hot wallet
+    mostly wait for nobody, and a debit locks all of them to check the funds.
+    The shard counts of the wallets loaded by the request are used when they are all loaded.
+    Raises ``ShardCountChangedError`` if the sharding of a wallet changed in between: see
+    ``retry_sharding_changes``. Must be called inside ``transaction.atomic()``.
+    """
+    wallet_ids = set(wallet_ids)
+    loader = get_wallet_loader()
+    loaded = loader.get_loaded(wallet_ids)
+    if loaded is not None:
+        shard_counts = {wallet_id: wallet.shard_count for wallet_id, wallet in loaded.items()}
+    else:
+        shard_counts = dict(Wallet.objects.filter(id__in=wallet_ids).values_list("id", "shard_count"))
+    wallets: dict[int, Wallet] = {}
+    shards: dict[int, list[WalletBalanceShard]] = {}
+    plain_ids: list[int] = []
+    for wallet_id in sorted(shard_counts) + [None]:
+        if wallet_id is not None and not shard_counts[wallet_id]:
+            plain_ids.append(wallet_id)
+            continue
+        if plain_ids:
+            wallets.update(lock_wallets(plain_ids))
+            plain_ids = []
+        if wallet_id is None:
+            break
+        wallet_shards = WalletBalanceShard.objects.select_for_update().filter(wallet_id=wallet_id)
+        if wallet_id not in debited_ids:
+            wallet_shards = wallet_shards.filter(index=random.randrange(shard_counts[wallet_id]))
+        with observe_lock_wait("shard"):
+            shards[wallet_id] = list(wallet_shards.order_by("index"))
+    changed_ids = sorted(
+        [wallet.id for wallet in wallets.values() if wallet.shard_count]
+        + [wallet_id for wallet_id, wallet_shards in shards.items() if not wallet_shards]
+    )
+    if changed_ids:
+        loader.discard(changed_ids)
+        raise ShardCountChangedError(changed_ids)
+    return wallets, shards
+
+
+def retry_sharding_changes(func: Callable) -> Callable:
+    """
+    Call the function again when the sharding of a wallet changed while ``lock_row_balances`` locked it.
+
+    The function must lock in its own ``transaction.atomic()`` block: leaving it rolls back
+    the locks of the failed attempt, so the next attempt locks in ascending id order again.
+    ``ShardCountChangedError`` is raised after ``LOCK_ATTEMPTS``.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(1, LOCK_ATTEMPTS + 1):
+            try:
+                return func(*args, **kwargs)
+            except ShardCountChangedError:
+                if attempt == LOCK_ATTEMPTS:
+                    raise
+
+    return wrapper
+
+
+@retry_sharding_changes
+def update_wallet_balances(deltas: dict[int, Decimal]) -> None:
+    """Check the funds and apply all balance changes in one short transaction."""
+    with transaction.atomic():
+        debited_ids = {wallet_id for wallet_id, delta in deltas.items() if delta < Decimal("0.0")}
+        wallets, shards = lock_row_balances(deltas, debited_ids)
+        for wallet_id, delta in deltas.items():
+            if wallet_id in shards:
+                balance = sum(shard.balance for shard in shards[wallet_id])
+            elif wallet_id in wallets:
+                balance = wallets[wallet_id].balance
+            else:
+                raise Wallet.DoesNotExist(f"Wallet {wallet_id} does not exist.")
+            if delta < Decimal("0.0") and balance + delta < Decimal("0.0"):
+                raise InsufficientFundsError(wallet_id)
+        now = timezone.now()
+        for wallet in wallets.values():
+            wallet.balance += deltas[wallet.id]
+            wallet.updated_at = now
+        Wallet.objects.bulk_update(wallets.values(), ["balance", "updated_at"])
+        get_wallet_loader().add(wallets.values())
+        changed_shards = []
+        for wallet_id, wallet_shards in shards.items():
+            changed_shards.extend(apply_shard_delta(wallet_shards, deltas[wallet_id]))
+        WalletBalanceShard.objects.bulk_update(changed_shards, ["balance"])
+
+
+def post_ledger_entries(deltas: dict[int, Decimal], transaction_type: str = "") -> None:
+    """
+    Write one ledger entry per balance change.
+
+    Only the debited wallets are locked exclusively, to check their funds; see ``lock_ledger_wallets``.
+    """
+    with transaction.atomic():
+        debited_ids = [wallet_id for wallet_id, delta in deltas.items() if delta < Decimal("0.0")]
+        existing_ids = lock_ledger_wallets(debited_ids, deltas)
+        for wallet_id in deltas:
+            if wallet_id not in existing_ids:
+                raise Wallet.DoesNotExist(f"Wallet {wallet_id} does not exist.")
+        balances = get_ledger_balances(debited_ids)
+        for wallet_id in debited_ids:
+            if balances[wallet_id] + deltas[wallet_id] < Decimal("0.0"):
+                raise InsufficientFundsError(wallet_id)
+        LedgerEntry.objects.bulk_create(
+            LedgerEntry(wallet_id=wallet_id, amount=delta, transaction_type=transaction_type)
+            for wallet_id, delta in deltas.items()
+        )
+
+
+def apply_balance_deltas(deltas: dict[int, Decimal], transaction_type: str = "") -> None:
+    if not deltas:
+        return
+    if settings.WALLETS_LEDGER_ENABLED:
+        post_ledger_entries(deltas, transaction_type)
+    else:
+        update_wallet_balances(deltas)
+    write_through_balances(deltas)
+
+
+def get_wallet_balance(wallet: Wallet) -> Decimal:
+    if settings.WALLETS_LEDGER_ENABLED:
+        return get_ledger_balance(wallet.id)
+    if wallet.shard_count:
+        return get_sharded_balances([wallet.id]).get(wallet.id, Decimal("0.0"))
+    return wallet.balance
+
+
+def set_wallet_balance(wallet: Wallet, balance: Decimal) -> None:
+    """Set the balance of a wallet whose ``Wallet.balance`` column does not hold it."""
+    if settings.WALLETS_LEDGER_ENABLED:
+        set_ledger_balance(wallet.id, balance)
+    else:
+        set_sharded_balance(wallet.id, balance)
+
+
+def load_current_balances(wallets: Iterable[Wallet]) -> None:
+    """
+    Set ``balance`` of the wallets to their current balance with one batch of queries.
+
+    Only needed with the ledger enabled or for sharded wallets, where the ``Wallet.balance``
+    column is not kept up to date. A wallet is loaded once, so the list serializers can
+    prefetch the balances of all their items before each item is represented.
+    """
+    wallets = [wallet for wallet in wallets if not getattr(wallet, "_current_balance_loaded", False)]
+    if not settings.WALLETS_LEDGER_ENABLED:
+        wallets = [wallet for wallet in wallets if wallet.shard_count]
+    if not wallets:
+        return
+    balances = get_current_balances((wallet.id, wallet.balance, wallet.shard_count) for wallet in wallets)
+    for wallet in wallets:
+        wallet.balance = balances[wallet.id]
+        wallet._current_balance_loaded = True
+
+
+async def aload_current_balances(wallets: list[Wallet]) -> None:
+    """Async ``load_current_balances``, which skips the hop to the sync thread when the balance columns are current."""
+    if settings.WALLETS_LEDGER_ENABLED or any(wallet.shard_count for wallet in wallets):
+        await sync_to_async(load_current_balances)(wallets)
+
+
+def get_current_balances(wallets: Iterable[tuple[int, Decimal, int]]) -> dict[int, Decimal]:
+    """
+    Return the current balances of the wallets given as ``(id, balance, shard_count)`` rows.
+
+    ``load_current_balances`` for the rows of ``values_list``: the ``balance`` column is
+    returned as is, unless the ledger is enabled or the wallet is sharded.
+    """
+    wallets = list(wallets)
+    balances = {wallet_id: balance for wallet_id, balance, _ in wallets}
+    if settings.WALLETS_LEDGER_ENABLED:
+        stale_ids = list(balances)
+        current = get_ledger_balances(stale_ids)
+    else:
+        stale_ids = [wallet_id for wallet_id, _, shard_count in wallets if shard_count]
+        current = get_sharded_balances(stale_ids) if stale_ids else {}
+    for wallet_id in stale_ids:
+        balances[wallet_id] = current.get(wallet_id, Decimal("0.0"))
+    return balances
+
+
+async def aget_current_balances(wallets: list[tuple[int, Decimal, int]]) -> dict[int, Decimal]:
+    """Async ``get_current_balances``, which skips the hop to the sync thread when the balance columns are current."""
+    if settings.WALLETS_LEDGER_ENABLED or any(shard_count for _, _, shard_count in wallets):
+        return await sync_to_async(get_current_balances)(wallets)
+    return get_current_balances(wallets)
+
+
+def set_ledger_balance(wallet_id: int, balance: Decimal) -> None:
+    """Record the difference to the requested balance as an adjustment entry."""
+    with transaction.atomic():
+        lock_wallets([wallet_id])
+        delta = balance - get_ledger_balance(wallet_id)
+        if delta:
+            LedgerEntry.objects.create(wallet_id=wallet_id, amount=delta)
+
+
+@timed("balances")
+def wallet_transactions(wallet_id: int, receiver_id: int | None, amount: Decimal, transaction_type: str):
+    deltas = get_transaction_deltas(wallet_id, receiver_id, amount, transaction_type)
+    apply_balance_deltas(deltas, transaction_type)
+
+
+@timed("balances")
+def cancel_wallet_transactions(wallet_id: int, receiver_id: int | None, amount: Decimal, transaction_type: str):
+    deltas = get_transaction_deltas(wallet_id, receiver_id, amount, transaction_type)
+    apply_balance_deltas(
+        {changed_wallet_id: -delta for changed_wallet_id, delta in deltas.items()},
+        TransactionType.CANCELLATION,
+    )
+
+
+@timed("balances")
+@retry_sharding_changes
+def create_transactions(items: list[dict[str, Any]]) -> list[Transaction | Exception]:
+    """
+    Apply the validated transactions in order within one database transaction.
+
+    All wallets are locked at once, the funds are checked against running balances and
+    the changes are written with one bulk statement per table. The wallets are locked
+    as by a single transfer: see ``lock_ledger_wallets`` and ``lock_row_balances``.
+    An item that cannot be applied is skipped and its error is returned in place of the transaction.
+    """
+    item_deltas = [
+        get_transaction_deltas(item["wallet_id"], item.get("receiver_id"), item["amount"], item["transaction_type"])
+        for item in items
+    ]
+    results: list[Transaction | Exception] = []
+    debited_ids = {wallet_id for deltas in item_deltas for wallet_id, delta in deltas.items() if delta < 0}
+    wallet_ids = {wallet_id for deltas in item_deltas for wallet_id in deltas}
+    with transaction.atomic():
+        ledger_enabled = settings.WALLETS_LEDGER_ENABLED
+        if ledger_enabled:
+            existing_ids = lock_ledger_wallets(debited_ids, wallet_ids)
+            balances = get_ledger_balances(debited_ids & existing_ids)
+        else:
+            wallets, shards = lock_row_balances(wallet_ids, debited_ids)
+            existing_ids = wallets.keys() | shards.keys()
+            balances = {wallet_id: wallet.balance for wallet_id, wallet in wallets.items()}
+            shard_balances = {
+                wallet_id: sum(shard.balance for shard in wallet_shards) for wallet_id, wallet_shards in shards.items()
+            }
+            balances.update(shard_balances)
+        changed_ids = set()
+        entries = []
+        for item, deltas in zip(items, item_deltas, strict=True):
+            error = _check_deltas(deltas, balances, existing_ids)
+            if error is not None:
+                results.append(error)
+                continue
+            for wallet_id, delta in deltas.items():
+                if wallet_id in balances:
+                    balances[wallet_id] += delta
+                changed_ids.add(wallet_id)
+                if ledger_enabled:
+                    entries.append(
+                        LedgerEntry(wallet_id=wallet_id, amount=delta, transaction_type=item["transaction_type"])
+                    )
+            results.append(Transaction(**item))
+
+        if ledger_enabled:
+            LedgerEntry.objects.bulk_create(entries)
+        elif changed_ids:
+            now = timezone.now()
+            changed_wallets = [wallets[wallet_id] for wallet_id in changed_ids if wallet_id in wallets]
+            for wallet in changed_wallets:
+                wallet.balance = balances[wallet.id]
+                wallet.updated_at = now
+            Wallet.objects.bulk_update(changed_wallets, ["balance", "updated_at"])
+            changed_shards = []
+            for wallet_id in changed_ids & shards.keys():
+                delta = balances[wallet_id] - shard_balances[wallet_id]
+                changed_shards.extend(apply_shard_delta(shards[wallet_id], delta))
+            WalletBalanceShard.objects.bulk_update(changed_shards, ["balance"])
+        created = [result for result in results if isinstance(result, Transaction)]
+        Transaction.objects.bulk_create(created)
+        update_daily_summaries(created)
+        transaction.on_commit(lambda: count_transactions(item.transaction_type for item in created))
+        write_through_balances(changed_ids)
+    return results
+
+
+def _check_deltas(deltas: dict[int, Decimal], balances: dict[int, Decimal], existing_ids: set[int]) -> Exception | None:
+    for wallet_id, delta in deltas.items():
+        if wallet_id not in existing_ids:
+            return WalletDoesNotExistError(wallet_id)
+        if delta < Decimal("0.0") and balances[wallet_id] + delta < Decimal("0.0"):
+            return InsufficientFundsError(wallet_id)
+    return None
@@ -0,0 +1,70 @@
+import random
+from collections.abc import Iterable
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import Sum
+from wallets.models import Wallet, WalletBalanceShard
+
+
+def get_sharded_balances(wallet_ids: Iterable[int]) -> dict[int, Decimal]:
+    totals = (
+        WalletBalanceShard.objects.filter(wallet_id__in=set(wallet_ids))
+        .values("wallet_id")
+        .annotate(total=Sum("balance"))
+        .values_list("wallet_id", "total")
+    )
+    return dict(totals)
+
+
+def spread_balance(shards: list[WalletBalanceShard], balance: Decimal) -> list[WalletBalanceShard]:
+    """Split the balance evenly over the shards, the first shard takes the remaining cents."""
+    share = (balance / len(shards)).quantize(Decimal("0.01"), rounding=ROUND_DOWN)
+    for shard in shards:
+        shard.balance = share
+    shards[0].balance += balance - share * len(shards)
+    return shards
+
+
+def apply_shard_delta(shards: list[WalletBalanceShard], delta: Decimal) -> list[WalletBalanceShard]:
+    """
+    Apply a balance change to the locked shards of a wallet and return the changed shards.
+
+    A credit goes to a random shard. A debit is drawn from the largest shard; when no
+    shard covers it alone, the rest of the balance is spread evenly over all the shards.
+    The funds must have been checked against the sum of all the shards before a debit.
+    """
+    if delta >= Decimal("0.0"):
+        shard = random.choice(shards)
+        shard.balance += delta
+        return [shard]
+    shard = max(shards, key=lambda shard: shard.balance)
+    if shard.balance + delta >= Decimal("0.0"):
+        shard.balance += delta
+        return [shard]
+    return spread_balance(shards, sum(shard.balance for shard in shards) + delta)
+
+
+def set_shard_count(wallet_id: int, shard_count: int) -> None:
+    """Move the balance of the wallet into ``shard_count`` shards, or back into its row for zero."""
+    with transaction.atomic():
+        wallet = Wallet.objects.select_for_update().get(id=wallet_id)
+        shards = list(WalletBalanceShard.objects.select_for_update().filter(wallet_id=wallet_id))
+        balance = wallet.balance + sum(shard.balance for shard in shards)
+        WalletBalanceShard.objects.filter(wallet_id=wallet_id).delete()
+        if shard_count:
+            shards = [WalletBalanceShard(wallet_id=wallet_id, index=index) for index in range(shard_count)]
+            WalletBalanceShard.objects.bulk_create(spread_balance(shards, balance))
+            balance = Decimal("0.0")
+        wallet.balance = balance
+        wallet.shard_count = shard_count
+        wallet.save(update_fields=["balance", "shard_count", "updated_at"])
+
+
+def set_sharded_balance(wallet_id: int, balance: Decimal) -> None:
+    with transaction.atomic():
+        shards = list(WalletBalanceShard.objects.select_for_update().filter(wallet_id=wallet_id).order_by("index"))
+        if not shards:
+            Wallet.objects.filter(id=wallet_id).update(balance=balance)
+            return
+        WalletBalanceShard.objects.bulk_update(spread_balance(shards, balance), ["balance"])
@@ -0,0 +1,184 @@
+import os
+from collections import defaultdict
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django_extended.constants import TransactionType
+from django_extended.renderers import NDJSONRenderer
+from wallets.models import LedgerEntry, Transaction, Wallet
+from wallets.partitions import add_months
+from wallets.services import get_current_balances, get_transaction_deltas, get_transactions_net
+
+
+def get_month_bounds(month: date) -> tuple[datetime, datetime]:
+    start = datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+    return start, datetime.combine(add_months(month, 1), start.timetz())
+
+
+def get_statements_path(month: date, first_id: int, last_id: int) -> Path:
+    return Path(settings.WALLETS_STATEMENTS_DIR) / f"{month:%Y-%m}" / f"statements-{first_id}-{last_id}.ndjson"
+
+
+def get_wallet_id_ranges(month: date, chunk_size: int) -> list[tuple[int, int]]:
+    """Ranges of ``chunk_size`` wallet ids, bounds included, covering the wallets created by the end of ``month``."""
+    bounds = Wallet.objects.filter(created_at__lt=get_month_bounds(month)[1]).aggregate(
+        first_id=Min("id"), last_id=Max("id")
+    )
+    if bounds["first_id"] is None:
+        return []
+    return [
+        (first_id, min(first_id + chunk_size - 1, bounds["last_id"]))
+        for first_id in range(bounds["first_id"], bounds["last_id"] + 1, chunk_size)
+    ]
+
+
+def get_pending_ranges(month: date, chunk_size: int) -> list[tuple[int, int]]:
+    """The wallet id ranges whose statements file is not written yet, so an interrupted run resumes where it stopped."""
+    return [
+        (first_id, last_id)
+        for first_id, last_id in get_wallet_id_ranges(month, chunk_size)
+        if not get_statements_path(month, first_id, last_id).exists()
+    ]
+
+
+def _get_ledger_changes(first_id: int, last_id: int, since: datetime) -> dict[int, Decimal]:
+    """Net balance change of the wallets of the range from ``since`` until now, read from the ledger."""
+    net_changes: dict[int, Decimal] = defaultdict(Decimal)
+    entries = LedgerEntry.objects.filter(wallet__id__range=(first_id, last_id), created_at__gte=since)
+    net_changes.update(entries.values("wallet_id").annotate(total=Sum("amount")).values_list("wallet_id", "total"))
+    return net_changes
+
+
+def _get_transactions_net(first_id: int, last_id: int, **filters: Any) -> dict[int, Decimal]:
+    """Net balance change left on the wallets of the range by their transactions matching ``filters``."""
+    transactions = Transaction.objects.filter(
+        Q(wallet__id__range=(first_id, last_id)) | Q(receiver__id__range=(first_id, last_id)),
+        **filters,
+    )
+    return get_transactions_net(transactions, range(first_id, last_id + 1))
+
+
+def _get_month_balances(
+    first_id: int, last_id: int, start: datetime, end: datetime, wallet_rows: list[tuple]
+) -> dict[int, tuple[Decimal, Decimal]]:
+    """Opening and closing balances of the month of the ``(id, balance, shard_count, opening)`` wallet rows."""
+    month_balances = {}
+    if settings.WALLETS_LEDGER_ENABLED:
+        balances = get_current_balances(row[:3] for row in wallet_rows)
+        changes_since_start = _get_ledger_changes(first_id, last_id, start)
+        changes_since_end = _get_ledger_changes(first_id, last_id, end)
+        for wallet_id, *_ in wallet_rows:
+            closing_balance = balances[wallet_id] - changes_since_end[wallet_id]
+            opening_balance = closing_balance - (changes_since_start[wallet_id] - changes_since_end[wallet_id])
+            month_balances[wallet_id] = (opening_balance, closing_balance)
+        return month_balances
+    net_before = _get_transactions_net(first_id, last_id, created_at__lt=start)
+    net_of_month = _get_transactions_net(first_id, last_id, created_at__gte=start, created_at__lt=end)
+    for wallet_id, _, _, opening in wallet_rows:
+        opening_balance = (opening or Decimal("0.00")) + net_before[wallet_id]
+        month_balances[wallet_id] = (opening_balance, opening_balance + net_of_month[wallet_id])
+    return month_balances
+
+
+def build_statements(month: date, first_id: int, last_id: int) -> list[dict[str, Any]]:
+    """
+    Statements of ``month`` of the wallets with an id from ``first_id`` to ``last_id``.
+
+    The queries cover the whole range of wallets: their balances at the start and the end
+    of the month, the totals of the month by transaction type and its transactions. As in
+    the reconciliation, the opening balance is the one the wallet started from, which holds
+    the balance edits of the admins and the detached partitions, plus the net of the
+    transactions before the month, and the closing balance adds those of the month. With
+    the ledger enabled, the closing balance is the current one less the ledger entries made
+    since the end of the month, so its adjustments count when they were made.
+    """
+    start, end = get_month_bounds(month)
+    wallet_rows = list(
+        Wallet.objects.filter(id__range=(first_id, last_id), created_at__lt=end)
+        .order_by("id")
+        .values_list("id", "balance", "shard_count", "opening_balance__balance")
+    )
+    if not wallet_rows:
+        return []
+    month_balances = _get_month_balances(first_id, last_id, start, end, wallet_rows)
+
+    statements = {}
+    for wallet_id, (opening_balance, closing_balance) in month_balances.items():
+        statements[wallet_id] = {
+            "wallet_id": wallet_id,
+            "month": f"{month:%Y-%m}",
+            "opening_balance": opening_balance,
+            "closing_balance": closing_balance,
+            "totals": {},
+            "received_transfers": {"count": 0, "amount": Decimal("0.00")},
+            "transactions": [],
+        }
+
+    transactions = Transaction.objects.filter(created_at__gte=start, created_at__lt=end)
+    totals = (
+        transactions.filter(wallet__id__range=(first_id, last_id))
+        .values("wallet_id", "transaction_type")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .values_list("wallet_id", "transaction_type", "count", "amount")
+    )
+    for wallet_id, transaction_type, count, amount in totals:
+        if wallet_id in statements:
+            statements[wallet_id]["totals"][transaction_type] = {"count": count, "amount": amount}
+    received = (
+        transactions.filter(receiver__id__range=(first_id, last_id), transaction_type=TransactionType.TRANSFER)
+        .values("receiver_id")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .values_list("receiver_id", "count", "amount")
+    )
+    for wallet_id, count, amount in received:
+        if wallet_id in statements:
+            statements[wallet_id]["received_transfers"] = {"count": count, "amount": amount}
+
+    items = (
+        transactions.filter(Q(wallet__id__range=(first_id, last_id)) | Q(receiver__id__range=(first_id, last_id)))
+        .order_by("created_at", "id")
+        .values_list("id", "created_at", "wallet_id", "receiver_id", "amount", "transaction_type")
+    )
+    for transaction_id, created_at, wallet_id, receiver_id, amount, transaction_type in items.iterator():
+        deltas = get_transaction_deltas(wallet_id, receiver_id, amount, transaction_type)
+        for own_id, counterparty_id in ((wallet_id, receiver_id), (receiver_id, wallet_id)):
+            if own_id in statements:
+                statements[own_id]["transactions"].append(
+                    {
+                        "id": transaction_id,
+                        "created_at": created_at,
+                        "transaction_type": transaction_type,
+                        "amount": deltas.get(own_id, Decimal("0.00")),
+                        "counterparty_id": counterparty_id,
+                    }
+                )
+    return list(statements.values())
+
+
+def write_statements(month: date, first_id: int, last_id: int) -> int:
+    """
+    Write the statements of the wallet id range to its file, one JSON statement per line.
+
+    The file is written under a temporary name and renamed once complete, so its presence
+    marks the range as done. A range already written is skipped. Returns the statements written.
+    """
+    path = get_statements_path(month, first_id, last_id)
+    if path.exists():
+        return 0
+    outermost = not connection.in_atomic_block
+    with transaction.atomic():
+        if outermost:
+            # One snapshot of the database for all the queries, so the balances and the changes agree.
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+        statements = build_statements(month, first_id, last_id)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary_path = path.with_name(f".{path.name}.{os.getpid()}")
+    temporary_path.write_bytes(NDJSONRenderer().render(statements))
+    os.replace(temporary_path, path)
+    return len(statements)
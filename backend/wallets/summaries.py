@@ -0,0 +1,171 @@
+import random
+from collections import defaultdict
+from collections.abc import Iterable
+from datetime import date, timedelta, timezone
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django_extended.timing import timed
+from wallets.models import DailyWalletSummary, Transaction
+
+SUMMARY_TABLE = DailyWalletSummary._meta.db_table
+TRANSACTION_TABLE = Transaction._meta.db_table
+
+# (wallet_id, day, transaction_type) of a daily summary row.
+SummaryKey = tuple[int, date, str]
+
+
+def get_summary_item(instance: Transaction) -> tuple[SummaryKey, Decimal]:
+    """Key of the daily summary the transaction counts in, and its amount."""
+    day = instance.created_at.astimezone(timezone.utc).date()
+    return (instance.wallet_id, day, instance.transaction_type), instance.amount
+
+
+@timed("summaries")
+def update_daily_summaries(added: Iterable[Transaction], removed: Iterable[tuple[SummaryKey, Decimal]] = ()) -> None:
+    """
+    Count the ``added`` transactions in the daily summaries and take the ``removed`` items out of them.
+
+    Runs within the database transaction that writes the transactions, so the summaries change
+    when it commits. The rows are upserted in key order, as the wallets are locked, and last,
+    so the locks on the rows of a busy day are held for as short a time as possible. They are
+    the rows of one of the ``WALLETS_SUMMARY_SHARDS`` of their keys, taken at random, so the
+    concurrent transactions of a wallet, such as the deposits to a hot wallet, mostly lock
+    different rows; the readers sum the shards.
+    """
+    changes: dict[SummaryKey, list] = defaultdict(lambda: [0, Decimal("0.00")])
+    for key, amount in map(get_summary_item, added):
+        changes[key][0] += 1
+        changes[key][1] += amount
+    for key, amount in removed:
+        changes[key][0] -= 1
+        changes[key][1] -= amount
+    shard = random.randrange(settings.WALLETS_SUMMARY_SHARDS)
+    rows = [(*key, shard, count, amount) for key, (count, amount) in sorted(changes.items()) if count or amount]
+    if not rows:
+        return
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {SUMMARY_TABLE} (wallet_id, day, transaction_type, shard, count, amount) VALUES {values} "
+            f"ON CONFLICT (wallet_id, day, transaction_type, shard) DO UPDATE SET "
+            f"count = {SUMMARY_TABLE}.count + EXCLUDED.count, amount = {SUMMARY_TABLE}.amount + EXCLUDED.amount",
+            [value for row in rows for value in row],
+        )
+
+
+def rebuild_daily_summaries(since: date, until: date) -> int:
+    """
+    Recompute the summaries of the days from ``since`` to ``until`` from the transactions, a day at a time.
+
+    The summary table is locked against the upserts of the transactions for the rebuild of a
+    day: the transactions committed before are counted by the rebuild, and those committing
+    after add themselves to the rebuilt rows. The totals of a key are rebuilt into its first
+    shard. Returns the number of summary rows written.
+    """
+    written = 0
+    day = since
+    while day <= until:
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(f"LOCK TABLE {SUMMARY_TABLE} IN SHARE ROW EXCLUSIVE MODE")
+            cursor.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE day = %s", [day])
+            cursor.execute(
+                f"INSERT INTO {SUMMARY_TABLE} (wallet_id, day, transaction_type, shard, count, amount) "
+                f"SELECT wallet_id, %s, transaction_type, 0, COUNT(*), SUM(amount) FROM {TRANSACTION_TABLE} "
+                f"WHERE created_at >= %s AND created_at < %s GROUP BY wallet_id, transaction_type",
+                [day, f"{day} 00:00+00", f"{day + timedelta(days=1)} 00:00+00"],
+            )
+            written += cursor.rowcount
+        day += timedelta(days=1)
+    return written
+
+
+def check_daily_summaries(since: date, until: date) -> list[dict]:
+    """
+    Compare the summaries of the days from ``since`` to ``until`` with the sums of the transactions.
+
+    Returns the keys whose count or amount differ, with both values. A summary left at zero by
+    cancellations matches a key without transactions. The days before the oldest monthly
+    partition without any transaction left were detached with their partition, which keeps
+    their summaries: they are skipped.
+    """
+    # Imported here: the partitions module depends on the services, which update the summaries.
+    from wallets.partitions import get_partition_months
+
+    expected = {
+        (wallet_id, day, transaction_type): (count, amount)
+        for wallet_id, day, transaction_type, count, amount in (
+            Transaction.objects.filter(
+                created_at__gte=f"{since} 00:00+00", created_at__lt=f"{until + timedelta(days=1)} 00:00+00"
+            )
+            .annotate(day=TruncDate("created_at", tzinfo=timezone.utc))
+            .values("wallet_id", "day", "transaction_type")
+            .annotate(count=Count("id"), total=Sum("amount"))
+            .values_list("wallet_id", "day", "transaction_type", "count", "total")
+        )
+    }
+    summaries = {
+        (wallet_id, day, transaction_type): (count, amount)
+        for wallet_id, day, transaction_type, count, amount in (
+            DailyWalletSummary.objects.filter(day__range=(since, until))
+            .values("wallet_id", "day", "transaction_type")
+            .annotate(total_count=Sum("count"), total_amount=Sum("amount"))
+            .values_list("wallet_id", "day", "transaction_type", "total_count", "total_amount")
+        )
+        if count or amount
+    }
+    partition_months = get_partition_months()
+    if partition_months:
+        days_left = {day for _, day, _ in expected}
+        summaries = {
+            key: value for key, value in summaries.items() if key[1] >= partition_months[0] or key[1] in days_left
+        }
+    mismatches = []
+    for key in sorted(expected.keys() | summaries.keys()):
+        if expected.get(key) != summaries.get(key):
+            wallet_id, day, transaction_type = key
+            mismatches.append(
+                {
+                    "wallet_id": wallet_id,
+                    "day": day,
+                    "transaction_type": transaction_type,
+                    "expected": expected.get(key, (0, Decimal("0.00"))),
+                    "summary": summaries.get(key, (0, Decimal("0.00"))),
+                }
+            )
+    return mismatches
+
+
+def get_daily_totals(since: date, until: date, wallet_id: int | None = None) -> dict[str, Any]:
+    """
+    Number and amount of the transactions by day and type from ``since`` to ``until``, read from the summaries only.
+
+    The totals are summed over the rows of the wallets and their shards, with ``wallet_id`` the rows of one wallet.
+    """
+    summaries = DailyWalletSummary.objects.filter(day__range=(since, until))
+    if wallet_id is not None:
+        summaries = summaries.filter(wallet_id=wallet_id)
+    rows = (
+        summaries.values("day", "transaction_type")
+        .annotate(total_count=Sum("count"), total_amount=Sum("amount"))
+        .filter(total_count__gt=0)
+        .order_by("day", "transaction_type")
+        .values_list("day", "transaction_type", "total_count", "total_amount")
+    )
+    days: dict[date, dict[str, dict]] = {}
+    totals: dict[str, dict] = {}
+    for day, transaction_type, count, amount in rows:
+        days.setdefault(day, {})[transaction_type] = {"count": count, "amount": amount}
+        total = totals.setdefault(transaction_type, {"count": 0, "amount": Decimal("0.00")})
+        total["count"] += count
+        total["amount"] += amount
+    return {
+        "since": since,
+        "until": until,
+        "days": [{"day": day, "totals": day_totals} for day, day_totals in days.items()],
+        "totals": totals,
+    }
@@ -0,0 +1,70 @@
+from datetime import date
+
+from app.celery import app
+from celery import group
+from django.conf import settings
+from django.utils import timezone
+from wallets.idempotency import purge_expired_idempotency_keys
+from wallets.ledger import create_balance_snapshots
+from wallets.partitions import add_months, maintain_partitions
+from wallets.reconciliation import reconcile_range, start_reconciliation
+from wallets.statements import get_pending_ranges, write_statements
+
+
+@app.task
+def snapshot_wallet_balances() -> int:
+    return create_balance_snapshots()
+
+
+@app.task
+def purge_idempotency_keys() -> int:
+    return purge_expired_idempotency_keys()
+
+
+@app.task
+def maintain_transaction_partitions() -> tuple[list[str], list[str]]:
+    return maintain_partitions()
+
+
+@app.task
+def generate_monthly_statements(month: str | None = None, chunk_size: int | None = None) -> int:
+    """
+    Generate the statements of ``month`` (YYYY-MM, last month by default) with a chunk task per range of wallet ids.
+
+    The ranges are of ``chunk_size`` ids, ``WALLETS_STATEMENT_CHUNK_SIZE`` by default.
+
+    The ranges whose statements file exists are skipped, so running it again resumes an interrupted run.
+    Returns the number of chunk tasks sent.
+    """
+    month = month or f"{add_months(timezone.now().date().replace(day=1), -1):%Y-%m}"
+    ranges = get_pending_ranges(
+        date.fromisoformat(f"{month}-01"), chunk_size or settings.WALLETS_STATEMENT_CHUNK_SIZE
+    )
+    if ranges:
+        group(generate_statements_chunk.s(month, first_id, last_id) for first_id, last_id in ranges).apply_async()
+    return len(ranges)
+
+
+@app.task
+def generate_statements_chunk(month: str, first_id: int, last_id: int) -> int:
+    return write_statements(date.fromisoformat(f"{month}-01"), first_id, last_id)
+
+
+@app.task
+def reconcile_wallet_balances(full: bool = False, chunk_size: int | None = None) -> int:
+    """
+    Check the balances of the wallets changed since the last run, or of all of them with ``full``.
+
+    Each range of ``chunk_size`` wallet ids, ``WALLETS_RECONCILIATION_CHUNK_SIZE`` by default,
+    is checked by its own chunk task.
+    Returns the id of the run, whose row counts the ranges done and the mismatches found.
+    """
+    run, ranges = start_reconciliation(full, chunk_size)
+    if ranges:
+        group(reconcile_balances_chunk.s(run.pk, first_id, last_id) for first_id, last_id in ranges).apply_async()
+    return run.pk
+
+
+@app.task
+def reconcile_balances_chunk(run_id: int, first_id: int, last_id: int) -> int:
+    return reconcile_range(run_id, first_id, last_id)
@@ -0,0 +1,37 @@
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from django_extended.constants import TransactionType
+from django_extended.throttling import SlidingWindowRateThrottle, UserRateThrottle
+from rest_framework import exceptions
+
+
+class TransactionUserRateThrottle(UserRateThrottle):
+    scope = "transactions"
+    methods = ("POST",)
+
+
+class TransactionWalletRateThrottle(SlidingWindowRateThrottle):
+    """
+    Throttle the withdrawals and the transfers per sending wallet, whoever sends them.
+
+    The wallets are counted by ``check_wallet_throttle`` once the transactions are validated, so
+    by their id and only for the transactions the owner of the wallet, or an admin, may send. The
+    deposits, which any user may make into a wallet, are not counted.
+    """
+
+    scope = "wallet_transactions"
+
+    def allow_transactions(self, items: Iterable[Mapping[str, Any]]) -> bool:
+        return self.allow_keys(
+            f"wallet:{item['wallet_id']}"
+            for item in items
+            if item["transaction_type"] in (TransactionType.WITHDRAW, TransactionType.TRANSFER)
+        )
+
+
+def check_wallet_throttle(items: Iterable[Mapping[str, Any]]) -> None:
+    """Raise ``Throttled`` if the sending wallet of one of the validated transactions is over its rate."""
+    throttle = TransactionWalletRateThrottle()
+    if not throttle.allow_transactions(items):
+        raise exceptions.Throttled(throttle.wait())
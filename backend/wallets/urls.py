@@ -1,10 +1,15 @@
 from django.urls import path
 from wallets.views import (
+    BalanceCacheMetricsAPIView,
+    DailyTotalsAPIView,
+    TransactionBatchCreateAPIView,
+    TransactionExportAPIView,
     TransactionListCreateAPIView,
     TransactionRetrieveUpdateAPIView,
     WalletsBalanceAPIView,
     WalletsListCreateAPIView,
     WalletsRetrieveUpdateDestroyAPIView,
+    WalletTransactionsExportAPIView,
 )
 
 urlpatterns = [
@@ -19,11 +24,36 @@ urlpatterns = [
         WalletsBalanceAPIView.as_view(),
         name="retrieve-wallet-balance",
     ),
+    path(
+        "<int:pk>/transactions/export/",
+        WalletTransactionsExportAPIView.as_view(),
+        name="export-wallet-transactions",
+    ),
+    path(
+        "analytics/",
+        DailyTotalsAPIView.as_view(),
+        name="daily-totals",
+    ),
+    path(
+        "balance-cache/metrics/",
+        BalanceCacheMetricsAPIView.as_view(),
+        name="balance-cache-metrics",
+    ),
     path(
         "transactions/",
         TransactionListCreateAPIView.as_view(),
         name="list-create-transactions",
     ),
+    path(
+        "transactions/batch/",
+        TransactionBatchCreateAPIView.as_view(),
+        name="create-transactions-batch",
+    ),
+    path(
+        "transactions/export/",
+        TransactionExportAPIView.as_view(),
+        name="export-transactions",
+    ),
     path(
         "transactions/<int:pk>/",
         TransactionRetrieveUpdateAPIView.as_view(),
@@ -1,22 +1,46 @@
+from contextlib import nullcontext
+from functools import partial
+
+from django.conf import settings
 from django.db.models import Q, QuerySet
-from django_extended.constants import RequestMethods
-from rest_framework import generics, permissions
+from django.http import StreamingHttpResponse
+from django_extended.constants import RequestMethods, TransactionType
+from django_extended.db_router import primary_reads
+from django_extended.pagination import KeysetPagination
+from django_extended.renderers import CSVRenderer, NDJSONRenderer
+from rest_framework import generics, permissions, serializers, status
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from wallets.balance_cache import fill_balance, get_balance, get_metrics, invalidate_balances
+from wallets.exceptions import InsufficientFundsError, WalletDoesNotExistError
+from wallets.exports import export_transactions, is_served_over_asgi
+from wallets.idempotency import idempotent_response
 from wallets.models import Transaction, Wallet
+from wallets.serializers.analytics_serializers import DailyTotalsQuerySerializer, DailyTotalsSerializer
 from wallets.serializers.transaction_serialziers import (
+    TransactionBatchItemSerializer,
     TransactionListCreateSerializer,
     TransactionRetrieveUpdateSerializer,
+    transactions_list_representation,
+    validate_transactions_batch,
 )
 from wallets.serializers.wallet_serializers import (
     WalletsBalanceSerializer,
     WalletsListCreateSerializer,
     WalletsRetrieveUpdateDestroySerializer,
+    wallets_list_representation,
 )
+from wallets.services import create_transactions, get_current_balances, load_current_balances
+from wallets.summaries import get_daily_totals
+from wallets.throttling import TransactionUserRateThrottle, check_wallet_throttle
 
 
 class WalletsListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = WalletsListCreateSerializer
+    pagination_class = KeysetPagination
+    ordering = ("created_at", "id")
 
     def get_queryset(self) -> QuerySet:
         user = self.request.user
@@ -24,6 +48,15 @@ class WalletsListCreateAPIView(generics.ListCreateAPIView):
             return Wallet.objects.all()
         return Wallet.objects.filter(owner=user.pk).order_by("id")
 
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        if not settings.API_VALUES_LISTS_ENABLED:
+            return super().list(request, *args, **kwargs)
+        lookups = wallets_list_representation.get_lookups("shard_count", "created_at")
+        rows = self.paginate_queryset(self.filter_queryset(self.get_queryset()).values_list(*lookups, named=True))
+        balances = get_current_balances((row.id, row.balance, row.shard_count) for row in rows)
+        data = wallets_list_representation.to_representation(rows, balance=lambda row: balances[row.id])
+        return self.get_paginated_response(data)
+
 
 class WalletsRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView):
     permission_classes = [IsAuthenticated]
@@ -35,6 +68,10 @@ class WalletsRetrieveUpdateDestroyAPIView(generics.RetrieveUpdateDestroyAPIView)
             return Wallet.objects.all()
         return Wallet.objects.filter(owner=user.pk)
 
+    def perform_destroy(self, instance: Wallet) -> None:
+        invalidate_balances([instance.id])
+        super().perform_destroy(instance)
+
 
 class WalletsBalanceAPIView(generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
@@ -46,16 +83,159 @@ class WalletsBalanceAPIView(generics.RetrieveAPIView):
             return Wallet.objects.all()
         return Wallet.objects.filter(owner=user.pk)
 
+    def retrieve(self, request: Request, *args, **kwargs) -> Response:
+        if not settings.BALANCE_CACHE_ENABLED:
+            return super().retrieve(request, *args, **kwargs)
+        cached, version = get_balance(self.kwargs["pk"])
+        wallet = cached.get_wallet(request.user) if cached else None
+        if wallet is None:
+            # A balance cached for ``version`` is read from the primary, see ``fill_balance``.
+            with primary_reads() if cached is None else nullcontext():
+                wallet = self.get_object()
+                load_current_balances([wallet])
+            if cached is None:
+                fill_balance(wallet, version)
+        return Response(self.get_serializer(wallet).data)
+
+
+class BalanceCacheMetricsAPIView(generics.GenericAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request: Request) -> Response:
+        """Hits and misses of the balance cache counted by the process serving the request."""
+        return Response(get_metrics())
+
 
 class TransactionListCreateAPIView(generics.ListCreateAPIView):
     permission_classes = (IsAuthenticated,)
+    throttle_classes = (TransactionUserRateThrottle,)
     serializer_class = TransactionListCreateSerializer
+    pagination_class = KeysetPagination
+    ordering = ("-created_at", "-id")
 
     def get_queryset(self, *args, **kwargs) -> QuerySet:
+        user = self.request.user
+        queryset = Transaction.objects.all()
+        if not user.is_admin:
+            # The wallet ids are read first: with them in the query, the planner estimates the rows of
+            # each side of the OR and reads them from the wallet and receiver indexes.
+            wallet_ids = list(user.get_wallets_ids())
+            queryset = queryset.filter(Q(wallet_id__in=wallet_ids) | Q(receiver_id__in=wallet_ids))
+        transaction_type = self.request.query_params.get("transaction_type")
+        if transaction_type:
+            if transaction_type not in TransactionType.values:
+                message = f'"{transaction_type}" is not a valid choice.'
+                raise serializers.ValidationError({"transaction_type": [message]})
+            queryset = queryset.filter(transaction_type=transaction_type)
+        return queryset
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        if not settings.API_VALUES_LISTS_ENABLED:
+            return super().list(request, *args, **kwargs)
+        lookups = transactions_list_representation.get_lookups("wallet__shard_count", "created_at")
+        rows = self.paginate_queryset(self.filter_queryset(self.get_queryset()).values_list(*lookups, named=True))
+        balances = get_current_balances({(row.wallet_id, row.wallet__balance, row.wallet__shard_count) for row in rows})
+        data = transactions_list_representation.to_representation(
+            rows, wallet_balance=lambda row: balances[row.wallet_id]
+        )
+        return self.get_paginated_response(data)
+
+    def create(self, request: Request, *args, **kwargs) -> Response:
+        return idempotent_response(request, partial(super().create, request, *args, **kwargs))
+
+    def perform_create(self, serializer: TransactionListCreateSerializer) -> None:
+        check_wallet_throttle([serializer.validated_data])
+        super().perform_create(serializer)
+
+
+class TransactionBatchCreateAPIView(generics.GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (TransactionUserRateThrottle,)
+    serializer_class = TransactionBatchItemSerializer
+
+    def post(self, request: Request) -> Response:
+        data = request.data
+        if not isinstance(data, list) or not data:
+            raise serializers.ValidationError({"non_field_errors": ["Expected a non-empty list of transactions."]})
+        if len(data) > settings.WALLETS_TRANSACTION_BATCH_MAX_SIZE:
+            raise serializers.ValidationError(
+                {
+                    "non_field_errors": [
+                        f"A batch cannot contain more than {settings.WALLETS_TRANSACTION_BATCH_MAX_SIZE} transactions."
+                    ]
+                }
+            )
+        items, errors = validate_transactions_batch(request.user, data)
+        indexes = [index for index, item in enumerate(items) if item is not None]
+        # Each transaction counts for its sending wallet, as if it was created by its own request.
+        check_wallet_throttle([items[index] for index in indexes])
+        created = create_transactions([items[index] for index in indexes])
+        results: list[dict] = [{"index": index, "errors": item_errors} for index, item_errors in errors.items()]
+        for index, result in zip(indexes, created, strict=True):
+            if isinstance(result, InsufficientFundsError):
+                results.append(
+                    {
+                        "index": index,
+                        "errors": {"amount": ["There are not enough funds on the balance, enter a smaller amount"]},
+                    }
+                )
+            elif isinstance(result, WalletDoesNotExistError):
+                field = "wallet_id" if result.wallet_id == items[index]["wallet_id"] else "receiver_id"
+                results.append({"index": index, "errors": {field: ["The wallet does not exist."]}})
+            else:
+                results.append({"index": index, "id": result.id})
+        results.sort(key=lambda result: result["index"])
+        failed = sum(1 for result in results if "errors" in result)
+        return Response(
+            {"created": len(results) - failed, "failed": failed, "results": results},
+            status=status.HTTP_207_MULTI_STATUS if failed else status.HTTP_201_CREATED,
+        )
+
+
+class DailyTotalsAPIView(generics.GenericAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+
+    def get(self, request: Request) -> Response:
+        """Transactions by day and type over ``?since=`` to ``?until=``, of all the wallets or of ``?wallet_id=``."""
+        serializer = DailyTotalsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(DailyTotalsSerializer(get_daily_totals(**serializer.validated_data)).data)
+
+
+class WalletTransactionsExportAPIView(generics.GenericAPIView):
+    permission_classes = (IsAuthenticated,)
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+
+    def get_queryset(self) -> QuerySet:
         user = self.request.user
         if user.is_admin:
-            return Transaction.objects.all()
-        return Transaction.objects.filter(Q(wallet__owner_id=user.pk) | Q(receiver__id=user.pk))
+            return Wallet.objects.all()
+        return Wallet.objects.filter(owner=user.pk)
+
+    def get(self, request: Request, pk: int) -> StreamingHttpResponse:
+        """Transactions sent from and received by the wallet, oldest first, as ``?format=csv`` or ``ndjson``."""
+        wallet = self.get_object()
+        transactions = Transaction.objects.filter(Q(wallet_id=wallet.id) | Q(receiver_id=wallet.id))
+        return export_transactions(
+            transactions.order_by("created_at", "id"),
+            request.accepted_renderer,
+            f"wallet-{wallet.id}-transactions",
+            asynchronous=is_served_over_asgi(request),
+        )
+
+
+class TransactionExportAPIView(generics.GenericAPIView):
+    permission_classes = (permissions.IsAdminUser,)
+    renderer_classes = (CSVRenderer, NDJSONRenderer)
+
+    def get(self, request: Request) -> StreamingHttpResponse:
+        """All the transactions, oldest first, as ``?format=csv`` or ``ndjson``."""
+        return export_transactions(
+            Transaction.objects.order_by("created_at", "id"),
+            request.accepted_renderer,
+            "transactions",
+            asynchronous=is_served_over_asgi(request),
+        )
 
 
 class TransactionRetrieveUpdateAPIView(generics.RetrieveUpdateAPIView):
@@ -0,0 +1,46 @@
+import pytest
+
+from benchmarks import micro
+from tests.conftest import (  # noqa: F401
+    admin_user,
+    api_client,
+    locmem_cache,
+    memory_throttling,
+    primary_database,
+    wallet_owner,
+)
+
+
+@pytest.fixture(autouse=True)
+def unthrottled(settings):
+    # The benchmarks send many more requests than a client is allowed to.
+    settings.THROTTLE_RATES = {}
+
+
+@pytest.fixture(scope="session")
+def micro_baselines() -> dict[str, micro.Measurement]:
+    return micro.load_baselines()
+
+
+@pytest.fixture
+def micro_benchmark(micro_baselines):
+    """Measure a function with ``micro.measure`` and fail on a regression from its stored baseline."""
+
+    def benchmark(name: str, function, number: int = 100) -> micro.Measurement:
+        measurement = micro.measure(name, function, number)
+        if not micro.SAVE:
+            assert micro.compare(measurement, micro_baselines.get(name)) == []
+        return measurement
+
+    return benchmark
+
+
+def pytest_terminal_summary(terminalreporter):
+    if not micro.results:
+        return
+    terminalreporter.section("micro-benchmarks")
+    for line in micro.format_report(micro.results, micro.load_baselines()):
+        terminalreporter.write_line(line)
+    if micro.SAVE:
+        micro.save_baselines(micro.results)
+        terminalreporter.write_line(f"Saved the baselines to {micro.BASELINES}")
@@ -0,0 +1,104 @@
+import json
+import os
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from django_extended.query_budget import count_queries
+
+ROUNDS = int(os.getenv("BENCH_MICRO_ROUNDS", 5))
+BASELINES = Path(os.getenv("BENCH_MICRO_BASELINES", Path(__file__).resolve().parent / "baselines.json"))
+# Record the measurements as the new baselines instead of comparing them.
+SAVE = os.getenv("BENCH_MICRO_SAVE", "") not in ("", "0", "false", "False")
+# The timings depend on the machine, so they are recorded and compared only on demand; the query counts always are.
+COMPARE_TIMINGS = os.getenv("BENCH_MICRO_COMPARE_TIMINGS", "") not in ("", "0", "false", "False")
+MAX_SLOWDOWN = float(os.getenv("BENCH_MICRO_MAX_SLOWDOWN", 1.5))
+
+
+@dataclass
+class Measurement:
+    name: str
+    # Seconds per call, the best of the rounds, and the queries run by one call.
+    seconds: float | None
+    queries: int
+
+
+# The measurements of the session, reported at its end.
+results: list[Measurement] = []
+
+
+def measure(name: str, function: Callable[[], object], number: int) -> Measurement:
+    """
+    Time ``function`` over ``ROUNDS`` rounds of ``number`` calls and count the queries of one call.
+
+    The queries are counted on a first call, which also warms the caches up; the timed calls run
+    without the counting wrapper.
+    """
+    with count_queries() as stats:
+        function()
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for _ in range(number):
+            function()
+        timings.append((time.perf_counter() - started) / number)
+    measurement = Measurement(name, min(timings), stats.count)
+    results.append(measurement)
+    return measurement
+
+
+def load_baselines() -> dict[str, Measurement]:
+    if not BASELINES.exists():
+        return {}
+    return {name: Measurement(name, **values) for name, values in json.loads(BASELINES.read_text()).items()}
+
+
+def save_baselines(measurements: list[Measurement]) -> None:
+    """
+    Write the measurements over the baselines of the same names, keeping the others.
+
+    Their timings are written with ``COMPARE_TIMINGS`` only, the baselines keep their previous timings otherwise.
+    """
+    baselines = {name: asdict(baseline) for name, baseline in load_baselines().items()}
+    for measurement in measurements:
+        values = asdict(measurement)
+        if not COMPARE_TIMINGS:
+            values["seconds"] = baselines.get(measurement.name, {}).get("seconds")
+        baselines[measurement.name] = values
+    for values in baselines.values():
+        del values["name"]
+    BASELINES.write_text(json.dumps(dict(sorted(baselines.items())), indent=2) + "\n")
+
+
+def compare(measurement: Measurement, baseline: Measurement | None) -> list[str]:
+    """
+    The regressions of the measurement: more queries than its baseline, or with ``COMPARE_TIMINGS``
+    over ``MAX_SLOWDOWN`` times slower.
+    """
+    if baseline is None:
+        return []
+    regressions = []
+    if measurement.queries > baseline.queries:
+        regressions.append(f"{measurement.name} runs {measurement.queries} queries, {baseline.queries} in the baseline")
+    if COMPARE_TIMINGS and baseline.seconds is not None and measurement.seconds > baseline.seconds * MAX_SLOWDOWN:
+        regressions.append(
+            f"{measurement.name} takes {measurement.seconds * 1e6:.1f}us, "
+            f"x{measurement.seconds / baseline.seconds:.2f} the baseline of {baseline.seconds * 1e6:.1f}us"
+        )
+    return regressions
+
+
+def format_report(measurements: list[Measurement], baselines: dict[str, Measurement]) -> list[str]:
+    lines = [f"{'benchmark':<44} {'per call':>11} {'baseline':>11} {'change':>8} {'queries':>8} {'baseline':>8}"]
+    for measurement in measurements:
+        baseline = baselines.get(measurement.name)
+        line = f"{measurement.name:<44} {measurement.seconds * 1e6:>9.1f}us"
+        if baseline is None or baseline.seconds is None:
+            line += f" {'-':>11} {'-':>8}"
+        else:
+            change = (measurement.seconds / baseline.seconds - 1) * 100
+            line += f" {baseline.seconds * 1e6:>9.1f}us {change:>+7.1f}%"
+        line += f" {measurement.queries:>8} {'-' if baseline is None else baseline.queries:>8}"
+        lines.append(line)
+    return lines
@@ -0,0 +1,10 @@
+# Settings of the servers started by the serving benchmarks.
+from app.settings import *  # noqa: F401,F403
+
+# Basic authentication hashes the password on every request; a fast hasher keeps it from dominating the timings.
+PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+DEBUG = False
+ALLOWED_HOSTS = ["127.0.0.1"]
+# The load test sends many more requests than a client is allowed to.
+THROTTLE_RATES = {}
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+from django.db import connection
+
+ROOT = Path(__file__).resolve().parent.parent
+WORKERS = int(os.getenv("BENCH_SERVER_WORKERS", 1))
+WSGI_THREADS = int(os.getenv("BENCH_WSGI_THREADS", 8))
+
+
+def get_server_command(server: str, port: int) -> list[str]:
+    """Command serving the API on ``port`` with gunicorn threads (``wsgi``) or uvicorn (``asgi``)."""
+    if server == "wsgi":
+        return [
+            "gunicorn",
+            "app.wsgi:application",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(WORKERS),
+            "--threads",
+            str(WSGI_THREADS),
+            "--keep-alive",
+            "60",
+        ]
+    return ["uvicorn", "app.asgi:application", "--port", str(port), "--workers", str(WORKERS), "--no-access-log"]
+
+
+def start_server(command: list[str], port: int) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "PYTHONPATH": f"{ROOT / 'backend'}{os.pathsep}{ROOT}",
+        "DJANGO_SETTINGS_MODULE": "benchmarks.server_settings",
+        # The servers read the data the benchmark commits to the test database.
+        "POSTGRES_DB": connection.settings_dict["NAME"],
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", *command], cwd=ROOT / "backend", env=env, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/api/wallets/")
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError(f"The server {command[0]} did not start")
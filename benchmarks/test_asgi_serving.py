@@ -0,0 +1,78 @@
+import asyncio
+import base64
+import os
+import statistics
+import time
+from decimal import Decimal
+
+import httpx
+import pytest
+
+from benchmarks.servers import WORKERS, get_server_command, start_server
+from tests.wallets.factories import WalletFactory
+
+REQUESTS = int(os.getenv("BENCH_REQUESTS", 1000))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 100))
+
+
+async def load(url: str, headers: dict[str, str]) -> tuple[float, list[float], int]:
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for _ in range(REQUESTS):
+        queue.put_nowait(None)
+
+    async def client_loop(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        while not queue.empty():
+            queue.get_nowait()
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, headers=headers)
+            except httpx.TransportError:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+
+    limits = httpx.Limits(max_connections=CONCURRENCY)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(CONCURRENCY)))
+        return time.perf_counter() - started, latencies, errors
+
+
+def report(name: str, elapsed: float, latencies: list[float], errors: int) -> None:
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(
+        f"{name:<28} {len(latencies) / elapsed:>7.0f} req/s  p50 {statistics.median(latencies) * 1000:>6.1f}ms  "
+        f"p99 {p99 * 1000:>6.1f}ms  connection errors {errors}"
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("path", ["{pk}/balance/", ""])
+def test_wsgi_against_asgi(wallet_owner, settings, path):
+    settings.PASSWORD_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+    wallet_owner.set_password("secret")
+    wallet_owner.save()
+    wallets = [WalletFactory(owner=wallet_owner, balance=Decimal("100.00")) for _ in range(10)]
+    credentials = base64.b64encode(f"{wallet_owner.email}:secret".encode()).decode()
+    headers = {"Authorization": f"Basic {credentials}"}
+    path = path.format(pk=wallets[0].pk)
+    servers = {
+        "wsgi (gunicorn threads)": (get_server_command("wsgi", 8701), f"http://127.0.0.1:8701/api/wallets/{path}"),
+        "asgi (uvicorn async views)": (
+            get_server_command("asgi", 8702),
+            f"http://127.0.0.1:8702/api/async/wallets/{path}",
+        ),
+    }
+    print(f"\n/{path or 'wallets/'}: {REQUESTS} requests, {CONCURRENCY} concurrent, {WORKERS} worker(s)")
+    for name, (command, url) in servers.items():
+        process = start_server(command, int(url.split(":")[2].split("/")[0]))
+        try:
+            elapsed, latencies, errors = asyncio.run(load(url, headers))
+        finally:
+            process.terminate()
+            process.wait()
+        report(name, elapsed, latencies, errors)
@@ -0,0 +1,57 @@
+import os
+import time
+from datetime import date
+
+import pytest
+from django.db import connection
+from django.db.models import Count, Sum
+from wallets.models import Transaction
+from wallets.summaries import check_daily_summaries, get_daily_totals, rebuild_daily_summaries
+
+WALLETS = int(os.getenv("BENCH_SUMMARY_WALLETS", 10_000))
+TRANSACTIONS = int(os.getenv("BENCH_SUMMARY_TRANSACTIONS", 2_000_000))
+MIN_SPEEDUP = float(os.getenv("BENCH_SUMMARY_MIN_SPEEDUP", 20))
+SINCE, UNTIL = date(2024, 5, 1), date(2024, 5, 30)
+
+
+@pytest.mark.django_db
+def test_daily_totals_from_summaries_are_faster_than_from_transactions(wallet_owner):
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO wallets_wallet (created_at, updated_at, owner_id, name, wallet_number, balance, shard_count) "
+            "SELECT '2024-01-01', now(), %s, 'wallet ' || n, gen_random_uuid(), 1000, 0 "
+            "FROM generate_series(1, %s) n",
+            [wallet_owner.pk, WALLETS],
+        )
+        cursor.execute("SELECT min(id) FROM wallets_wallet")
+        (first_id,) = cursor.fetchone()
+        cursor.execute(
+            "INSERT INTO wallets_transaction (created_at, updated_at, amount, transaction_type, wallet_id) "
+            "SELECT '2024-05-01'::timestamptz + (n %% 2880) * interval '15 minutes', now(), 1 + n %% 100, "
+            "(ARRAY['DEPOSIT', 'WITHDRAW'])[1 + n %% 2], %s + n %% %s FROM generate_series(1, %s) n",
+            [first_id, WALLETS, TRANSACTIONS],
+        )
+        cursor.execute("ANALYZE wallets_transaction")
+    rebuild_daily_summaries(SINCE, UNTIL)
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE wallets_dailywalletsummary")
+
+    started = time.perf_counter()
+    list(
+        Transaction.objects.filter(created_at__gte="2024-05-01 00:00+00", created_at__lt="2024-05-31 00:00+00")
+        .values("created_at__date", "transaction_type")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+    )
+    from_transactions = time.perf_counter() - started
+    started = time.perf_counter()
+    totals = get_daily_totals(SINCE, UNTIL)
+    from_summaries = time.perf_counter() - started
+
+    print(
+        f"\nTotals of {TRANSACTIONS} transactions over {len(totals['days'])} days: {from_transactions * 1000:.0f}ms "
+        f"from the transactions, {from_summaries * 1000:.0f}ms from the summaries "
+        f"({from_transactions / from_summaries:.0f}x)"
+    )
+    assert sum(total["count"] for total in totals["totals"].values()) == TRANSACTIONS
+    assert check_daily_summaries(SINCE, UNTIL) == []
+    assert from_transactions / from_summaries >= MIN_SPEEDUP
@@ -0,0 +1,60 @@
+import io
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from django_extended.parsers import ORJSONParser
+from django_extended.renderers import MessagePackRenderer, ORJSONRenderer
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from wallets.models import Transaction
+from wallets.serializers.transaction_serialziers import TransactionListCreateSerializer
+
+from tests.wallets.factories import WalletFactory
+
+PAGE_SIZE = int(os.getenv("BENCH_RENDER_PAGE_SIZE", 10000))
+ROUNDS = int(os.getenv("BENCH_RENDER_ROUNDS", 10))
+MIN_SPEEDUP = float(os.getenv("BENCH_RENDER_MIN_SPEEDUP", 3))
+
+
+def measure(function) -> float:
+    """Seconds per call of ``function``, the best of ``ROUNDS`` calls."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+@pytest.mark.django_db
+def test_renderers_against_drf_json_renderer(wallet_owner):
+    wallet, receiver = WalletFactory.create_batch(2, owner=wallet_owner, balance=Decimal("1000000.00"))
+    Transaction.objects.bulk_create(
+        Transaction(
+            wallet=wallet,
+            receiver=receiver,
+            amount=Decimal(index % 100_000) / 100 + Decimal("0.10"),
+            transaction_type=TransactionType.TRANSFER,
+        )
+        for index in range(PAGE_SIZE)
+    )
+    page = TransactionListCreateSerializer(Transaction.objects.order_by("-id"), many=True).data
+    body = JSONRenderer().render(page)
+    assert ORJSONRenderer().render(page) == body
+
+    drf_elapsed = measure(lambda: JSONRenderer().render(page))
+    orjson_elapsed = measure(lambda: ORJSONRenderer().render(page))
+    msgpack_elapsed = measure(lambda: MessagePackRenderer().render(page))
+    drf_parse_elapsed = measure(lambda: JSONParser().parse(io.BytesIO(body)))
+    orjson_parse_elapsed = measure(lambda: ORJSONParser().parse(io.BytesIO(body)))
+
+    speedup = drf_elapsed / orjson_elapsed
+    print(
+        f"\npage of {PAGE_SIZE} transactions ({len(body)} bytes): rendered by DRF JSON in {drf_elapsed * 1000:.1f}ms, "
+        f"orjson in {orjson_elapsed * 1000:.1f}ms (x{speedup:.1f}), MessagePack in {msgpack_elapsed * 1000:.1f}ms; "
+        f"parsed by DRF JSON in {drf_parse_elapsed * 1000:.1f}ms, orjson in {orjson_parse_elapsed * 1000:.1f}ms"
+    )
+    assert speedup >= MIN_SPEEDUP
@@ -0,0 +1,64 @@
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+from wallets.serializers.transaction_serialziers import (
+    TransactionListCreateSerializer,
+    transactions_list_representation,
+)
+from wallets.services import get_current_balances
+
+from tests.wallets.factories import WalletFactory
+
+ROWS = int(os.getenv("BENCH_LIST_ROWS", 50000))
+ROUNDS = int(os.getenv("BENCH_LIST_ROUNDS", 3))
+MIN_SPEEDUP = float(os.getenv("BENCH_LIST_MIN_SPEEDUP", 3))
+
+
+def measure(function) -> float:
+    """Seconds per call of ``function``, the best of ``ROUNDS`` calls."""
+    timings = []
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def serialize_instances() -> list:
+    return TransactionListCreateSerializer(Transaction.objects.order_by("-created_at", "-id"), many=True).data
+
+
+def represent_values() -> list:
+    lookups = transactions_list_representation.get_lookups("wallet__shard_count", "created_at")
+    rows = list(Transaction.objects.order_by("-created_at", "-id").values_list(*lookups, named=True))
+    balances = get_current_balances({(row.wallet_id, row.wallet__balance, row.wallet__shard_count) for row in rows})
+    return transactions_list_representation.to_representation(rows, wallet_balance=lambda row: balances[row.wallet_id])
+
+
+@pytest.mark.django_db
+def test_values_list_against_serializer(wallet_owner):
+    wallets = WalletFactory.create_batch(100, owner=wallet_owner, balance=Decimal("1000000.00"))
+    Transaction.objects.bulk_create(
+        Transaction(
+            wallet=wallets[index % len(wallets)],
+            receiver=wallets[(index + 1) % len(wallets)] if index % 2 else None,
+            amount=Decimal(index % 100_000) / 100 + Decimal("0.10"),
+            transaction_type=TransactionType.TRANSFER if index % 2 else TransactionType.DEPOSIT,
+        )
+        for index in range(ROWS)
+    )
+    assert represent_values() == serialize_instances()
+
+    serializer_elapsed = measure(serialize_instances)
+    values_elapsed = measure(represent_values)
+
+    speedup = serializer_elapsed / values_elapsed
+    print(
+        f"\n{ROWS} transactions, queries included: serializer {serializer_elapsed / ROWS * 1e6:.1f}us per row, "
+        f"values rows {values_elapsed / ROWS * 1e6:.1f}us per row (x{speedup:.1f})"
+    )
+    assert speedup >= MIN_SPEEDUP
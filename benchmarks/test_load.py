@@ -0,0 +1,211 @@
+import asyncio
+import os
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+import httpx
+import pytest
+from django_extended.constants import TransactionType, UserRole
+from users.authentication import create_access_token
+from wallets.models import Transaction, Wallet
+from wallets.services import get_current_balances, get_transaction_deltas
+
+from benchmarks.servers import WORKERS, get_server_command, start_server
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+# The endpoint of each operation, as reported.
+OPERATIONS = {
+    "deposit": "POST /api/wallets/transactions/",
+    "withdraw": "POST /api/wallets/transactions/",
+    "transfer": "POST /api/wallets/transactions/",
+    "cancel": "PATCH /api/wallets/transactions/<id>/",
+    "balance": "GET /api/wallets/<id>/balance/",
+}
+TRANSACTION_TYPES = {
+    "deposit": TransactionType.DEPOSIT,
+    "withdraw": TransactionType.WITHDRAW,
+    "transfer": TransactionType.TRANSFER,
+}
+
+
+def parse_mix(mix: str) -> dict[str, int]:
+    """Weights of the operations from ``deposit=20,transfer=40``, the operations left out are not sent."""
+    weights = {operation: 0 for operation in OPERATIONS}
+    for item in mix.split(","):
+        operation, weight = item.split("=")
+        if operation.strip() not in weights:
+            raise ValueError(f"Unknown operation {operation!r}, expected one of {', '.join(OPERATIONS)}")
+        weights[operation.strip()] = int(weight)
+    return {operation: weight for operation, weight in weights.items() if weight}
+
+
+USERS = int(os.getenv("BENCH_LOAD_USERS", 50))
+WALLETS_PER_USER = int(os.getenv("BENCH_LOAD_WALLETS_PER_USER", 2))
+INITIAL_BALANCE = Decimal(os.getenv("BENCH_LOAD_BALANCE", "1000.00"))
+REQUESTS = int(os.getenv("BENCH_LOAD_REQUESTS", 5000))
+CONCURRENCY = int(os.getenv("BENCH_LOAD_CONCURRENCY", 50))
+MIX = parse_mix(os.getenv("BENCH_LOAD_MIX", "deposit=20,withdraw=15,transfer=40,cancel=5,balance=20"))
+SERVER = os.getenv("BENCH_LOAD_SERVER", "asgi")
+SEED = int(os.getenv("BENCH_LOAD_SEED", 0))
+PORT = 8703
+
+
+@dataclass
+class LoadRun:
+    """The traffic of the clients and what the server answered them."""
+
+    tokens: dict[int, str]
+    admin_token: str
+    rnd: random.Random
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    statuses: dict[str, Counter] = field(default_factory=lambda: defaultdict(Counter))
+    errors: Counter = field(default_factory=Counter)
+    # Transactions whose creation was acknowledged, and the transfers among them not cancelled yet.
+    created: set[int] = field(default_factory=set)
+    transfers: list[int] = field(default_factory=list)
+
+    def next_request(self) -> tuple[str, str, str, str, dict | None]:
+        """A random operation of the mix: its name, method, path, access token and body."""
+        operation = self.rnd.choices(list(MIX), weights=list(MIX.values()))[0]
+        if operation == "cancel" and not self.transfers:
+            operation = "balance"
+        wallet_id = self.rnd.choice(list(self.tokens))
+        token = self.tokens[wallet_id]
+        match operation:
+            case "balance":
+                return operation, "GET", f"/api/wallets/{wallet_id}/balance/", token, None
+            case "cancel":
+                transaction_id = self.transfers.pop(self.rnd.randrange(len(self.transfers)))
+                data = {"transaction_type": TransactionType.CANCELLATION}
+                return operation, "PATCH", f"/api/wallets/transactions/{transaction_id}/", self.admin_token, data
+        data = {
+            "wallet_id": wallet_id,
+            "amount": str(Decimal(self.rnd.randint(10, 10000)) / 100),
+            "transaction_type": TRANSACTION_TYPES[operation],
+        }
+        if operation == "transfer":
+            data["receiver_id"] = self.rnd.choice(
+                [receiver_id for receiver_id in self.tokens if receiver_id != wallet_id]
+            )
+        return operation, "POST", "/api/wallets/transactions/", token, data
+
+    async def client_loop(self, client: httpx.AsyncClient, requests: Iterator[int]) -> None:
+        # The clients share the iterator of the requests left to send.
+        for _ in requests:
+            operation, method, path, token, data = self.next_request()
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=data, headers={"Authorization": f"Bearer {token}"})
+            except httpx.TransportError:
+                self.errors[operation] += 1
+                continue
+            self.latencies[operation].append(time.perf_counter() - started)
+            self.statuses[operation][response.status_code] += 1
+            if response.status_code == 201:
+                transaction_id = response.json()["id"]
+                self.created.add(transaction_id)
+                if operation == "transfer":
+                    self.transfers.append(transaction_id)
+
+    async def run(self, base_url: str) -> float:
+        requests = iter(range(REQUESTS))
+        limits = httpx.Limits(max_connections=CONCURRENCY)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(self.client_loop(client, requests) for _ in range(CONCURRENCY)))
+            return time.perf_counter() - started
+
+
+def report(run: LoadRun, elapsed: float) -> None:
+    sent = sum(len(latencies) for latencies in run.latencies.values())
+    print(
+        f"\n{sent} requests from {CONCURRENCY} clients over {len(run.tokens)} wallets, {SERVER} with {WORKERS} "
+        f"worker(s): {elapsed:.1f}s, {sent / elapsed:.0f} req/s"
+    )
+    for operation in MIX:
+        latencies = run.latencies[operation]
+        if len(latencies) < 2:
+            continue
+        quantiles = statistics.quantiles(latencies, n=100)
+        statuses = " ".join(f"{status}x{count}" for status, count in sorted(run.statuses[operation].items()))
+        print(
+            f"{operation:<9} {OPERATIONS[operation]:<38} {len(latencies) / elapsed:>6.0f} req/s  "
+            f"p50 {statistics.median(latencies) * 1000:>6.1f}ms  p95 {quantiles[94] * 1000:>6.1f}ms  "
+            f"p99 {quantiles[98] * 1000:>6.1f}ms  "
+            f"{statuses}  connection errors {run.errors[operation]}"
+        )
+
+
+def check_ledger(run: LoadRun, initial: dict[int, Decimal]) -> list[str]:
+    """
+    Compare the balances of the wallets after the run with their transactions; returns the failures.
+
+    The transactions are counted by ``get_transaction_deltas``, so a cancelled transfer counts for nothing.
+    """
+    failures = []
+    balances = get_current_balances(Wallet.objects.filter(id__in=initial).values_list("id", "balance", "shard_count"))
+    expected = dict(initial)
+    rows = Transaction.objects.filter(wallet_id__in=initial).values_list(
+        "id", "wallet_id", "receiver_id", "amount", "transaction_type"
+    )
+    row_ids = set()
+    deposited = withdrawn = Decimal("0.00")
+    for transaction_id, wallet_id, receiver_id, amount, transaction_type in rows:
+        row_ids.add(transaction_id)
+        for changed_id, delta in get_transaction_deltas(wallet_id, receiver_id, amount, transaction_type).items():
+            expected[changed_id] += delta
+        if transaction_type == TransactionType.DEPOSIT:
+            deposited += amount
+        elif transaction_type == TransactionType.WITHDRAW:
+            withdrawn += amount
+
+    # Transfers and cancellations move money between the wallets, only deposits and withdrawals change the total.
+    total, expected_total = sum(balances.values()), sum(initial.values()) + deposited - withdrawn
+    if total != expected_total:
+        failures.append(f"The wallets hold {total} in total, {expected_total} was deposited less withdrawn")
+    failures.extend(
+        f"Wallet {wallet_id} has a negative balance of {balance}"
+        for wallet_id, balance in balances.items()
+        if balance < 0
+    )
+    failures.extend(
+        f"Wallet {wallet_id} has a balance of {balances[wallet_id]}, its transactions add up to {balance}"
+        for wallet_id, balance in expected.items()
+        if balances[wallet_id] != balance
+    )
+    if run.created - row_ids:
+        failures.append(f"Acknowledged transactions without a row: {sorted(run.created - row_ids)}")
+    # A request cut by a connection error may have created its transaction without the client knowing.
+    unacknowledged = len(row_ids - run.created)
+    if unacknowledged > sum(run.errors[operation] for operation in TRANSACTION_TYPES):
+        failures.append(f"{unacknowledged} transactions were created without being acknowledged")
+    return failures
+
+
+@pytest.mark.django_db(transaction=True)
+def test_load(admin_user):
+    rnd = random.Random(SEED)
+    tokens = {}
+    for index in range(USERS):
+        user = UserFactory(email=f"load-{index}@example.com", role=UserRole.WALLET_OWNER)
+        for _ in range(WALLETS_PER_USER):
+            tokens[WalletFactory(owner=user, balance=INITIAL_BALANCE).pk] = create_access_token(user)
+    initial = {wallet_id: INITIAL_BALANCE for wallet_id in tokens}
+    run = LoadRun(tokens=tokens, admin_token=create_access_token(admin_user), rnd=rnd)
+
+    process = start_server(get_server_command(SERVER, PORT), PORT)
+    try:
+        elapsed = asyncio.run(run.run(f"http://127.0.0.1:{PORT}"))
+    finally:
+        process.terminate()
+        process.wait()
+    report(run, elapsed)
+
+    assert check_ledger(run, initial) == []
+    assert not any(status >= 500 for statuses in run.statuses.values() for status in statuses)
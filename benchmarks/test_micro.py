@@ -0,0 +1,117 @@
+import os
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from wallets.loaders import WalletLoaderMiddleware
+from wallets.models import Transaction, Wallet
+from wallets.serializers.transaction_serialziers import (
+    TransactionListCreateSerializer,
+    transactions_list_representation,
+)
+from wallets.serializers.wallet_serializers import WalletsListCreateSerializer
+from wallets.services import (
+    cancel_wallet_transactions,
+    get_current_balances,
+    wallet_transactions,
+)
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+PAGE_SIZES = [int(size) for size in os.getenv("BENCH_MICRO_PAGE_SIZES", "10,100,1000").split(",")]
+
+
+@pytest.fixture
+def wallets(wallet_owner):
+    return WalletFactory.create_batch(2, owner=wallet_owner, balance=Decimal("1000000.00"))
+
+
+@pytest.fixture
+def pages(wallets, wallet_owner):
+    WalletFactory.create_batch(max(PAGE_SIZES), owner=wallet_owner)
+    TransactionFactory.create_batch(
+        max(PAGE_SIZES), wallet=wallets[0], receiver=wallets[1], transaction_type=TransactionType.TRANSFER
+    )
+
+
+def post_request(user, path: str) -> Request:
+    request = Request(APIRequestFactory().post(path))
+    request.user = user
+    return request
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("transaction_type", [TransactionType.DEPOSIT, TransactionType.TRANSFER])
+def test_transaction_validation(micro_benchmark, wallets, wallet_owner, transaction_type):
+    data = {"wallet_id": wallets[0].pk, "amount": "10.00", "transaction_type": transaction_type}
+    if transaction_type == TransactionType.TRANSFER:
+        data["receiver_id"] = wallets[1].pk
+    request = post_request(wallet_owner, "/api/wallets/transactions/")
+
+    def validate(http_request) -> None:
+        serializer = TransactionListCreateSerializer(data=data, context={"request": request})
+        assert serializer.is_valid(), serializer.errors
+
+    # Each call reads the wallets with its own loader, as each request does.
+    validate_in_request = WalletLoaderMiddleware(validate)
+    micro_benchmark(f"serializer.validate[{transaction_type.lower()}]", lambda: validate_in_request(None))
+
+
+@pytest.mark.django_db
+def test_wallet_transactions(micro_benchmark, wallets):
+    sender, receiver = wallets
+    micro_benchmark(
+        "services.wallet_transactions[deposit]",
+        lambda: wallet_transactions(sender.pk, None, Decimal("1.00"), TransactionType.DEPOSIT),
+    )
+    micro_benchmark(
+        "services.wallet_transactions[transfer]",
+        lambda: wallet_transactions(sender.pk, receiver.pk, Decimal("1.00"), TransactionType.TRANSFER),
+    )
+    micro_benchmark(
+        "services.cancel_wallet_transactions[transfer]",
+        lambda: cancel_wallet_transactions(sender.pk, receiver.pk, Decimal("1.00"), TransactionType.TRANSFER),
+    )
+
+
+@pytest.mark.django_db
+def test_model_save(micro_benchmark, wallets):
+    sender, receiver = wallets
+    micro_benchmark("models.Wallet.save", sender.save)
+    micro_benchmark(
+        "models.Transaction.save",
+        lambda: Transaction(
+            wallet=sender, receiver=receiver, amount=Decimal("1.00"), transaction_type=TransactionType.TRANSFER
+        ).save(),
+    )
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("page_size", PAGE_SIZES)
+def test_list_serializers(micro_benchmark, pages, page_size):
+    # The pages are read by every call, as by the views; fewer calls of the larger pages keep the rounds short.
+    number = max(1, 1000 // page_size)
+
+    def represent_transaction_values() -> list:
+        lookups = transactions_list_representation.get_lookups("wallet__shard_count", "created_at")
+        rows = list(Transaction.objects.order_by("-created_at", "-id").values_list(*lookups, named=True)[:page_size])
+        balances = get_current_balances({(row.wallet_id, row.wallet__balance, row.wallet__shard_count) for row in rows})
+        return transactions_list_representation.to_representation(
+            rows, wallet_balance=lambda row: balances[row.wallet_id]
+        )
+
+    micro_benchmark(
+        f"serializers.transactions[{page_size}]",
+        lambda: TransactionListCreateSerializer(
+            Transaction.objects.order_by("-created_at", "-id")[:page_size], many=True
+        ).data,
+        number,
+    )
+    micro_benchmark(f"representations.transactions[{page_size}]", represent_transaction_values, number)
+    micro_benchmark(
+        f"serializers.wallets[{page_size}]",
+        lambda: WalletsListCreateSerializer(Wallet.objects.order_by("created_at", "id")[:page_size], many=True).data,
+        number,
+    )
@@ -0,0 +1,54 @@
+import os
+import time
+from datetime import date
+
+import pytest
+from django.db import connection
+from wallets.statements import get_pending_ranges, write_statements
+
+WALLETS = int(os.getenv("BENCH_STATEMENT_WALLETS", 100_000))
+TRANSACTIONS_PER_WALLET = int(os.getenv("BENCH_STATEMENT_TRANSACTIONS_PER_WALLET", 5))
+WORKERS = int(os.getenv("BENCH_STATEMENT_WORKERS", 4))
+MAX_MINUTES_PER_MILLION = float(os.getenv("BENCH_STATEMENT_MAX_MINUTES_PER_MILLION", 10))
+MONTH = date(2024, 5, 1)
+
+
+@pytest.mark.django_db
+def test_statements_of_million_wallets_take_minutes(wallet_owner, settings, tmp_path):
+    settings.WALLETS_STATEMENTS_DIR = str(tmp_path)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO wallets_wallet (created_at, updated_at, owner_id, name, wallet_number, balance, shard_count) "
+            "SELECT '2024-01-01', now(), %s, 'wallet ' || n, gen_random_uuid(), 1000, 0 "
+            "FROM generate_series(1, %s) n",
+            [wallet_owner.pk, WALLETS],
+        )
+        cursor.execute("SELECT min(id), max(id) FROM wallets_wallet")
+        first_id, last_id = cursor.fetchone()
+        # Deposits, withdrawals and transfers to the next wallet, spread over the month and the next one.
+        cursor.execute(
+            "INSERT INTO wallets_transaction "
+            "(created_at, updated_at, amount, transaction_type, wallet_id, receiver_id) "
+            "SELECT '2024-05-01'::timestamptz + (n %% 3600) * interval '15 minutes', now(), 1 + n %% 100, "
+            "(ARRAY['DEPOSIT', 'WITHDRAW', 'TRANSFER'])[1 + n %% 3], %s + n %% %s, "
+            "CASE WHEN n %% 3 = 2 THEN %s + (n + 1) %% %s END "
+            "FROM generate_series(1, %s) n",
+            [first_id, WALLETS, first_id, WALLETS, WALLETS * TRANSACTIONS_PER_WALLET],
+        )
+        cursor.execute("ANALYZE wallets_wallet")
+        cursor.execute("ANALYZE wallets_transaction")
+
+    started = time.perf_counter()
+    written = sum(
+        write_statements(MONTH, first_id, last_id)
+        for first_id, last_id in get_pending_ranges(MONTH, settings.WALLETS_STATEMENT_CHUNK_SIZE)
+    )
+    elapsed = time.perf_counter() - started
+
+    minutes_per_million = elapsed * 1_000_000 / written / WORKERS / 60
+    print(
+        f"\n{written} statements of {WALLETS * TRANSACTIONS_PER_WALLET} transactions in {elapsed:.1f}s by one process, "
+        f"{written / elapsed:.0f} wallets/s: one million wallets in {minutes_per_million:.1f} min on {WORKERS} workers"
+    )
+    assert written == last_id - first_id + 1
+    assert minutes_per_million <= MAX_MINUTES_PER_MILLION
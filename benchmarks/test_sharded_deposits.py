@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import connection, transaction
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+from wallets.services import get_wallet_balance, wallet_transactions
+from wallets.sharding import set_shard_count
+
+from tests.wallets.factories import WalletFactory
+
+THREADS = int(os.getenv("BENCH_THREADS", 16))
+DEPOSITS_PER_THREAD = int(os.getenv("BENCH_DEPOSITS_PER_THREAD", 100))
+SHARD_COUNTS = [int(count) for count in os.getenv("BENCH_SHARD_COUNTS", "0,4,16").split(",")]
+# Time the balance row stays locked after the change, standing in for the database round trips
+# of the rest of the request; on a single local CPU the lock is otherwise released too quickly to contend.
+HOLD_MS = float(os.getenv("BENCH_HOLD_MS", 5))
+
+
+def run_deposits(wallet_id: int) -> float:
+    errors = []
+    barrier = threading.Barrier(THREADS)
+
+    def deposit() -> None:
+        try:
+            barrier.wait()
+            for _ in range(DEPOSITS_PER_THREAD):
+                # The same work as the transaction-create endpoint: the balance change and the row insert.
+                with transaction.atomic():
+                    wallet_transactions(wallet_id, None, Decimal("1.00"), TransactionType.DEPOSIT)
+                    time.sleep(HOLD_MS / 1000)
+                    Transaction.objects.create(
+                        wallet_id=wallet_id, amount=Decimal("1.00"), transaction_type=TransactionType.DEPOSIT
+                    )
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=deposit) for _ in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    assert errors == []
+    return elapsed
+
+
+@pytest.mark.django_db(transaction=True)
+def test_deposits_into_one_wallet(wallet_owner):
+    deposits = THREADS * DEPOSITS_PER_THREAD
+    print(f"\n{deposits} deposits into one wallet from {THREADS} threads, lock held {HOLD_MS}ms")
+    throughputs = {}
+    for shard_count in SHARD_COUNTS:
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        set_shard_count(wallet.pk, shard_count)
+
+        elapsed = run_deposits(wallet.pk)
+
+        wallet.refresh_from_db()
+        assert get_wallet_balance(wallet) == Decimal(deposits)
+        throughputs[shard_count] = deposits / elapsed
+        print(f"shards={shard_count:<3} {throughputs[shard_count]:.0f} deposits/s")
+    assert throughputs[max(SHARD_COUNTS)] > throughputs[min(SHARD_COUNTS)]
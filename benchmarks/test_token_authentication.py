@@ -0,0 +1,42 @@
+import base64
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from users.authentication import create_access_token
+
+from tests.wallets.factories import WalletFactory
+
+REQUESTS = int(os.getenv("BENCH_AUTH_REQUESTS", 50))
+MIN_SPEEDUP = float(os.getenv("BENCH_AUTH_MIN_SPEEDUP", 3))
+
+
+def measure(api_client, path: str, authorization: str) -> float:
+    """Balance requests served per second with the Authorization header."""
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = api_client.get(path, HTTP_AUTHORIZATION=authorization)
+        assert response.status_code == 200
+    return REQUESTS / (time.perf_counter() - started)
+
+
+@pytest.mark.django_db
+def test_access_token_against_basic_authentication(api_client, wallet_owner):
+    # The default password hasher, PBKDF2, as in production.
+    password = "bench-passw0rd!"
+    wallet_owner.set_password(password)
+    wallet_owner.save()
+    wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+    path = f"/api/wallets/{wallet.pk}/balance/"
+    credentials = base64.b64encode(f"{wallet_owner.email}:{password}".encode()).decode()
+
+    basic_rate = measure(api_client, path, f"Basic {credentials}")
+    token_rate = measure(api_client, path, f"Bearer {create_access_token(wallet_owner)}")
+
+    speedup = token_rate / basic_rate
+    print(
+        f"\n{REQUESTS} balance requests: basic authentication {basic_rate:.0f}/s, "
+        f"access token {token_rate:.0f}/s, speedup x{speedup:.1f}"
+    )
+    assert speedup >= MIN_SPEEDUP
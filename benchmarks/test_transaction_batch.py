@@ -0,0 +1,57 @@
+import os
+import time
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+
+from tests.wallets.factories import WalletFactory
+
+BATCH_SIZE = int(os.getenv("BENCH_BATCH_SIZE", 1000))
+WALLETS = int(os.getenv("BENCH_WALLETS", 50))
+MIN_SPEEDUP = float(os.getenv("BENCH_BATCH_MIN_SPEEDUP", 50))
+
+
+def build_items(wallet_ids: list[int]) -> list[dict]:
+    items = []
+    for index in range(BATCH_SIZE):
+        wallet_id = wallet_ids[index % len(wallet_ids)]
+        if index % 2:
+            items.append({"wallet_id": wallet_id, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT})
+        else:
+            items.append(
+                {
+                    "wallet_id": wallet_id,
+                    "receiver_id": wallet_ids[(index + 1) % len(wallet_ids)],
+                    "amount": "1.00",
+                    "transaction_type": TransactionType.TRANSFER,
+                }
+            )
+    return items
+
+
+@pytest.mark.django_db
+def test_batch_against_single_item_endpoint(api_client, wallet_owner):
+    api_client.force_authenticate(wallet_owner)
+    wallet_ids = [WalletFactory(owner=wallet_owner, balance=Decimal("1000000.00")).pk for _ in range(WALLETS)]
+    items = build_items(wallet_ids)
+
+    started = time.perf_counter()
+    for item in items:
+        response = api_client.post("/api/wallets/transactions/", data=item, format="json")
+        assert response.status_code == 201
+    single_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    response = api_client.post("/api/wallets/transactions/batch/", data=items, format="json")
+    batch_elapsed = time.perf_counter() - started
+
+    assert response.status_code == 201
+    assert Transaction.objects.count() == 2 * BATCH_SIZE
+    speedup = single_elapsed / batch_elapsed
+    print(
+        f"\n{BATCH_SIZE} transactions: single-item endpoint {BATCH_SIZE / single_elapsed:.0f}/s, "
+        f"batch endpoint {BATCH_SIZE / batch_elapsed:.0f}/s, speedup x{speedup:.1f}"
+    )
+    assert speedup >= MIN_SPEEDUP
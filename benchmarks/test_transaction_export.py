@@ -0,0 +1,49 @@
+import os
+import time
+
+import pytest
+from django.db import connection
+
+from tests.wallets.factories import WalletFactory
+
+ROWS = int(os.getenv("BENCH_EXPORT_ROWS", 5_000_000))
+MAX_RSS_GROWTH_MB = float(os.getenv("BENCH_EXPORT_MAX_RSS_GROWTH_MB", 64))
+
+
+def get_rss_mb() -> float:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("export_format", ["csv", "ndjson"])
+def test_export_memory_stays_flat(api_client, admin_user, export_format):
+    wallet, receiver = WalletFactory.create_batch(2)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO wallets_transaction "
+            "(created_at, updated_at, amount, transaction_type, wallet_id, receiver_id) "
+            "SELECT now() - n * interval '1 second', now(), 1 + n %% 1000, 'TRANSFER', %s, %s "
+            "FROM generate_series(1::bigint, %s) n",
+            [wallet.pk, receiver.pk, ROWS],
+        )
+    api_client.force_authenticate(admin_user)
+
+    started = time.perf_counter()
+    response = api_client.get(f"/api/wallets/{wallet.pk}/transactions/export/?format={export_format}")
+    assert response.status_code == 200
+    baseline_rss = peak_rss = get_rss_mb()
+    lines = 0
+    size = 0
+    for chunk in response.streaming_content:
+        lines += chunk.count(b"\n")
+        size += len(chunk)
+        peak_rss = max(peak_rss, get_rss_mb())
+    elapsed = time.perf_counter() - started
+
+    print(
+        f"\n{ROWS} transactions exported as {export_format} ({size / 2**20:.0f}MB) in {elapsed:.1f}s, "
+        f"{ROWS / elapsed:.0f} rows/s; RSS {baseline_rss:.0f}MB before the first row, {peak_rss:.0f}MB at most"
+    )
+    assert lines == ROWS + (export_format == "csv")
+    assert peak_rss - baseline_rss < MAX_RSS_GROWTH_MB
@@ -0,0 +1,96 @@
+import os
+import random
+import re
+import statistics
+import time
+from datetime import date, timedelta
+
+import pytest
+from django.db import connection
+from django.utils import timezone
+from wallets.partitions import add_months
+
+ROWS = int(os.getenv("BENCH_PARTITION_ROWS", 1_000_000))
+MONTHS = int(os.getenv("BENCH_PARTITION_MONTHS", 24))
+WALLETS = int(os.getenv("BENCH_PARTITION_WALLETS", 10_000))
+SAMPLES = int(os.getenv("BENCH_PARTITION_SAMPLES", 500))
+
+INDEXES = [
+    "CREATE INDEX ON {table} (created_at, id)",
+    "CREATE INDEX ON {table} (wallet_id, created_at, id)",
+    "CREATE INDEX ON {table} (receiver_id, created_at, id) WHERE receiver_id IS NOT NULL",
+    "CREATE INDEX ON {table} (transaction_type, created_at, id)",
+]
+# The recent history of a wallet, as read by a statement or a date-bounded page of its transactions.
+RECENT_HISTORY = (
+    "SELECT * FROM {table} WHERE wallet_id = %s AND created_at >= %s " "ORDER BY created_at DESC, id DESC LIMIT 100"
+)
+INSERT = (
+    "INSERT INTO {table} (created_at, updated_at, amount, transaction_type, wallet_id) "
+    "VALUES (now(), now(), 1, 'DEPOSIT', %s)"
+)
+
+
+def create_table(cursor, table: str, partitioned: bool, first_month: date) -> None:
+    cursor.execute(
+        f"CREATE TABLE {table} (LIKE wallets_transaction INCLUDING DEFAULTS INCLUDING IDENTITY, "
+        f"PRIMARY KEY (id, created_at))" + (" PARTITION BY RANGE (created_at)" if partitioned else "")
+    )
+    if partitioned:
+        for months in range(MONTHS + 1):
+            month = add_months(first_month, months)
+            cursor.execute(
+                f"CREATE TABLE {table}_p{month:%Y_%m} PARTITION OF {table} FOR VALUES FROM (%s) TO (%s)",
+                [f"{month} 00:00+00", f"{add_months(month, 1)} 00:00+00"],
+            )
+    # The rows are spread evenly over the months up to now.
+    cursor.execute(
+        f"INSERT INTO {table} (created_at, updated_at, amount, transaction_type, wallet_id, receiver_id) "
+        f"SELECT ts, ts, 1, CASE WHEN n %% 4 = 0 THEN 'TRANSFER' ELSE 'DEPOSIT' END, "
+        f"1 + (n * 7919) %% %s, CASE WHEN n %% 4 = 0 THEN 1 + (n * 104729) %% %s END "
+        f"FROM generate_series(1::bigint, %s) n, "
+        f"LATERAL (SELECT %s::timestamptz + (now() - %s::timestamptz) * (n::float8 / %s)) t(ts)",
+        [WALLETS, WALLETS, ROWS, first_month, first_month, ROWS],
+    )
+    for statement in INDEXES:
+        cursor.execute(statement.format(table=table))
+    cursor.execute(f"ANALYZE {table}")
+
+
+def measure(cursor, sql: str, params: list[list]) -> tuple[float, float]:
+    timings = []
+    for query_params in params:
+        started = time.perf_counter()
+        cursor.execute(sql, query_params)
+        if cursor.description:
+            cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+@pytest.mark.django_db
+def test_partitioned_against_unpartitioned_table():
+    rng = random.Random(9)
+    first_month = add_months(timezone.now().date().replace(day=1), -MONTHS)
+    since = timezone.now() - timedelta(days=30)
+    wallet_params = [[rng.randint(1, WALLETS)] for _ in range(SAMPLES)]
+    history_params = [[wallet_id, since] for (wallet_id,) in wallet_params]
+
+    with connection.cursor() as cursor:
+        for table, partitioned in (("bench_tx_plain", False), ("bench_tx_partitioned", True)):
+            started = time.perf_counter()
+            create_table(cursor, table, partitioned, first_month)
+            load_elapsed = time.perf_counter() - started
+            history = measure(cursor, RECENT_HISTORY.format(table=table), history_params)
+            insert = measure(cursor, INSERT.format(table=table), wallet_params)
+            cursor.execute(f"EXPLAIN {RECENT_HISTORY.format(table=table)}", history_params[0])
+            plan = "\n".join(line for (line,) in cursor.fetchall())
+            print(
+                f"\n{table}: {ROWS} rows over {MONTHS} months loaded in {load_elapsed:.0f}s, "
+                f"recent history p50 {history[0]:.2f} ms p99 {history[1]:.2f} ms, "
+                f"insert p50 {insert[0]:.2f} ms p99 {insert[1]:.2f} ms"
+            )
+            if partitioned:
+                # Only the partitions of the last 30 days are read.
+                assert len(set(re.findall(rf"{table}_p\d{{4}}_\d{{2}}\b", plan))) <= 2, plan
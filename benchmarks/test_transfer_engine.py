@@ -0,0 +1,62 @@
+import os
+import random
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django_extended.constants import TransactionType
+from wallets.exceptions import InsufficientFundsError
+from wallets.models import Wallet
+from wallets.services import wallet_transactions
+
+from tests.wallets.factories import WalletFactory
+
+WALLETS = int(os.getenv("BENCH_WALLETS", 20))
+THREADS = int(os.getenv("BENCH_THREADS", 16))
+TRANSFERS_PER_THREAD = int(os.getenv("BENCH_TRANSFERS_PER_THREAD", 100))
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_transfers(wallet_owner):
+    wallets = [WalletFactory(owner=wallet_owner, balance=Decimal("1000.00")) for _ in range(WALLETS)]
+    wallet_ids = [wallet.pk for wallet in wallets]
+    initial_total = sum(wallet.balance for wallet in wallets)
+    errors = []
+    rejected = []
+    barrier = threading.Barrier(THREADS)
+
+    def transfer(seed: int) -> None:
+        rnd = random.Random(seed)
+        try:
+            barrier.wait()
+            for _ in range(TRANSFERS_PER_THREAD):
+                sender_id, receiver_id = rnd.sample(wallet_ids, 2)
+                amount = Decimal(rnd.randint(1, 5000)) / 100
+                try:
+                    wallet_transactions(sender_id, receiver_id, amount, TransactionType.TRANSFER)
+                except InsufficientFundsError:
+                    rejected.append(sender_id)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    threads = [threading.Thread(target=transfer, args=(seed,)) for seed in range(THREADS)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    balances = list(Wallet.objects.filter(id__in=wallet_ids).values_list("balance", flat=True))
+    transfers = THREADS * TRANSFERS_PER_THREAD
+    print(
+        f"\n{transfers} transfers over {WALLETS} wallets with {THREADS} threads: "
+        f"{elapsed:.2f}s, {transfers / elapsed:.0f} transfers/s, {len(rejected)} rejected for insufficient funds"
+    )
+    assert errors == []
+    assert sum(balances) == initial_total
+    assert min(balances) >= Decimal("0.00")
@@ -0,0 +1,31 @@
+"""
+Requests served as by an ASGI server: ``async_to_sync`` would run the sync code of the views in the
+thread of the test, on its database connection, where an ASGI server runs it in a worker thread.
+"""
+
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import AsyncClient
+from users.authentication import create_access_token
+
+
+def request_over_asgi(method: str, path: str, user=None, **extra):
+    """
+    Send a request through the ASGI handler in a new event loop, with an access token of ``user``.
+
+    The sync code of the request runs in the worker thread of asgiref, on its own database
+    connections, which are closed before returning. The tests need ``transaction=True`` for that
+    thread to read their rows.
+    """
+    if user is not None:
+        extra["AUTHORIZATION"] = f"Bearer {create_access_token(user)}"
+
+    async def send():
+        try:
+            return await getattr(AsyncClient(), method)(path, **extra)
+        finally:
+            await sync_to_async(connections.close_all)()
+
+    return asyncio.run(send())
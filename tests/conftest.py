@@ -1,9 +1,37 @@
 import pytest
+from django.core.cache import cache
 from django_extended.constants import UserRole
+from django_extended.throttling import get_throttle_backend
 from rest_framework.test import APIClient
+from users import authentication
+from wallets import balance_cache
 
 from tests.users.factories import UserFactory
 
+pytest_plugins = ["tests.query_budget"]
+
+
+@pytest.fixture(autouse=True)
+def locmem_cache(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    # The locmem caches and the in-process balances outlive the settings override.
+    cache.clear()
+    balance_cache.local_cache.clear()
+    balance_cache.metrics.clear()
+    authentication.local_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def primary_database(settings):
+    # The test database has no replicas, whatever POSTGRES_REPLICAS is set to.
+    settings.REPLICA_DATABASES = []
+
+
+@pytest.fixture(autouse=True)
+def memory_throttling(settings):
+    settings.THROTTLE_BACKEND = "memory"
+    get_throttle_backend().clear()
+
 
 @pytest.fixture()
 def api_client():
@@ -0,0 +1,60 @@
+import time
+
+from django_extended.cache import LRUCache
+
+
+class TestLRUCache:
+    def test_it_returns_stored_value(self):
+        cache = LRUCache(maxsize=2)
+
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("missing", "default") == "default"
+
+    def test_it_evicts_least_recently_used_entry(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        assert len(cache) == 2
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_it_expires_entries_after_ttl(self, monkeypatch):
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        cache = LRUCache(maxsize=2, ttl=10)
+        cache.set("a", 1)
+        cache.set("b", 2, ttl=30)
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 20)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert len(cache) == 1
+
+    def test_it_keeps_entries_without_ttl(self, monkeypatch):
+        now = time.monotonic()
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+
+        monkeypatch.setattr(time, "monotonic", lambda: now + 10**9)
+
+        assert cache.get("a") == 1
+
+    def test_it_deletes_entries(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        cache.delete("missing")
+
+        assert cache.get("a") is None
+        cache.clear()
+        assert len(cache) == 0
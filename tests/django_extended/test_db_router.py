@@ -0,0 +1,134 @@
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from django_extended.db_router import PrimaryReplicaRouter
+from wallets.models import Wallet
+
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.fixture
+def replicas(settings):
+    settings.REPLICA_DATABASES = ["replica_0"]
+    # The balance endpoint reads the wallet on every request, not from the primary to fill the cache.
+    settings.BALANCE_CACHE_ENABLED = False
+
+
+@pytest.fixture
+def routed_reads(monkeypatch):
+    """The databases chosen by the router for the reads of the wallets, which then run on the primary."""
+    reads = []
+    db_for_read = PrimaryReplicaRouter.db_for_read
+
+    def record_db_for_read(self, model, **hints):
+        alias = db_for_read(self, model, **hints)
+        if model is Wallet:
+            reads.append(alias)
+        return None
+
+    monkeypatch.setattr(PrimaryReplicaRouter, "db_for_read", record_db_for_read)
+    return reads
+
+
+def deposit(api_client, wallet: Wallet):
+    data = {"wallet_id": wallet.pk, "amount": "5.00", "transaction_type": TransactionType.DEPOSIT}
+    response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+    assert response.status_code == 201
+
+
+@pytest.mark.django_db
+@pytest.mark.usefixtures("replicas")
+class TestPrimaryReplicaRouter:
+    @pytest.mark.parametrize("prefix", ["", "async/"])
+    def test_it_reads_balance_from_replica(self, api_client, wallet_owner, routed_reads, prefix):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        routed_reads.clear()
+
+        response = api_client.get(f"/api/{prefix}wallets/{wallet.pk}/balance/")
+
+        assert response.status_code == 200
+        assert routed_reads == ["replica_0"]
+
+    @pytest.mark.parametrize("prefix", ["", "async/"])
+    def test_it_fills_balance_cache_from_primary(self, api_client, wallet_owner, routed_reads, settings, prefix):
+        settings.BALANCE_CACHE_ENABLED = True
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        routed_reads.clear()
+
+        response = api_client.get(f"/api/{prefix}wallets/{wallet.pk}/balance/")
+
+        assert response.status_code == 200
+        assert routed_reads == [None]
+
+    def test_it_reads_primary_after_users_write(self, api_client, wallet_owner, routed_reads):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        deposit(api_client, wallet)
+        routed_reads.clear()
+
+        api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+        api_client.get("/api/wallets/")
+
+        assert routed_reads == [None, None]
+
+    def test_it_reads_replica_after_other_users_write(self, api_client, wallet_owner, routed_reads):
+        api_client.force_authenticate(wallet_owner)
+        deposit(api_client, WalletFactory(owner=wallet_owner, balance=Decimal("10.00")))
+        user = UserFactory()
+        wallet = WalletFactory(owner=user, balance=Decimal("10.00"))
+        api_client.force_authenticate(user)
+        routed_reads.clear()
+
+        api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+
+        assert routed_reads == ["replica_0"]
+
+    def test_it_reads_replica_when_pin_expires(self, api_client, wallet_owner, routed_reads, settings):
+        settings.DATABASE_PRIMARY_PIN_SECONDS = 0
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        deposit(api_client, wallet)
+        routed_reads.clear()
+
+        api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+
+        assert routed_reads == ["replica_0"]
+
+    def test_it_writes_to_primary(self, api_client, wallet_owner, routed_reads):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        routed_reads.clear()
+
+        deposit(api_client, wallet)
+
+        assert routed_reads
+        assert set(routed_reads) == {None}
+
+    def test_it_reads_primary_outside_requests(self, routed_reads):
+        WalletFactory()
+        routed_reads.clear()
+
+        Wallet.objects.count()
+
+        assert routed_reads == [None]
+
+    def test_it_migrates_only_primary(self):
+        router = PrimaryReplicaRouter()
+
+        assert router.allow_migrate("default", "wallets")
+        assert not router.allow_migrate("replica_0", "wallets")
+
+
+@pytest.mark.django_db
+def test_it_reads_primary_without_replicas(api_client, wallet_owner, routed_reads):
+    api_client.force_authenticate(wallet_owner)
+    wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+    routed_reads.clear()
+
+    api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+
+    assert routed_reads == [None]
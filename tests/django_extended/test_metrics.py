@@ -0,0 +1,83 @@
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from prometheus_client import REGISTRY
+from users.tasks import send_registration_email
+
+from tests.asgi import request_over_asgi
+from tests.wallets.factories import WalletFactory
+
+
+def get_value(name: str, **labels) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    def test_it_exposes_request_latency_and_queries(self, api_client, wallet_owner, settings):
+        settings.QUERY_BUDGET_ENABLED = True
+        api_client.force_authenticate(wallet_owner)
+        labels = {"view": "list-create-wallets", "method": "GET", "status": "200"}
+        requests = get_value("http_request_duration_seconds_count", **labels)
+        queries = get_value("db_queries_total", view="list-create-wallets")
+
+        api_client.get("/api/wallets/")
+        response = api_client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain")
+        assert b"http_request_duration_seconds_bucket" in response.content
+        assert get_value("http_request_duration_seconds_count", **labels) == requests + 1
+        assert get_value("db_queries_total", view="list-create-wallets") == queries + 1
+
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_counts_transactions_and_lock_waits(
+        self, api_client, wallet_owner, settings, django_capture_on_commit_callbacks, ledger_enabled
+    ):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        lock_mode = "no_key_update" if ledger_enabled else "update"
+        transactions = get_value("wallet_transactions_total", transaction_type=TransactionType.WITHDRAW)
+        lock_waits = get_value("wallet_lock_wait_seconds_count", mode=lock_mode)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            response = api_client.post(
+                "/api/wallets/transactions/",
+                data={"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.WITHDRAW},
+                format="json",
+            )
+
+        assert response.status_code == 201
+        assert get_value("wallet_lock_wait_seconds_count", mode=lock_mode) > lock_waits
+        assert get_value("wallet_transactions_total", transaction_type=TransactionType.WITHDRAW) == transactions + 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_it_counts_queries_of_view_run_in_worker_thread(wallet_owner, settings):
+    settings.QUERY_BUDGET_ENABLED = True
+    queries = get_value("db_queries_total", view="list-create-wallets")
+    query_seconds = get_value("db_query_duration_seconds_total", view="list-create-wallets")
+
+    response = request_over_asgi("get", "/api/wallets/", user=wallet_owner)
+
+    assert response.status_code == 200
+    assert get_value("db_queries_total", view="list-create-wallets") > queries
+    assert get_value("db_query_duration_seconds_total", view="list-create-wallets") > query_seconds
+
+
+def test_it_times_celery_tasks(mailoutbox):
+    labels = {"task": send_registration_email.name, "state": "SUCCESS"}
+    tasks = get_value("celery_task_duration_seconds_count", **labels)
+
+    send_registration_email.apply(args=["user@example.com"])
+
+    assert get_value("celery_task_duration_seconds_count", **labels) == tasks + 1
+
+
+def test_it_requires_token_when_set(api_client, settings):
+    settings.METRICS_TOKEN = "secret"
+
+    assert api_client.get("/metrics").status_code == 401
+    assert api_client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret").status_code == 200
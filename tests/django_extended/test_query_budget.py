@@ -0,0 +1,108 @@
+import logging
+
+import pytest
+from django.db import connection
+from django_extended.query_budget import count_queries, get_query_pattern, request_queries_counted
+from wallets import views
+from wallets.models import Wallet
+
+from tests.asgi import request_over_asgi
+from tests.query_budget import get_failures
+from tests.wallets.factories import WalletFactory
+
+
+class TestGetQueryPattern:
+    def test_it_collapses_parameter_lists(self):
+        assert get_query_pattern("SELECT id FROM t WHERE id IN (%s, %s, %s) AND x = %s") == (
+            "SELECT id FROM t WHERE id IN (...) AND x = %s"
+        )
+        assert get_query_pattern("SELECT id FROM t WHERE id IN (%s)") == "SELECT id FROM t WHERE id IN (...)"
+
+    def test_it_collapses_value_rows(self):
+        assert get_query_pattern("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s) RETURNING id") == (
+            "INSERT INTO t (a, b) VALUES (...) RETURNING id"
+        )
+
+
+@pytest.mark.django_db
+class TestCountQueries:
+    def test_it_counts_queries_and_their_patterns(self):
+        with count_queries() as stats:
+            for value in range(6):
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT %s", [value])
+
+        assert stats.count == 6
+        assert stats.duration > 0
+        assert stats.get_duplicates(5) == [("SELECT %s", 6)]
+        assert stats.get_duplicates(7) == []
+
+    def test_it_fails_requests_over_budget(self):
+        with count_queries() as stats:
+            for value in range(3):
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT %s", [value])
+
+        assert get_failures([("view", stats)], queries=3, duplicates=None) == []
+        assert get_failures([("view", stats)], queries=2, duplicates=None)[0].startswith(
+            "view ran 3 queries, over the budget of 2"
+        )
+        assert get_failures([("view", stats)], queries=3, duplicates=3) == [
+            "view ran the same query 3 times: SELECT %s"
+        ]
+
+
+@pytest.mark.django_db
+class TestQueryBudgetMiddleware:
+    def test_it_logs_views_over_budget(self, api_client, admin_user, settings, caplog):
+        settings.QUERY_BUDGET_ENABLED = True
+        settings.QUERY_BUDGET_DEFAULT = 0
+        api_client.force_authenticate(admin_user)
+
+        with caplog.at_level(logging.WARNING, logger="django_extended.query_budget"):
+            response = api_client.get("/api/wallets/")
+
+        assert response.status_code == 200
+        assert "GET list-create-wallets ran 1 queries" in caplog.text
+
+    def test_it_logs_repeated_queries(self, api_client, admin_user, settings, caplog, monkeypatch):
+        settings.QUERY_BUDGET_ENABLED = True
+        settings.QUERY_BUDGET_DUPLICATES_THRESHOLD = 3
+        api_client.force_authenticate(admin_user)
+        WalletFactory.create_batch(3)
+
+        def get_balances_one_by_one(rows):
+            return {wallet_id: Wallet.objects.get(pk=wallet_id).balance for wallet_id, _, _ in rows}
+
+        monkeypatch.setattr(views, "get_current_balances", get_balances_one_by_one)
+        with caplog.at_level(logging.WARNING, logger="django_extended.query_budget"):
+            response = api_client.get("/api/wallets/")
+
+        assert response.status_code == 200
+        assert "GET list-create-wallets ran the same query 3 times, a likely N+1" in caplog.text
+
+
+@pytest.mark.django_db(transaction=True)
+class TestQueryBudgetMiddlewareOverASGI:
+    def test_it_counts_queries_of_view_run_in_worker_thread(self, wallet_owner, settings, caplog):
+        settings.QUERY_BUDGET_ENABLED = True
+        settings.QUERY_BUDGET_DEFAULT = 0
+        WalletFactory(owner=wallet_owner)
+        requests = []
+
+        def record(sender, view: str, stats, **kwargs):
+            requests.append((view, stats))
+
+        request_queries_counted.connect(record)
+        try:
+            with caplog.at_level(logging.WARNING, logger="django_extended.query_budget"):
+                response = request_over_asgi("get", "/api/wallets/", user=wallet_owner)
+        finally:
+            request_queries_counted.disconnect(record)
+
+        assert response.status_code == 200
+        ((view, stats),) = requests
+        assert view == "list-create-wallets"
+        assert stats.count > 0
+        assert get_failures(requests, queries=0)[0].startswith(f"list-create-wallets ran {stats.count} queries")
+        assert f"GET list-create-wallets ran {stats.count} queries" in caplog.text
@@ -0,0 +1,134 @@
+import datetime
+import io
+from decimal import Decimal
+
+import msgpack
+import pytest
+from django_extended.constants import TransactionType
+from django_extended.parsers import MessagePackParser, ORJSONParser
+from django_extended.renderers import CSVRenderer, MessagePackRenderer, NDJSONRenderer, ORJSONRenderer
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from wallets.models import Transaction
+from wallets.serializers.transaction_serialziers import TransactionListCreateSerializer
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+LARGE_AMOUNT = "12345678901234567.89"
+
+
+class TestORJSONRenderer:
+    def test_it_renders_decimals_exactly_as_strings(self):
+        assert ORJSONRenderer().render({"amount": Decimal(LARGE_AMOUNT)}) == b'{"amount":"12345678901234567.89"}'
+
+    def test_it_renders_datetimes_as_drf(self):
+        data = {"created_at": datetime.datetime(2024, 5, 1, 10, 30, 15, 123456, tzinfo=datetime.timezone.utc)}
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_it_renders_indented_json(self):
+        assert ORJSONRenderer().render({"a": 1}, "application/json; indent=4") == b'{\n  "a": 1\n}'
+
+    def test_it_renders_nothing_for_none(self):
+        assert ORJSONRenderer().render(None) == b""
+
+    @pytest.mark.django_db
+    def test_it_renders_transactions_as_drf(self):
+        TransactionFactory.create_batch(3, transaction_type=TransactionType.TRANSFER)
+        data = TransactionListCreateSerializer(Transaction.objects.all(), many=True).data
+
+        assert ORJSONRenderer().render(data) == JSONRenderer().render(data)
+
+
+class TestORJSONParser:
+    def test_it_parses_json(self):
+        data = ORJSONParser().parse(io.BytesIO(b'[{"wallet_id": 1, "amount": "1.00", "name": "\\u0142"}]'))
+
+        assert data == [{"wallet_id": 1, "amount": "1.00", "name": "ł"}]
+
+    def test_it_parses_numbers_with_fraction_exactly(self):
+        data = ORJSONParser().parse(io.BytesIO(f'{{"wallet_id": 1, "amount": {LARGE_AMOUNT}}}'.encode()))
+
+        assert data == {"wallet_id": 1, "amount": Decimal(LARGE_AMOUNT)}
+
+    @pytest.mark.parametrize("body", [b'{"amount": ', b'{"amount": NaN}'])
+    def test_it_returns_error_if_json_is_invalid(self, body):
+        with pytest.raises(ParseError):
+            ORJSONParser().parse(io.BytesIO(body))
+
+
+class TestMessagePack:
+    def test_it_renders_and_parses_decimals_as_strings(self):
+        body = MessagePackRenderer().render({"amount": Decimal(LARGE_AMOUNT)})
+
+        assert MessagePackParser().parse(io.BytesIO(body)) == {"amount": LARGE_AMOUNT}
+
+    def test_it_returns_error_if_body_is_invalid(self):
+        with pytest.raises(ParseError):
+            MessagePackParser().parse(io.BytesIO(b"\xc1"))
+
+
+@pytest.mark.django_db
+class TestContentNegotiation:
+    def test_it_creates_transaction_from_msgpack(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "2.50", "transaction_type": TransactionType.DEPOSIT}
+
+        response = api_client.post(
+            "/api/wallets/transactions/",
+            data=msgpack.packb(data),
+            content_type="application/msgpack",
+            HTTP_ACCEPT="application/msgpack",
+        )
+
+        assert response.status_code == 201
+        assert response["Content-Type"] == "application/msgpack"
+        assert msgpack.unpackb(response.content)["amount"] == "2.50"
+
+    def test_it_creates_transaction_with_large_json_number_amount(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        body = f'{{"wallet_id": {wallet.pk}, "amount": {LARGE_AMOUNT}, "transaction_type": "DEPOSIT"}}'
+
+        response = api_client.post("/api/wallets/transactions/", data=body, content_type="application/json")
+
+        assert response.status_code == 201
+        assert response.json()["amount"] == LARGE_AMOUNT
+
+    def test_it_negotiates_async_view_renderer(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+
+        response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/", HTTP_ACCEPT="application/msgpack")
+        not_acceptable_response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/", HTTP_ACCEPT="text/csv")
+
+        assert msgpack.unpackb(response.content)["balance"] == "10.00"
+        assert not_acceptable_response.status_code == 406
+
+    def test_it_renders_indented_json_response(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/balance/", HTTP_ACCEPT="application/json; indent=4")
+
+        assert response.content.startswith(b'{\n  "')
+
+
+class TestExportRenderers:
+    def test_it_renders_csv_rows(self):
+        data = [
+            {"id": 1, "amount": Decimal(LARGE_AMOUNT), "receiver_id": None},
+            {"id": 2, "amount": 1, "receiver_id": 3},
+        ]
+
+        assert CSVRenderer().render(data) == f"id,amount,receiver_id\r\n1,{LARGE_AMOUNT},\r\n2,1,3\r\n".encode()
+        assert CSVRenderer().render(data[1:], renderer_context={"header": False}) == b"2,1,3\r\n"
+
+    def test_it_renders_ndjson_lines(self):
+        data = [{"id": 1, "amount": Decimal(LARGE_AMOUNT)}, {"id": 2, "amount": None}]
+
+        assert (
+            NDJSONRenderer().render(data)
+            == f'{{"id":1,"amount":"{LARGE_AMOUNT}"}}\n{{"id":2,"amount":null}}\n'.encode()
+        )
@@ -0,0 +1,66 @@
+import uuid
+from collections import namedtuple
+from decimal import Decimal
+
+import pytest
+from django_extended.representations import ValuesRepresentation
+from rest_framework import serializers
+
+
+class ItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField(read_only=True)
+    name = serializers.CharField()
+    number = serializers.UUIDField()
+    kind = serializers.ChoiceField(choices=[("A", "a"), ("B", "b")])
+    amount = serializers.DecimalField(max_digits=32, decimal_places=2)
+    owner_balance = serializers.DecimalField(source="owner.balance", max_digits=32, decimal_places=2)
+    password = serializers.CharField(write_only=True)
+
+
+representation = ValuesRepresentation(ItemSerializer)
+Row = namedtuple("Row", representation.get_lookups("created_at"))
+
+
+class Item:
+    def __init__(self, row: Row):
+        self.id, self.name, self.number, self.kind, self.amount = row[:5]
+        self.owner = type("Owner", (), {"balance": row.owner__balance})
+
+
+class TestValuesRepresentation:
+    def test_it_reads_the_sources_of_the_fields(self):
+        assert representation.get_lookups("created_at", "id") == [
+            "id",
+            "name",
+            "number",
+            "kind",
+            "amount",
+            "owner__balance",
+            "created_at",
+        ]
+
+    @pytest.mark.parametrize("amount", [Decimal("1"), Decimal("0.105"), Decimal("12345678901234567.89"), None])
+    def test_it_represents_rows_as_serializer(self, amount):
+        rows = [
+            Row(1, "ł", uuid.uuid4(), "A", amount, Decimal("2.5"), None),
+            Row(2, "b", None, "B", amount, None, None),
+        ]
+
+        data = representation.to_representation(rows)
+
+        assert data == [ItemSerializer(Item(row)).data for row in rows]
+        assert [list(item) for item in data] == [list(ItemSerializer(Item(row)).data) for row in rows]
+
+    def test_it_replaces_values_by_getters(self):
+        row = Row(1, "a", uuid.uuid4(), "A", Decimal("1.00"), Decimal("2.00"), None)
+
+        data = representation.to_representation([row], owner_balance=lambda row: Decimal("3"))
+
+        assert data[0]["owner_balance"] == "3.00"
+
+    def test_it_rejects_fields_without_source_column(self):
+        class NestedSerializer(serializers.Serializer):
+            item = ItemSerializer()
+
+        with pytest.raises(ValueError):
+            ValuesRepresentation(NestedSerializer).get_lookups()
@@ -0,0 +1,172 @@
+from decimal import Decimal
+
+import fakeredis
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended import throttling
+from django_extended.constants import TransactionType
+from django_extended.throttling import MemoryThrottleBackend, RedisThrottleBackend, parse_rate
+from wallets.models import Wallet
+
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """The time of the throttle backends, starting at the beginning of a minute."""
+
+    class Clock:
+        now = 60.0 * 1_000_000
+
+    monkeypatch.setattr(throttling.time, "time", lambda: Clock.now)
+    return Clock
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "redis":
+        return RedisThrottleBackend(fakeredis.FakeRedis())
+    return MemoryThrottleBackend(maxsize=100)
+
+
+def hit_times(backend, count: int, key: str = "scope:key") -> list[float]:
+    return [backend.hit(key, 3, 60) for _ in range(count)]
+
+
+class TestThrottleBackends:
+    def test_it_rejects_requests_over_limit(self, backend, clock):
+        waits = hit_times(backend, 4)
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert waits[3] == 60.0
+
+    def test_it_counts_keys_separately(self, backend, clock):
+        hit_times(backend, 3)
+
+        assert backend.hit("scope:other", 3, 60) == 0.0
+
+    def test_it_slides_window_over_previous_requests(self, backend, clock):
+        hit_times(backend, 3)
+
+        # Ten seconds into the next minute, five sixths of the previous requests still count.
+        clock.now += 70
+        allowed = backend.hit("scope:key", 3, 60)
+        rejected = backend.hit("scope:key", 3, 60)
+        clock.now += 11
+        allowed_later = backend.hit("scope:key", 3, 60)
+
+        assert allowed == 0.0
+        assert rejected == pytest.approx(10.0)
+        assert allowed_later == 0.0
+
+    def test_it_does_not_count_rejected_requests(self, backend, clock):
+        hit_times(backend, 10)
+
+        clock.now += 120
+
+        assert hit_times(backend, 3) == [0.0, 0.0, 0.0]
+
+    def test_it_clears_counters(self, backend, clock):
+        hit_times(backend, 3)
+
+        backend.clear()
+
+        assert backend.hit("scope:key", 3, 60) == 0.0
+
+
+def test_it_parses_rates():
+    assert parse_rate("10/min") == (10, 60)
+    assert parse_rate("5/s") == (5, 1)
+    assert parse_rate("100/day") == (100, 24 * 60 * 60)
+
+
+@pytest.mark.django_db
+class TestThrottledViews:
+    def test_it_rejects_login_before_password_is_checked(self, api_client, settings):
+        settings.THROTTLE_RATES = {"login": "2/min"}
+        data = {"email": "nobody@example.com", "password": "wrong-passw0rd"}
+        for _ in range(2):
+            assert api_client.post("/api/users/login/", data=data).status_code == 401
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.post("/api/users/login/", data=data)
+
+        assert response.status_code == 429
+        assert int(response["Retry-After"]) > 0
+        assert len(queries) == 0
+
+    def test_it_throttles_registration_per_ip(self, api_client, settings):
+        settings.THROTTLE_RATES = {"register": "1/min"}
+        api_client.post("/api/users/register/", data={}, REMOTE_ADDR="10.0.0.1")
+
+        response = api_client.post("/api/users/register/", data={}, REMOTE_ADDR="10.0.0.1")
+        other_ip_response = api_client.post("/api/users/register/", data={}, REMOTE_ADDR="10.0.0.2")
+
+        assert response.status_code == 429
+        assert other_ip_response.status_code == 400
+
+    def test_it_throttles_transactions_per_wallet(self, api_client, wallet_owner, settings):
+        settings.THROTTLE_RATES = {"wallet_transactions": "1/min"}
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        other_wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.WITHDRAW}
+        api_client.post("/api/wallets/transactions/", data=data, format="json")
+
+        response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+        # The wallet is counted by its validated id, whatever its form in the request.
+        string_id_response = api_client.post(
+            "/api/wallets/transactions/", data={**data, "wallet_id": f"{wallet.pk}.0"}, format="json"
+        )
+        async_response = api_client.post("/api/async/wallets/transactions/", data=data, format="json")
+        other_wallet_response = api_client.post(
+            "/api/wallets/transactions/", data={**data, "wallet_id": other_wallet.pk}, format="json"
+        )
+
+        assert response.status_code == 429
+        assert string_id_response.status_code == 429
+        assert async_response.status_code == 429
+        assert other_wallet_response.status_code == 201
+
+    def test_it_does_not_count_deposits_or_wallets_of_others(self, api_client, wallet_owner, settings):
+        settings.THROTTLE_RATES = {"wallet_transactions": "1/min"}
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(balance=Decimal("10.00"))
+        deposit = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT}
+        withdrawal = {**deposit, "transaction_type": TransactionType.WITHDRAW}
+
+        deposit_responses = [
+            api_client.post("/api/wallets/transactions/", data=deposit, format="json") for _ in range(2)
+        ]
+        withdrawal_response = api_client.post("/api/wallets/transactions/", data=withdrawal, format="json")
+        api_client.force_authenticate(wallet.owner)
+        owner_response = api_client.post("/api/wallets/transactions/", data=withdrawal, format="json")
+
+        assert [response.status_code for response in deposit_responses] == [201, 201]
+        assert withdrawal_response.status_code == 400
+        assert owner_response.status_code == 201
+
+    def test_it_throttles_batch_transactions_per_wallet(self, api_client, wallet_owner, settings):
+        settings.THROTTLE_RATES = {"wallet_transactions": "2/min"}
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        item = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.WITHDRAW}
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=[item] * 3, format="json")
+
+        assert response.status_code == 429
+        assert Wallet.objects.get(pk=wallet.pk).balance == Decimal("10.00")
+
+    def test_it_throttles_transactions_per_user(self, api_client, wallet_owner, settings):
+        settings.THROTTLE_RATES = {"transactions": "1/min"}
+        api_client.force_authenticate(wallet_owner)
+        wallets = [WalletFactory(owner=wallet_owner, balance=Decimal("10.00")) for _ in range(2)]
+        for wallet in wallets:
+            data = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT}
+            response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+
+        list_response = api_client.get("/api/wallets/transactions/")
+
+        assert response.status_code == 429
+        assert list_response.status_code == 200
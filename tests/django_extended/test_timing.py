@@ -0,0 +1,83 @@
+import json
+import logging
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from django_extended.timing import _timings, timed
+
+from tests.asgi import request_over_asgi
+from tests.wallets.factories import WalletFactory
+
+
+def get_phases(response) -> dict[str, str]:
+    return dict(metric.split(";", 1) for metric in response["Server-Timing"].split(", "))
+
+
+def test_timed_does_nothing_outside_of_sampled_requests():
+    with timed("validate"):
+        pass
+
+    assert _timings.get() is None
+
+
+@pytest.mark.django_db
+class TestServerTimingMiddleware:
+    def test_it_times_phases_of_transfer(self, api_client, wallet_owner, settings, caplog):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        receiver = WalletFactory()
+        data = {
+            "wallet_id": wallet.pk,
+            "receiver_id": receiver.pk,
+            "amount": "1.00",
+            "transaction_type": TransactionType.TRANSFER,
+        }
+
+        with caplog.at_level(logging.INFO, logger="django_extended.timing"):
+            response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+
+        assert response.status_code == 201
+        phases = get_phases(response)
+        assert {"validate", "balances", "clean", "summaries", "render", "db", "total"} <= phases.keys()
+        assert phases["db"].endswith('queries"')
+        (line,) = [
+            json.loads(record.getMessage()) for record in caplog.records if record.name == "django_extended.timing"
+        ]
+        assert line["view"] == "list-create-transactions"
+        assert line["status"] == 201
+        assert line["queries"] > 0
+        assert line["total_ms"] >= line["balances_ms"]
+
+    def test_it_times_authentication(self, api_client, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+
+        response = api_client.get("/api/wallets/", HTTP_AUTHORIZATION="Bearer invalid")
+
+        assert response.status_code == 401
+        assert "auth" in get_phases(response)
+
+    def test_it_leaves_requests_out_of_sample(self, api_client, wallet_owner, settings):
+        settings.SERVER_TIMING_SAMPLE_RATE = 0.0
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.get("/api/wallets/")
+
+        assert response.status_code == 200
+        assert "Server-Timing" not in response
+
+
+@pytest.mark.django_db(transaction=True)
+def test_it_times_queries_of_view_run_in_worker_thread(wallet_owner, settings, caplog):
+    settings.SERVER_TIMING_SAMPLE_RATE = 1.0
+    WalletFactory(owner=wallet_owner)
+
+    with caplog.at_level(logging.INFO, logger="django_extended.timing"):
+        response = request_over_asgi("get", "/api/wallets/", user=wallet_owner)
+
+    assert response.status_code == 200
+    (line,) = [json.loads(record.getMessage()) for record in caplog.records if record.name == "django_extended.timing"]
+    assert line["queries"] > 0
+    assert line["db_ms"] > 0
+    assert get_phases(response)["db"].endswith(f'desc="{line["queries"]} queries"')
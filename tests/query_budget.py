@@ -0,0 +1,60 @@
+"""
+The ``query_budget`` marker: fail a test when one of its requests runs more queries than declared.
+
+    @pytest.mark.query_budget(3)
+    def test_it_lists_transactions(api_client): ...
+
+The queries of each request are counted by ``QueryBudgetMiddleware``, so those of the factories
+and of the assertions are not. A query repeated ``duplicates`` times within a request fails the
+test too, by default ``QUERY_BUDGET_DUPLICATES_THRESHOLD`` times.
+"""
+
+import pytest
+from django.conf import settings
+from django.test import override_settings
+from django_extended.query_budget import QueryStats, request_queries_counted
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(queries, duplicates=None): maximum queries of each request of the test"
+    )
+
+
+def get_failures(requests: list[tuple[str, QueryStats]], queries: int, duplicates: int | None = None) -> list[str]:
+    if duplicates is None:
+        duplicates = settings.QUERY_BUDGET_DUPLICATES_THRESHOLD
+    failures = []
+    for view, stats in requests:
+        if stats.count > queries:
+            patterns = "\n".join(f"  {count} x {pattern}" for pattern, count in stats.patterns.most_common())
+            failures.append(f"{view} ran {stats.count} queries, over the budget of {queries}:\n{patterns}")
+        for pattern, count in stats.get_duplicates(duplicates):
+            failures.append(f"{view} ran the same query {count} times: {pattern}")
+    return failures
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    marker = item.get_closest_marker("query_budget")
+    if marker is None:
+        yield
+        return
+    requests = []
+
+    def record(sender, view: str, stats: QueryStats, **kwargs):
+        requests.append((view, stats))
+
+    request_queries_counted.connect(record)
+    try:
+        with override_settings(QUERY_BUDGET_ENABLED=True):
+            outcome = yield
+    finally:
+        request_queries_counted.disconnect(record)
+    if outcome.excinfo is not None:
+        return
+    if not requests:
+        pytest.fail("The test has a query budget but sent no request.", pytrace=False)
+    failures = get_failures(requests, *marker.args, **marker.kwargs)
+    if failures:
+        pytest.fail("\n".join(failures), pytrace=False)
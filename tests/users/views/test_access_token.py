@@ -0,0 +1,119 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import UserRole
+from users.authentication import create_access_token, get_cached_user
+
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+ENDPOINT = "/api/wallets/"
+
+
+def authorization(user) -> dict[str, str]:
+    return {"HTTP_AUTHORIZATION": f"Bearer {create_access_token(user)}"}
+
+
+@pytest.mark.django_db
+class TestAccessTokenAuthentication:
+    def test_it_authenticates_user_from_cache(self, api_client, wallet_owner):
+        api_client.get(ENDPOINT, **authorization(wallet_owner))
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(ENDPOINT, **authorization(wallet_owner))
+
+        assert response.status_code == 200
+        assert not [query for query in queries if '"users"' in query["sql"]]
+
+    def test_it_authenticates_async_views(self, api_client, wallet_owner):
+        response = api_client.get("/api/async/wallets/", **authorization(wallet_owner))
+
+        assert response.status_code == 200
+
+    def test_it_returns_error_if_token_is_invalid(self, api_client, wallet_owner):
+        token = create_access_token(wallet_owner)
+
+        response = api_client.get(ENDPOINT, HTTP_AUTHORIZATION=f"Bearer {token[:-1]}x")
+
+        assert response.status_code == 401
+        assert response.data["detail"] == "Invalid token."
+        assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    def test_it_returns_error_if_token_expired(self, api_client, wallet_owner, settings):
+        settings.ACCESS_TOKEN_TTL = -1
+
+        response = api_client.get(ENDPOINT, **authorization(wallet_owner))
+
+        assert response.status_code == 401
+        assert response.data["detail"] == "Token expired."
+
+    def test_it_returns_error_if_user_is_deactivated(
+        self, api_client, wallet_owner, django_capture_on_commit_callbacks
+    ):
+        api_client.get(ENDPOINT, **authorization(wallet_owner))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_owner.is_active = False
+            wallet_owner.save()
+        response = api_client.get(ENDPOINT, **authorization(wallet_owner))
+
+        assert response.status_code == 401
+        assert response.data["detail"] == "User inactive or deleted."
+
+    def test_it_applies_role_change(self, api_client, wallet_owner, django_capture_on_commit_callbacks):
+        wallet = WalletFactory(owner=wallet_owner)
+        user = UserFactory(role=UserRole.ADMIN)
+        admin_response = api_client.get(ENDPOINT, **authorization(user))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            user.role = UserRole.WALLET_OWNER
+            user.save()
+        owner_response = api_client.get(ENDPOINT, **authorization(user))
+
+        assert [item["id"] for item in admin_response.data] == [wallet.pk]
+        assert owner_response.data == []
+
+    def test_it_returns_error_if_token_is_revoked_by_logout(
+        self, api_client, wallet_owner, django_capture_on_commit_callbacks
+    ):
+        headers = authorization(wallet_owner)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            logout_response = api_client.post("/api/users/logout/", **headers)
+        response = api_client.get(ENDPOINT, **headers)
+
+        assert logout_response.status_code == 200
+        assert response.status_code == 401
+        assert response.data["detail"] == "Token revoked."
+
+    def test_it_returns_error_if_password_changed(self, api_client, wallet_owner, django_capture_on_commit_callbacks):
+        headers = authorization(wallet_owner)
+        api_client.get(ENDPOINT, **headers)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_owner.set_password("new-password")
+            wallet_owner.save(update_fields=["password"])
+        response = api_client.get(ENDPOINT, **headers)
+
+        assert response.status_code == 401
+        assert response.data["detail"] == "Token revoked."
+        assert api_client.get(ENDPOINT, **authorization(wallet_owner)).status_code == 200
+
+    def test_it_caches_user_without_password(self, wallet_owner):
+        user = get_cached_user(wallet_owner.pk)
+
+        assert (user.pk, user.role) == (wallet_owner.pk, wallet_owner.role)
+        assert user.token_version == wallet_owner.token_version
+        with CaptureQueriesContext(connection) as queries, pytest.raises(AttributeError):
+            assert user.password
+        assert len(queries) == 0
+
+    def test_it_does_not_save_cached_user(self, wallet_owner):
+        user = get_cached_user(wallet_owner.pk)
+
+        with pytest.raises(TypeError):
+            user.save()
+        with pytest.raises(TypeError):
+            user.delete()
+        wallet_owner.refresh_from_db()
+        assert wallet_owner.email
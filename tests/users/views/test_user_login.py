@@ -19,10 +19,11 @@ class TestPost:
         data = {"email": self.email, "password": self.password}
         response = api_client.post(self.endpoint, data=data)
         assert response.status_code == 200
-        dict_str = response.content.decode("UTF-8")
-        response_data = ast.literal_eval(dict_str)
-        expected_data = {"id": self.user.id, "email": self.user.email}
+        response_data = response.json()
+        access_token = response_data.pop("access_token")
+        expected_data = {"id": self.user.id, "email": self.user.email, "token_type": "Bearer", "expires_in": 3600}
         assert response_data == expected_data
+        assert api_client.get("/api/wallets/", HTTP_AUTHORIZATION=f"Bearer {access_token}").status_code == 200
 
     def test_it_returns_error_if_required_field_was_not_entered(self, client):
         data = {"email": self.email}
@@ -0,0 +1,194 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models import Sum
+from django_extended.constants import TransactionType
+from wallets.models import DailyWalletSummary, Transaction
+from wallets.partitions import create_partitions, detach_partitions
+from wallets.services import create_transactions
+from wallets import summaries
+from wallets.summaries import check_daily_summaries, get_daily_totals, rebuild_daily_summaries
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+DAY = date(2024, 5, 10)
+
+
+def get_summaries() -> dict[tuple[int, date, str], tuple[int, Decimal]]:
+    return {
+        (wallet_id, day, transaction_type): (count, amount)
+        for wallet_id, day, transaction_type, count, amount in DailyWalletSummary.objects.values(
+            "wallet_id", "day", "transaction_type"
+        )
+        .annotate(total_count=Sum("count"), total_amount=Sum("amount"))
+        .values_list("wallet_id", "day", "transaction_type", "total_count", "total_amount")
+    }
+
+
+@pytest.mark.django_db
+class TestUpdateDailySummaries:
+    def test_it_counts_created_transactions(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        receiver = WalletFactory()
+        today = datetime.now(timezone.utc).date()
+
+        create_transactions(
+            [
+                {"wallet_id": wallet.id, "amount": Decimal("5.00"), "transaction_type": TransactionType.DEPOSIT},
+                {"wallet_id": wallet.id, "amount": Decimal("7.50"), "transaction_type": TransactionType.DEPOSIT},
+                {
+                    "wallet_id": wallet.id,
+                    "receiver_id": receiver.id,
+                    "amount": Decimal("20.00"),
+                    "transaction_type": TransactionType.TRANSFER,
+                },
+            ]
+        )
+        create_transactions(
+            [{"wallet_id": wallet.id, "amount": Decimal("1.00"), "transaction_type": TransactionType.DEPOSIT}]
+        )
+
+        assert get_summaries() == {
+            (wallet.id, today, TransactionType.DEPOSIT): (3, Decimal("13.50")),
+            (wallet.id, today, TransactionType.TRANSFER): (1, Decimal("20.00")),
+        }
+        assert check_daily_summaries(today, today) == []
+
+    def test_it_spreads_updates_of_key_over_shards(self, wallet_owner, settings, monkeypatch):
+        settings.WALLETS_SUMMARY_SHARDS = 2
+        shards = iter([0, 1, 1])
+        monkeypatch.setattr(summaries.random, "randrange", lambda stop: next(shards))
+        wallet = WalletFactory(owner=wallet_owner)
+        today = datetime.now(timezone.utc).date()
+
+        for amount in ("1.00", "2.00", "4.00"):
+            create_transactions(
+                [{"wallet_id": wallet.id, "amount": Decimal(amount), "transaction_type": TransactionType.DEPOSIT}]
+            )
+
+        assert sorted(DailyWalletSummary.objects.values_list("shard", "count", "amount")) == [
+            (0, 1, Decimal("1.00")),
+            (1, 2, Decimal("6.00")),
+        ]
+        assert get_daily_totals(today, today)["totals"] == {
+            TransactionType.DEPOSIT: {"count": 3, "amount": Decimal("7.00")}
+        }
+        assert check_daily_summaries(today, today) == []
+
+    def test_it_skips_failed_items(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("1.00"))
+
+        create_transactions(
+            [{"wallet_id": wallet.id, "amount": Decimal("5.00"), "transaction_type": TransactionType.WITHDRAW}]
+        )
+
+        assert get_summaries() == {}
+
+    def test_it_moves_cancelled_transfer_to_cancellations(self, api_client, admin_user, wallet_owner):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        receiver = WalletFactory(balance=Decimal("0.00"))
+        (transfer,) = create_transactions(
+            [
+                {
+                    "wallet_id": wallet.id,
+                    "receiver_id": receiver.id,
+                    "amount": Decimal("30.00"),
+                    "transaction_type": TransactionType.TRANSFER,
+                }
+            ]
+        )
+        today = transfer.created_at.astimezone(timezone.utc).date()
+
+        response = api_client.patch(
+            f"/api/wallets/transactions/{transfer.pk}/",
+            data={"transaction_type": TransactionType.CANCELLATION},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert get_summaries() == {
+            (wallet.id, today, TransactionType.TRANSFER): (0, Decimal("0.00")),
+            (wallet.id, today, TransactionType.CANCELLATION): (1, Decimal("30.00")),
+        }
+        assert check_daily_summaries(today, today) == []
+
+
+@pytest.mark.django_db
+class TestRebuildDailySummaries:
+    def test_it_recomputes_summaries_of_days(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner)
+        for hour, amount in ((0, "1.00"), (23, "2.00")):
+            transaction = TransactionFactory(
+                wallet=wallet, receiver=None, amount=Decimal(amount), transaction_type=TransactionType.DEPOSIT
+            )
+            Transaction.objects.filter(pk=transaction.pk).update(
+                created_at=datetime(2024, 5, 10, hour, tzinfo=timezone.utc)
+            )
+        DailyWalletSummary.objects.create(
+            wallet=wallet, day=DAY, transaction_type=TransactionType.WITHDRAW, count=4, amount=Decimal("9.00")
+        )
+        assert len(check_daily_summaries(DAY, DAY)) == 2
+
+        written = rebuild_daily_summaries(date(2024, 5, 9), date(2024, 5, 11))
+
+        assert written == 1
+        assert get_summaries() == {(wallet.id, DAY, TransactionType.DEPOSIT): (2, Decimal("3.00"))}
+        assert check_daily_summaries(DAY, DAY) == []
+
+    def test_it_skips_days_of_detached_partitions(self, wallet_owner):
+        create_partitions(date(2020, 5, 1), date(2020, 5, 1))
+        transaction = TransactionFactory(
+            wallet=WalletFactory(owner=wallet_owner), receiver=None, transaction_type=TransactionType.DEPOSIT
+        )
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=datetime(2020, 5, 10, tzinfo=timezone.utc))
+        rebuild_daily_summaries(date(2020, 5, 10), date(2020, 5, 10))
+
+        detach_partitions(date(2020, 6, 1))
+
+        assert get_summaries().keys() == {(transaction.wallet_id, date(2020, 5, 10), TransactionType.DEPOSIT)}
+        assert check_daily_summaries(date(2020, 5, 1), date(2020, 5, 31)) == []
+
+    def test_commands_rebuild_and_check_summaries(self, wallet_owner):
+        transaction = TransactionFactory(
+            wallet=WalletFactory(owner=wallet_owner), receiver=None, transaction_type=TransactionType.DEPOSIT
+        )
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=datetime(2024, 5, 10, tzinfo=timezone.utc))
+
+        with pytest.raises(CommandError):
+            call_command("check_daily_summaries", "--until", "2024-05-31")
+        call_command("rebuild_daily_summaries", "--until", "2024-05-31")
+        call_command("check_daily_summaries", "--until", "2024-05-31")
+
+
+@pytest.mark.django_db
+class TestGetDailyTotals:
+    def test_it_sums_summaries_of_wallets_by_day(self, wallet_owner):
+        wallet, other_wallet = WalletFactory(owner=wallet_owner), WalletFactory()
+        deposit, withdraw = TransactionType.DEPOSIT, TransactionType.WITHDRAW
+        DailyWalletSummary.objects.bulk_create(
+            [
+                DailyWalletSummary(wallet=wallet, day=DAY, transaction_type=deposit, count=2, amount=3),
+                DailyWalletSummary(wallet=other_wallet, day=DAY, transaction_type=deposit, count=1, amount=1),
+                # Left at zero by a cancellation.
+                DailyWalletSummary(wallet=wallet, day=DAY, transaction_type=TransactionType.TRANSFER),
+                DailyWalletSummary(wallet=wallet, day=date(2024, 5, 12), transaction_type=withdraw, count=1, amount=5),
+                DailyWalletSummary(wallet=wallet, day=date(2024, 6, 1), transaction_type=withdraw, count=1, amount=5),
+            ]
+        )
+
+        totals = get_daily_totals(date(2024, 5, 1), date(2024, 5, 31))
+
+        assert totals["days"] == [
+            {"day": DAY, "totals": {deposit: {"count": 3, "amount": Decimal("4.00")}}},
+            {"day": date(2024, 5, 12), "totals": {withdraw: {"count": 1, "amount": Decimal("5.00")}}},
+        ]
+        assert totals["totals"] == {
+            deposit: {"count": 3, "amount": Decimal("4.00")},
+            withdraw: {"count": 1, "amount": Decimal("5.00")},
+        }
+        assert get_daily_totals(DAY, DAY, wallet_id=other_wallet.id)["totals"] == {
+            deposit: {"count": 1, "amount": Decimal("1.00")}
+        }
@@ -0,0 +1,170 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection, transaction
+from django_extended.constants import TransactionType
+from wallets.exceptions import InsufficientFundsError
+from wallets.ledger import create_balance_snapshots, get_ledger_balance
+from wallets.models import BalanceSnapshot, LedgerEntry
+from wallets.services import (
+    cancel_wallet_transactions,
+    post_ledger_entries,
+    wallet_transactions,
+)
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+
+@pytest.fixture(autouse=True)
+def ledger_enabled(settings):
+    settings.WALLETS_LEDGER_ENABLED = True
+
+
+@pytest.mark.django_db
+class TestLedger:
+    def test_it_writes_debit_and_credit_entries_for_transfer(self, wallet_owner):
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+
+        wallet_transactions(wallet1.pk, wallet2.pk, Decimal("40.00"), TransactionType.TRANSFER)
+
+        entries = LedgerEntry.objects.order_by("id").values_list("wallet_id", "amount")
+        assert list(entries) == [(wallet1.pk, Decimal("-40.00")), (wallet2.pk, Decimal("40.00"))]
+        wallet1.refresh_from_db()
+        assert wallet1.balance == Decimal("100.00")
+        assert get_ledger_balance(wallet1.pk) == Decimal("60.00")
+        assert get_ledger_balance(wallet2.pk) == Decimal("40.00")
+
+    def test_it_raises_error_if_funds_are_insufficient(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.WITHDRAW)
+
+        with pytest.raises(InsufficientFundsError):
+            wallet_transactions(wallet.pk, None, Decimal("6.00"), TransactionType.WITHDRAW)
+
+        assert get_ledger_balance(wallet.pk) == Decimal("5.00")
+
+    def test_it_cancels_transaction(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        cancel_wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        assert get_ledger_balance(wallet.pk) == Decimal("10.00")
+        assert LedgerEntry.objects.last().transaction_type == TransactionType.CANCELLATION
+
+    def test_it_computes_balance_from_snapshot_and_newer_entries(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        wallet_transactions(wallet.pk, None, Decimal("3.00"), TransactionType.WITHDRAW)
+
+        call_command("snapshot_wallet_balances")
+        wallet_transactions(wallet.pk, None, Decimal("1.00"), TransactionType.DEPOSIT)
+        call_command("snapshot_wallet_balances")
+
+        snapshot = BalanceSnapshot.objects.get(wallet=wallet)
+        assert snapshot.balance == Decimal("13.00")
+        assert snapshot.last_entry_id == LedgerEntry.objects.last().id
+        wallet_transactions(wallet.pk, None, Decimal("2.00"), TransactionType.DEPOSIT)
+        assert get_ledger_balance(wallet.pk) == Decimal("15.00")
+
+    def test_balance_view_reads_ledger(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+
+        assert response.status_code == 200
+        assert response.data["balance"] == "15.00"
+
+    def test_admin_balance_edit_writes_adjustment_entry(self, api_client, wallet_owner, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        response = api_client.patch(f"/api/wallets/{wallet.pk}/", data={"balance": "100.00"}, format="json")
+
+        assert response.status_code == 200
+        assert response.data["balance"] == "100.00"
+        assert LedgerEntry.objects.last().amount == Decimal("85.00")
+        assert get_ledger_balance(wallet.pk) == Decimal("100.00")
+
+    def test_wallet_views_read_ledger(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        retrieve_response = api_client.get(f"/api/wallets/{wallet.pk}/")
+        list_response = api_client.get("/api/wallets/")
+
+        assert retrieve_response.data["balance"] == "15.00"
+        assert [item["balance"] for item in list_response.data] == ["15.00"]
+
+    def test_transaction_views_read_ledger(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "5.00", "transaction_type": TransactionType.DEPOSIT}
+
+        create_response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+        list_response = api_client.get("/api/wallets/transactions/")
+
+        assert create_response.status_code == 201
+        assert create_response.data["wallet_balance"] == "15.00"
+        assert [item["wallet_balance"] for item in list_response.data] == ["15.00"]
+
+    def test_transaction_list_reads_balances_in_one_batch(
+        self, api_client, wallet_owner, django_assert_max_num_queries
+    ):
+        api_client.force_authenticate(wallet_owner)
+        for _ in range(10):
+            wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+            TransactionFactory(
+                wallet=wallet, receiver=None, transaction_type=TransactionType.DEPOSIT, amount=Decimal("1.00")
+            )
+
+        with django_assert_max_num_queries(6):
+            response = api_client.get("/api/wallets/transactions/")
+
+        assert len(response.data) == 10
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentSnapshots:
+    def test_snapshot_waits_for_entries_in_flight(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet_transactions(wallet.pk, None, Decimal("1.00"), TransactionType.DEPOSIT)
+        credit_written = threading.Event()
+        release_credit = threading.Event()
+
+        def credit() -> None:
+            try:
+                with transaction.atomic():
+                    post_ledger_entries({wallet.pk: Decimal("5.00")})
+                    credit_written.set()
+                    release_credit.wait(timeout=10)
+            finally:
+                connection.close()
+
+        def snapshot() -> None:
+            try:
+                create_balance_snapshots()
+            finally:
+                connection.close()
+
+        credit_thread = threading.Thread(target=credit)
+        credit_thread.start()
+        assert credit_written.wait(timeout=10)
+        snapshot_thread = threading.Thread(target=snapshot)
+        snapshot_thread.start()
+        snapshot_thread.join(timeout=0.5)
+        assert snapshot_thread.is_alive()
+
+        release_credit.set()
+        credit_thread.join()
+        snapshot_thread.join()
+
+        assert BalanceSnapshot.objects.get(wallet=wallet).balance == Decimal("16.00")
+        assert get_ledger_balance(wallet.pk) == Decimal("16.00")
@@ -0,0 +1,37 @@
+import pytest
+from wallets.loaders import WalletLoader
+
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.mark.django_db
+class TestWalletLoader:
+    def test_it_reads_wallets_once(self, wallet_owner, django_assert_num_queries):
+        wallet1 = WalletFactory(owner=wallet_owner)
+        wallet2 = WalletFactory(owner=wallet_owner)
+        loader = WalletLoader()
+
+        with django_assert_num_queries(1):
+            wallets = loader.load([wallet1.pk, wallet2.pk, 0])
+            assert loader.get(wallet1.pk) is wallets[wallet1.pk]
+            assert loader.get(0) is None
+
+        assert wallets.keys() == {wallet1.pk, wallet2.pk}
+
+    def test_it_returns_loaded_wallets_only(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner)
+        loader = WalletLoader()
+
+        assert loader.get_loaded([wallet.pk]) is None
+        loader.load([wallet.pk, 0])
+        assert loader.get_loaded([wallet.pk, 0]).keys() == {wallet.pk}
+
+    def test_it_reads_discarded_wallets_again(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner)
+        loader = WalletLoader()
+        loader.load([wallet.pk])
+
+        loader.discard([wallet.pk])
+
+        assert loader.get_loaded([wallet.pk]) is None
+        assert loader.get(wallet.pk) == wallet
@@ -0,0 +1,118 @@
+import csv
+import gzip
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+from wallets.partitions import (
+    DEFAULT_PARTITION,
+    add_months,
+    create_partitions,
+    detach_partitions,
+    get_partition_months,
+    maintain_partitions,
+)
+
+from tests.wallets.factories import TransactionFactory
+
+
+def create_old_transaction(wallet_owner, created_at: datetime) -> Transaction:
+    transaction = TransactionFactory(
+        wallet__owner=wallet_owner,
+        receiver=None,
+        transaction_type=TransactionType.DEPOSIT,
+        amount=Decimal("10.00"),
+    )
+    Transaction.objects.filter(pk=transaction.pk).update(created_at=created_at)
+    return transaction
+
+
+def get_partition(transaction: Transaction) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT tableoid::regclass::text FROM wallets_transaction WHERE id = %s", [transaction.pk])
+        return cursor.fetchone()[0]
+
+
+def table_exists(name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [name])
+        return cursor.fetchone()[0]
+
+
+@pytest.mark.django_db
+class TestPartitions:
+    def test_it_stores_transactions_in_monthly_partitions(self, wallet_owner):
+        transaction = TransactionFactory(
+            wallet__owner=wallet_owner,
+            receiver=None,
+            transaction_type=TransactionType.DEPOSIT,
+        )
+        old_transaction = create_old_transaction(wallet_owner, datetime(2020, 5, 3, tzinfo=timezone.utc))
+
+        assert get_partition(transaction) == f"wallets_transaction_p{transaction.created_at:%Y_%m}"
+        assert get_partition(old_transaction) == DEFAULT_PARTITION
+
+    def test_it_keeps_partitions_of_next_months(self):
+        this_month = date.today().replace(day=1)
+
+        created, detached = maintain_partitions()
+
+        assert created == []
+        assert detached == []
+        assert get_partition_months()[-4:] == [add_months(this_month, months) for months in range(4)]
+
+    def test_it_moves_rows_of_default_partition_to_new_partition(self, wallet_owner):
+        transaction = create_old_transaction(wallet_owner, datetime(2020, 5, 3, tzinfo=timezone.utc))
+
+        created = create_partitions(date(2020, 4, 1), date(2020, 5, 1))
+
+        assert created == ["wallets_transaction_p2020_04", "wallets_transaction_p2020_05"]
+        assert get_partition(transaction) == "wallets_transaction_p2020_05"
+        assert Transaction.objects.filter(pk=transaction.pk).exists()
+
+    def test_it_detaches_old_partitions(self, wallet_owner):
+        create_partitions(date(2020, 4, 1), date(2020, 5, 1))
+        transaction = create_old_transaction(wallet_owner, datetime(2020, 5, 3, tzinfo=timezone.utc))
+
+        detached = detach_partitions(date(2020, 6, 1))
+
+        assert detached == ["wallets_transaction_p2020_04", "wallets_transaction_p2020_05"]
+        assert not Transaction.objects.filter(pk=transaction.pk).exists()
+        assert table_exists("wallets_transaction_p2020_05")
+        assert date(2020, 5, 1) not in get_partition_months()
+
+    def test_it_archives_detached_partitions(self, wallet_owner, tmp_path):
+        create_partitions(date(2020, 5, 1), date(2020, 5, 1))
+        transaction = create_old_transaction(wallet_owner, datetime(2020, 5, 3, tzinfo=timezone.utc))
+        # The rows are committed before a partition is archived, which runs the deferred foreign key checks.
+        connection.cursor().execute("SET CONSTRAINTS ALL IMMEDIATE")
+
+        detach_partitions(date(2020, 6, 1), archive_dir=tmp_path)
+
+        with gzip.open(tmp_path / "wallets_transaction_p2020_05.csv.gz", "rt") as archive:
+            rows = list(csv.DictReader(archive))
+        assert [int(row["id"]) for row in rows] == [transaction.pk]
+        assert not table_exists("wallets_transaction_p2020_05")
+
+
+@pytest.mark.django_db
+class TestPartitionTransactionsCommand:
+    def test_it_creates_and_detaches_partitions(self, wallet_owner, tmp_path):
+        transaction = create_old_transaction(wallet_owner, datetime(2020, 5, 3, tzinfo=timezone.utc))
+
+        call_command("partition_transactions", since="2020-04", archive_dir=str(tmp_path))
+        assert get_partition(transaction) == "wallets_transaction_p2020_05"
+        connection.cursor().execute("SET CONSTRAINTS ALL IMMEDIATE")
+        call_command("partition_transactions", detach_before="2020-05", archive_dir=str(tmp_path))
+
+        assert date(2020, 4, 1) not in get_partition_months()
+        assert date(2020, 5, 1) in get_partition_months()
+        assert (tmp_path / "wallets_transaction_p2020_04.csv.gz").exists()
+
+    def test_it_returns_error_if_month_is_invalid(self):
+        with pytest.raises(CommandError, match="YYYY-MM"):
+            call_command("partition_transactions", since="2020-13")
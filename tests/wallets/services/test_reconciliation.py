@@ -0,0 +1,207 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from app.celery import app
+from django.core.management import CommandError, call_command
+from django_extended.constants import TransactionType
+from wallets.models import BalanceMismatch, OpeningBalance, ReconciliationRun, Transaction, Wallet
+from wallets.partitions import create_partitions, detach_partitions
+from wallets.reconciliation import accept_mismatches, get_net_balances, reconcile_range, start_reconciliation
+from wallets.services import create_transactions
+from wallets.tasks import reconcile_wallet_balances
+
+from tests.wallets.factories import WalletFactory
+
+
+def reconcile(full: bool = False) -> ReconciliationRun:
+    run, ranges = start_reconciliation(full, chunk_size=2)
+    for first_id, last_id in ranges:
+        reconcile_range(run.pk, first_id, last_id)
+    return ReconciliationRun.objects.get(pk=run.pk)
+
+
+@pytest.fixture
+def wallets(wallet_owner) -> tuple[Wallet, Wallet]:
+    wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+    receiver = WalletFactory(balance=Decimal("0.00"))
+    create_transactions(
+        [
+            {"wallet_id": wallet.id, "amount": Decimal("100.00"), "transaction_type": TransactionType.DEPOSIT},
+            {"wallet_id": wallet.id, "amount": Decimal("10.00"), "transaction_type": TransactionType.WITHDRAW},
+            {
+                "wallet_id": wallet.id,
+                "receiver_id": receiver.id,
+                "amount": Decimal("25.00"),
+                "transaction_type": TransactionType.TRANSFER,
+            },
+        ]
+    )
+    return wallet, receiver
+
+
+@pytest.mark.django_db
+class TestReconciliation:
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_matches_balances_with_their_transactions(self, wallets, settings, ledger_enabled):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        wallet, receiver = wallets
+        create_transactions(
+            [{"wallet_id": receiver.id, "amount": Decimal("5.00"), "transaction_type": TransactionType.DEPOSIT}]
+        )
+
+        run = reconcile(full=True)
+
+        assert [row[::3] for row in get_net_balances(wallet.id, receiver.id)] == [
+            (wallet.id, Decimal("65.00")),
+            (receiver.id, Decimal("30.00")),
+        ]
+        assert (run.ranges, run.ranges_done, run.wallets_checked, run.mismatches) == (1, 1, 2, 0)
+        assert run.finished_at is not None
+        assert not BalanceMismatch.objects.exists()
+
+    def test_it_reports_balance_changed_without_transaction(self, wallets):
+        wallet, receiver = wallets
+        Wallet.objects.filter(pk=receiver.pk).update(balance=Decimal("40.00"))
+
+        run = reconcile(full=True)
+
+        assert run.mismatches == 1
+        assert list(BalanceMismatch.objects.values_list("wallet_id", "run_id", "balance", "expected")) == [
+            (receiver.id, run.pk, Decimal("40.00"), Decimal("25.00"))
+        ]
+
+    def test_it_counts_cancelled_transfer_for_nothing(self, wallets, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet, receiver = wallets
+        (transfer,) = create_transactions(
+            [
+                {
+                    "wallet_id": receiver.id,
+                    "receiver_id": wallet.id,
+                    "amount": Decimal("5.00"),
+                    "transaction_type": TransactionType.TRANSFER,
+                }
+            ]
+        )
+
+        response = api_client.patch(
+            f"/api/wallets/transactions/{transfer.pk}/",
+            data={"transaction_type": TransactionType.CANCELLATION},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        assert reconcile(full=True).mismatches == 0
+
+    @pytest.mark.parametrize("transaction_type", [TransactionType.DEPOSIT, TransactionType.WITHDRAW])
+    def test_it_counts_cancelled_deposit_or_withdrawal_for_nothing(
+        self, wallets, api_client, admin_user, transaction_type
+    ):
+        api_client.force_authenticate(admin_user)
+        wallet, receiver = wallets
+        (cancelled,) = create_transactions(
+            [{"wallet_id": wallet.id, "amount": Decimal("20.00"), "transaction_type": transaction_type}]
+        )
+
+        response = api_client.patch(
+            f"/api/wallets/transactions/{cancelled.pk}/",
+            data={"transaction_type": TransactionType.CANCELLATION},
+            format="json",
+        )
+
+        assert response.status_code == 200
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal("65.00")
+        assert reconcile(full=True).mismatches == 0
+
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_starts_from_balance_edits_of_admins(self, wallets, settings, api_client, admin_user, ledger_enabled):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        api_client.force_authenticate(admin_user)
+        wallet, receiver = wallets
+
+        response = api_client.patch(f"/api/wallets/{receiver.pk}/", data={"balance": "40.00"}, format="json")
+
+        assert response.status_code == 200
+        assert OpeningBalance.objects.get(wallet=receiver).balance == Decimal("15.00")
+        assert reconcile(full=True).mismatches == 0
+
+    def test_it_starts_from_transactions_of_detached_partitions(self, wallets):
+        wallet, receiver = wallets
+        create_partitions(date(2020, 5, 1), date(2020, 5, 1))
+        Transaction.objects.filter(wallet=wallet, transaction_type=TransactionType.TRANSFER).update(
+            created_at=datetime(2020, 5, 3, tzinfo=timezone.utc)
+        )
+
+        detach_partitions(date(2020, 6, 1))
+
+        assert not Transaction.objects.filter(transaction_type=TransactionType.TRANSFER).exists()
+        assert dict(OpeningBalance.objects.values_list("wallet_id", "balance")) == {
+            wallet.id: Decimal("-25.00"),
+            receiver.id: Decimal("25.00"),
+        }
+        assert reconcile(full=True).mismatches == 0
+
+    def test_accepted_mismatches_are_reconciled(self, wallets):
+        wallet, receiver = wallets
+        Wallet.objects.filter(pk__in=[wallet.pk, receiver.pk]).update(balance=Decimal("40.00"))
+        assert reconcile(full=True).mismatches == 2
+
+        assert accept_mismatches([receiver.id]) == 1
+
+        assert list(BalanceMismatch.objects.values_list("wallet_id", flat=True)) == [wallet.id]
+        assert OpeningBalance.objects.get(wallet=receiver).balance == Decimal("15.00")
+        call_command("reconcile_balances", accept=[])
+        assert reconcile(full=True).mismatches == 0
+
+    def test_later_runs_check_wallets_changed_since_watermark(self, wallets, settings):
+        settings.WALLETS_RECONCILIATION_OVERLAP = 0
+        wallet, receiver = wallets
+        untouched = WalletFactory(balance=Decimal("7.00"))
+        first_run = reconcile()
+        assert first_run.since is None
+        assert (first_run.wallets_checked, first_run.mismatches) == (3, 1)
+
+        create_transactions(
+            [{"wallet_id": wallet.id, "amount": Decimal("1.00"), "transaction_type": TransactionType.DEPOSIT}]
+        )
+        second_run = reconcile()
+
+        assert second_run.since == first_run.created_at
+        assert (second_run.wallets_checked, second_run.mismatches) == (1, 0)
+        # The mismatch of the wallet left unchanged is still reported.
+        assert list(BalanceMismatch.objects.values_list("wallet_id", "run_id")) == [(untouched.id, first_run.pk)]
+
+        untouched.balance = Decimal("0.00")
+        untouched.save()
+        third_run = reconcile()
+
+        assert (third_run.wallets_checked, third_run.mismatches) == (1, 0)
+        assert not BalanceMismatch.objects.exists()
+
+    def test_task_checks_every_range(self, wallets, settings, monkeypatch):
+        monkeypatch.setattr(app.conf, "task_always_eager", True)
+        settings.WALLETS_RECONCILIATION_CHUNK_SIZE = 1
+
+        run = ReconciliationRun.objects.get(pk=reconcile_wallet_balances(full=True))
+
+        assert (run.ranges, run.ranges_done, run.wallets_checked) == (2, 2, 2)
+        assert run.finished_at is not None
+
+    def test_command_sends_chunk_size_to_task(self, wallets, monkeypatch):
+        monkeypatch.setattr(app.conf, "task_always_eager", True)
+
+        call_command("reconcile_balances", full=True, chunk_size=1)
+
+        run = ReconciliationRun.objects.get()
+        assert (run.ranges, run.ranges_done, run.wallets_checked) == (2, 2, 2)
+
+    def test_command_fails_on_mismatches(self, wallets):
+        wallet, receiver = wallets
+        call_command("reconcile_balances", inline=True, full=True)
+
+        Wallet.objects.filter(pk=wallet.pk).update(balance=Decimal("1.00"))
+
+        with pytest.raises(CommandError, match="1 of the 2 balances checked differ"):
+            call_command("reconcile_balances", inline=True, full=True)
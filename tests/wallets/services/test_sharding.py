@@ -0,0 +1,166 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import TransactionType
+from wallets.exceptions import InsufficientFundsError, ShardCountChangedError
+from wallets.loaders import WalletLoader, _loader
+from wallets.models import Wallet, WalletBalanceShard
+from wallets.services import create_transactions, get_wallet_balance, wallet_transactions
+
+from tests.wallets.factories import WalletFactory
+
+
+def shard_balances(wallet: Wallet) -> list[Decimal]:
+    return list(WalletBalanceShard.objects.filter(wallet=wallet).order_by("index").values_list("balance", flat=True))
+
+
+@pytest.mark.django_db
+class TestShardedBalance:
+    def test_it_spreads_balance_over_shards(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.01"))
+
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+
+        wallet.refresh_from_db()
+        assert wallet.shard_count == 4
+        assert wallet.balance == Decimal("0.00")
+        assert shard_balances(wallet) == [Decimal("2.51"), Decimal("2.50"), Decimal("2.50"), Decimal("2.50")]
+        assert get_wallet_balance(wallet) == Decimal("10.01")
+
+    def test_it_merges_shards_back(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        call_command("shard_wallet_balance", wallet.pk, shards=0)
+
+        wallet.refresh_from_db()
+        assert wallet.shard_count == 0
+        assert wallet.balance == Decimal("15.00")
+        assert not WalletBalanceShard.objects.filter(wallet=wallet).exists()
+
+    def test_credit_changes_one_shard(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        assert sorted(shard_balances(wallet)) == [Decimal("0.00")] * 3 + [Decimal("5.00")]
+
+    def test_debit_rebalances_shards_if_no_shard_covers_it(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("8.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+
+        wallet_transactions(wallet.pk, None, Decimal("1.00"), TransactionType.WITHDRAW)
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.WITHDRAW)
+
+        assert shard_balances(wallet) == [Decimal("0.50")] * 4
+
+    def test_it_raises_error_if_shards_do_not_cover_debit(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("8.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+
+        with pytest.raises(InsufficientFundsError):
+            wallet_transactions(wallet.pk, None, Decimal("8.01"), TransactionType.WITHDRAW)
+
+        assert sum(shard_balances(wallet)) == Decimal("8.00")
+
+    def test_it_locks_again_if_loaded_shard_count_is_stale(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("8.00"))
+        loader = WalletLoader()
+        loader.load([wallet.pk])
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+        token = _loader.set(loader)
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                wallet_transactions(wallet.pk, None, Decimal("2.00"), TransactionType.WITHDRAW)
+        finally:
+            _loader.reset(token)
+
+        assert sum(shard_balances(wallet)) == Decimal("6.00")
+        assert sum("ROLLBACK TO SAVEPOINT" in query["sql"] for query in queries.captured_queries) == 1
+
+    def test_it_gives_up_if_sharding_keeps_changing(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("8.00"))
+        # Sharded without its shards, as if the shard count changed before every lock.
+        Wallet.objects.filter(pk=wallet.pk).update(shard_count=4)
+
+        with pytest.raises(ShardCountChangedError) as error:
+            wallet_transactions(wallet.pk, None, Decimal("2.00"), TransactionType.WITHDRAW)
+
+        assert error.value.wallet_ids == [wallet.pk]
+
+    def test_it_transfers_between_plain_and_sharded_wallets(self, wallet_owner):
+        plain = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        sharded = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        call_command("shard_wallet_balance", sharded.pk, shards=2)
+
+        wallet_transactions(plain.pk, sharded.pk, Decimal("4.00"), TransactionType.TRANSFER)
+        wallet_transactions(sharded.pk, plain.pk, Decimal("12.00"), TransactionType.TRANSFER)
+
+        plain.refresh_from_db()
+        sharded.refresh_from_db()
+        assert plain.balance == Decimal("18.00")
+        assert get_wallet_balance(sharded) == Decimal("2.00")
+
+    def test_batch_applies_net_change_to_shards(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=2)
+        items = [
+            {"wallet_id": wallet.pk, "amount": Decimal("3.00"), "transaction_type": TransactionType.DEPOSIT},
+            {"wallet_id": wallet.pk, "amount": Decimal("14.00"), "transaction_type": TransactionType.WITHDRAW},
+            {"wallet_id": wallet.pk, "amount": Decimal("12.00"), "transaction_type": TransactionType.WITHDRAW},
+        ]
+
+        results = create_transactions(items)
+
+        assert isinstance(results[1], InsufficientFundsError)
+        assert sum(shard_balances(wallet)) == Decimal("1.00")
+
+    def test_views_report_sum_of_shards(self, api_client, wallet_owner, admin_user):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+        wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        api_client.force_authenticate(wallet_owner)
+
+        balance_response = api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+        list_response = api_client.get("/api/wallets/")
+        api_client.force_authenticate(admin_user)
+        update_response = api_client.patch(f"/api/wallets/{wallet.pk}/", data={"balance": "100.00"}, format="json")
+
+        assert balance_response.data["balance"] == "15.00"
+        assert [item["balance"] for item in list_response.data] == ["15.00"]
+        assert update_response.data["balance"] == "100.00"
+        assert shard_balances(wallet) == [Decimal("25.00")] * 4
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentShardedDeposits:
+    def test_it_does_not_lose_updates(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        call_command("shard_wallet_balance", wallet.pk, shards=4)
+        errors = []
+
+        def deposit() -> None:
+            try:
+                for _ in range(20):
+                    wallet_transactions(wallet.pk, None, Decimal("1.00"), TransactionType.DEPOSIT)
+                    wallet_transactions(wallet.pk, None, Decimal("0.50"), TransactionType.WITHDRAW)
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=deposit) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        wallet.refresh_from_db()
+        assert errors == []
+        assert get_wallet_balance(wallet) == Decimal("80.00")
@@ -0,0 +1,231 @@
+import json
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from app.celery import app
+from django.core.management import call_command
+from django.db.models import Max
+from django_extended.constants import TransactionType
+from wallets.models import LedgerEntry, OpeningBalance, Transaction, Wallet
+from wallets.services import create_transactions
+from wallets.partitions import create_partitions, detach_partitions
+from wallets.statements import build_statements, get_pending_ranges, get_statements_path, write_statements
+from wallets.tasks import generate_monthly_statements
+
+from tests.wallets.factories import WalletFactory
+
+MAY = date(2024, 5, 1)
+
+
+def create_transaction(created_at: datetime, **item) -> Transaction:
+    last_entry_id = LedgerEntry.objects.aggregate(last_id=Max("id"))["last_id"] or 0
+    (transaction,) = create_transactions([item])
+    Transaction.objects.filter(pk=transaction.pk).update(created_at=created_at)
+    LedgerEntry.objects.filter(id__gt=last_entry_id).update(created_at=created_at)
+    return transaction
+
+
+@pytest.fixture
+def statements_dir(settings, tmp_path):
+    settings.WALLETS_STATEMENTS_DIR = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def wallets(wallet_owner) -> tuple[Wallet, Wallet]:
+    wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+    receiver = WalletFactory(balance=Decimal("0.00"))
+    # No transaction records the balance the wallet was created with.
+    OpeningBalance.objects.create(wallet=wallet, balance=Decimal("100.00"))
+    Wallet.objects.update(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+    return wallet, receiver
+
+
+@pytest.mark.django_db
+class TestBuildStatements:
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_computes_balances_totals_and_transactions(self, wallets, settings, ledger_enabled):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        wallet, receiver = wallets
+        create_transaction(
+            datetime(2024, 4, 30, 23, 59, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            amount=Decimal("5.00"),
+            transaction_type=TransactionType.DEPOSIT,
+        )
+        create_transaction(
+            datetime(2024, 5, 10, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            amount=Decimal("50.00"),
+            transaction_type=TransactionType.DEPOSIT,
+        )
+        transfer = create_transaction(
+            datetime(2024, 5, 20, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            receiver_id=receiver.id,
+            amount=Decimal("30.00"),
+            transaction_type=TransactionType.TRANSFER,
+        )
+        create_transaction(
+            datetime(2024, 6, 1, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            amount=Decimal("10.00"),
+            transaction_type=TransactionType.WITHDRAW,
+        )
+
+        statements = {statement["wallet_id"]: statement for statement in build_statements(MAY, wallet.id, receiver.id)}
+
+        assert statements[wallet.id]["opening_balance"] == Decimal("105.00")
+        assert statements[wallet.id]["closing_balance"] == Decimal("125.00")
+        assert statements[wallet.id]["totals"] == {
+            TransactionType.DEPOSIT: {"count": 1, "amount": Decimal("50.00")},
+            TransactionType.TRANSFER: {"count": 1, "amount": Decimal("30.00")},
+        }
+        assert [item["amount"] for item in statements[wallet.id]["transactions"]] == [Decimal("50"), Decimal("-30")]
+        assert statements[receiver.id]["opening_balance"] == Decimal("0.00")
+        assert statements[receiver.id]["closing_balance"] == Decimal("30.00")
+        assert statements[receiver.id]["received_transfers"] == {"count": 1, "amount": Decimal("30.00")}
+        assert statements[receiver.id]["transactions"] == [
+            {
+                "id": transfer.id,
+                "created_at": datetime(2024, 5, 20, tzinfo=timezone.utc),
+                "transaction_type": TransactionType.TRANSFER,
+                "amount": Decimal("30.00"),
+                "counterparty_id": wallet.id,
+            }
+        ]
+
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_counts_cancelled_transfer_for_nothing(self, wallets, settings, api_client, admin_user, ledger_enabled):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        api_client.force_authenticate(admin_user)
+        wallet, receiver = wallets
+        transfer = create_transaction(
+            datetime(2024, 5, 20, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            receiver_id=receiver.id,
+            amount=Decimal("30.00"),
+            transaction_type=TransactionType.TRANSFER,
+        )
+        response = api_client.patch(
+            f"/api/wallets/transactions/{transfer.pk}/",
+            data={"transaction_type": TransactionType.CANCELLATION},
+            format="json",
+        )
+        assert response.status_code == 200
+        # The transfer was cancelled within the month as well.
+        LedgerEntry.objects.update(created_at=datetime(2024, 5, 21, tzinfo=timezone.utc))
+
+        statements = {statement["wallet_id"]: statement for statement in build_statements(MAY, wallet.id, receiver.id)}
+
+        assert (statements[wallet.id]["opening_balance"], statements[wallet.id]["closing_balance"]) == (
+            Decimal("100.00"),
+            Decimal("100.00"),
+        )
+        assert (statements[receiver.id]["opening_balance"], statements[receiver.id]["closing_balance"]) == (
+            Decimal("0.00"),
+            Decimal("0.00"),
+        )
+        assert [item["amount"] for item in statements[wallet.id]["transactions"]] == [Decimal("0.00")]
+        assert [item["amount"] for item in statements[receiver.id]["transactions"]] == [Decimal("0.00")]
+
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_starts_from_transactions_of_detached_partitions(self, wallets, settings, ledger_enabled):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        wallet, receiver = wallets
+        create_partitions(date(2020, 5, 1), date(2020, 5, 1))
+        create_transaction(
+            datetime(2020, 5, 3, tzinfo=timezone.utc),
+            wallet_id=wallet.id,
+            receiver_id=receiver.id,
+            amount=Decimal("40.00"),
+            transaction_type=TransactionType.TRANSFER,
+        )
+
+        detach_partitions(date(2020, 6, 1))
+        statements = {statement["wallet_id"]: statement for statement in build_statements(MAY, wallet.id, receiver.id)}
+
+        assert (statements[wallet.id]["opening_balance"], statements[wallet.id]["closing_balance"]) == (
+            Decimal("60.00"),
+            Decimal("60.00"),
+        )
+        assert (statements[receiver.id]["opening_balance"], statements[receiver.id]["closing_balance"]) == (
+            Decimal("40.00"),
+            Decimal("40.00"),
+        )
+
+    def test_it_starts_from_opening_balance_not_balance_column(self, wallets):
+        wallet, receiver = wallets
+        Wallet.objects.filter(pk=receiver.pk).update(balance=Decimal("40.00"))
+
+        statements = {statement["wallet_id"]: statement for statement in build_statements(MAY, wallet.id, receiver.id)}
+
+        assert (statements[receiver.id]["opening_balance"], statements[receiver.id]["closing_balance"]) == (
+            Decimal("0.00"),
+            Decimal("0.00"),
+        )
+
+    def test_it_leaves_out_wallets_created_after_month(self, wallets):
+        wallet, receiver = wallets
+        Wallet.objects.filter(pk=receiver.pk).update(created_at=datetime(2024, 6, 1, tzinfo=timezone.utc))
+
+        statements = build_statements(MAY, wallet.id, receiver.id)
+
+        assert [statement["wallet_id"] for statement in statements] == [wallet.id]
+
+
+@pytest.mark.django_db
+class TestWriteStatements:
+    def test_it_writes_statements_file_once(self, wallets, statements_dir):
+        wallet, receiver = wallets
+
+        written = write_statements(MAY, wallet.id, receiver.id)
+
+        path = get_statements_path(MAY, wallet.id, receiver.id)
+        assert path.parent == statements_dir / "2024-05"
+        statements = [json.loads(line) for line in path.read_text().splitlines()]
+        assert written == 2
+        assert statements[0]["closing_balance"] == "100.00"
+        assert write_statements(MAY, wallet.id, receiver.id) == 0
+        assert list(path.parent.iterdir()) == [path]
+
+    def test_it_resumes_from_pending_ranges(self, wallets, statements_dir):
+        wallet, receiver = wallets
+        WalletFactory.create_batch(2)
+        Wallet.objects.update(created_at=datetime(2024, 1, 1, tzinfo=timezone.utc))
+        first_range, *other_ranges = get_pending_ranges(MAY, chunk_size=2)
+        write_statements(MAY, *first_range)
+
+        assert first_range == (wallet.id, receiver.id)
+        assert get_pending_ranges(MAY, chunk_size=2) == other_ranges == [(receiver.id + 1, receiver.id + 2)]
+
+    def test_task_writes_statements_of_every_range(self, wallets, statements_dir, settings, monkeypatch):
+        monkeypatch.setattr(app.conf, "task_always_eager", True)
+        settings.WALLETS_STATEMENT_CHUNK_SIZE = 1
+        wallet, receiver = wallets
+
+        sent = generate_monthly_statements("2024-05")
+
+        assert sent == 2
+        assert sorted(path.name for path in (statements_dir / "2024-05").iterdir()) == sorted(
+            [f"statements-{wallet.id}-{wallet.id}.ndjson", f"statements-{receiver.id}-{receiver.id}.ndjson"]
+        )
+        assert generate_monthly_statements("2024-05") == 0
+
+    def test_command_sends_chunk_size_to_task(self, wallets, statements_dir, monkeypatch):
+        monkeypatch.setattr(app.conf, "task_always_eager", True)
+        wallet, receiver = wallets
+
+        call_command("generate_statements", month="2024-05", chunk_size=1)
+
+        assert sorted(path.name for path in (statements_dir / "2024-05").iterdir()) == sorted(
+            [f"statements-{wallet.id}-{wallet.id}.ndjson", f"statements-{receiver.id}-{receiver.id}.ndjson"]
+        )
+
+    def test_command_writes_statements_inline(self, wallets, statements_dir):
+        wallet, receiver = wallets
+
+        call_command("generate_statements", month="2024-05", inline=True)
+
+        assert get_statements_path(MAY, wallet.id, receiver.id).exists()
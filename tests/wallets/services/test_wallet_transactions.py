@@ -0,0 +1,86 @@
+import random
+import threading
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django_extended.constants import TransactionType
+from wallets.exceptions import InsufficientFundsError
+from wallets.models import Wallet
+from wallets.services import cancel_wallet_transactions, wallet_transactions
+
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.mark.django_db
+class TestWalletTransactions:
+    def test_it_transfers_amount(self, wallet_owner):
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+
+        wallet_transactions(wallet1.pk, wallet2.pk, Decimal("40.00"), TransactionType.TRANSFER)
+
+        wallet1.refresh_from_db()
+        wallet2.refresh_from_db()
+        assert wallet1.balance == Decimal("60.00")
+        assert wallet2.balance == Decimal("40.00")
+
+    def test_it_raises_error_if_funds_are_insufficient(self, wallet_owner):
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+
+        with pytest.raises(InsufficientFundsError):
+            wallet_transactions(wallet1.pk, wallet2.pk, Decimal("40.00"), TransactionType.TRANSFER)
+
+        wallet1.refresh_from_db()
+        wallet2.refresh_from_db()
+        assert wallet1.balance == Decimal("10.00")
+        assert wallet2.balance == Decimal("0.00")
+
+    def test_it_raises_error_if_wallet_does_not_exist(self):
+        with pytest.raises(Wallet.DoesNotExist):
+            wallet_transactions(123, None, Decimal("40.00"), TransactionType.DEPOSIT)
+
+    def test_it_cancels_transfer(self, wallet_owner):
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("60.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("40.00"))
+
+        cancel_wallet_transactions(wallet1.pk, wallet2.pk, Decimal("40.00"), TransactionType.TRANSFER)
+
+        wallet1.refresh_from_db()
+        wallet2.refresh_from_db()
+        assert wallet1.balance == Decimal("100.00")
+        assert wallet2.balance == Decimal("0.00")
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentTransfers:
+    def test_it_does_not_lose_updates(self, wallet_owner):
+        wallets = [WalletFactory(owner=wallet_owner, balance=Decimal("50.00")) for _ in range(4)]
+        wallet_ids = [wallet.pk for wallet in wallets]
+        errors = []
+
+        def transfer(seed: int) -> None:
+            rnd = random.Random(seed)
+            try:
+                for _ in range(25):
+                    sender_id, receiver_id = rnd.sample(wallet_ids, 2)
+                    try:
+                        wallet_transactions(sender_id, receiver_id, Decimal("7.00"), TransactionType.TRANSFER)
+                    except InsufficientFundsError:
+                        pass
+            except Exception as error:
+                errors.append(error)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=transfer, args=(seed,)) for seed in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        balances = list(Wallet.objects.filter(id__in=wallet_ids).values_list("balance", flat=True))
+        assert errors == []
+        assert sum(balances) == Decimal("200.00")
+        assert min(balances) >= Decimal("0.00")
@@ -0,0 +1,74 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import TransactionType
+from rest_framework.renderers import JSONRenderer
+from wallets.models import DailyWalletSummary
+
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.mark.django_db
+class TestGet:
+    def test_it_returns_daily_totals_from_summaries(self, api_client, admin_user, wallet_owner):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner)
+        DailyWalletSummary.objects.create(
+            wallet=wallet, day=date(2024, 5, 10), transaction_type=TransactionType.DEPOSIT, count=2, amount=10
+        )
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/wallets/analytics/?since=2024-05-01&until=2024-05-31")
+
+        assert response.status_code == 200
+        assert response.json()["days"] == [
+            {"day": "2024-05-10", "totals": {TransactionType.DEPOSIT: {"count": 2, "amount": "10.00"}}}
+        ]
+        assert response.json()["totals"] == {TransactionType.DEPOSIT: {"count": 2, "amount": "10.00"}}
+        assert not [query for query in queries if "wallets_transaction" in query["sql"]]
+
+    def test_it_defaults_to_last_days(self, api_client, admin_user, settings):
+        settings.WALLETS_ANALYTICS_DEFAULT_DAYS = 7
+        api_client.force_authenticate(admin_user)
+        today = datetime.now(timezone.utc).date()
+
+        response = api_client.get("/api/wallets/analytics/")
+
+        assert response.status_code == 200
+        assert (response.data["since"], response.data["until"]) == (str(today - timedelta(days=6)), str(today))
+
+    def test_it_renders_amounts_as_strings_without_orjson(self, api_client, admin_user, wallet_owner):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner)
+        DailyWalletSummary.objects.create(
+            wallet=wallet,
+            day=date(2024, 5, 10),
+            transaction_type=TransactionType.DEPOSIT,
+            count=1,
+            amount=Decimal("0.10"),
+        )
+
+        response = api_client.get("/api/wallets/analytics/?since=2024-05-01&until=2024-05-31")
+
+        assert json.loads(JSONRenderer().render(response.data))["totals"] == {
+            TransactionType.DEPOSIT: {"count": 1, "amount": "0.10"}
+        }
+
+    def test_it_returns_error_if_range_is_too_long(self, api_client, admin_user, settings):
+        settings.WALLETS_ANALYTICS_MAX_DAYS = 31
+        api_client.force_authenticate(admin_user)
+
+        response = api_client.get("/api/wallets/analytics/?since=2024-01-01&until=2024-05-31")
+
+        assert response.status_code == 400
+
+    def test_it_returns_error_if_user_is_not_admin(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.get("/api/wallets/analytics/")
+
+        assert response.status_code == 403
@@ -0,0 +1,114 @@
+import base64
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.mark.django_db
+class TestGetBalance:
+    def test_it_returns_same_body_as_sync_view(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+
+        async_response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/")
+        sync_response = api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+
+        assert async_response.status_code == 200
+        assert async_response.content == sync_response.content
+
+    def test_it_reads_ledger_balance(self, api_client, wallet_owner, settings):
+        settings.WALLETS_LEDGER_ENABLED = True
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "5.00", "transaction_type": TransactionType.DEPOSIT}
+        api_client.post("/api/async/wallets/transactions/", data=data, format="json")
+
+        response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/")
+
+        assert response.json()["balance"] == "15.00"
+
+    def test_it_returns_error_if_user_gets_not_his_wallet(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=UserFactory())
+
+        response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/")
+
+        assert response.status_code == 404
+        assert response.json() == {"detail": "No Wallet matches the given query."}
+
+    def test_it_returns_error_if_user_is_not_auth(self, api_client):
+        response = api_client.get("/api/async/wallets/1/balance/")
+
+        assert response.status_code == 401
+        assert response["WWW-Authenticate"] == 'Bearer realm="api"'
+
+    def test_it_authenticates_with_basic_auth_over_asgi(self, wallet_owner):
+        wallet_owner.set_password("secret")
+        wallet_owner.save()
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        credentials = base64.b64encode(f"{wallet_owner.email}:secret".encode()).decode()
+
+        response = async_to_sync(AsyncClient().get)(
+            f"/api/async/wallets/{wallet.pk}/balance/", AUTHORIZATION=f"Basic {credentials}"
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"id": wallet.pk, "balance": "10.00"}
+
+
+@pytest.mark.django_db
+class TestGetList:
+    def test_it_returns_same_body_as_sync_view(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        WalletFactory.create_batch(3, owner=wallet_owner)
+        WalletFactory(owner=UserFactory())
+
+        async_response = api_client.get("/api/async/wallets/")
+        sync_response = api_client.get("/api/wallets/")
+
+        assert async_response.status_code == 200
+        assert len(async_response.json()) == 3
+        assert async_response.content == sync_response.content
+
+
+@pytest.mark.django_db
+class TestPostTransaction:
+    def test_it_creates_transaction(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "4.00", "transaction_type": TransactionType.WITHDRAW}
+
+        response = api_client.post("/api/async/wallets/transactions/", data=data, format="json")
+
+        assert response.status_code == 201
+        assert response.json()["wallet_balance"] == "6.00"
+        assert Transaction.objects.count() == 1
+
+    def test_it_returns_validation_errors(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "11.00", "transaction_type": TransactionType.WITHDRAW}
+
+        response = api_client.post("/api/async/wallets/transactions/", data=data, format="json")
+
+        assert response.status_code == 400
+        assert response.json() == {"amount": ["There are not enough funds on the balance, enter a smaller amount"]}
+
+    def test_it_replays_idempotent_request(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        data = {"wallet_id": wallet.pk, "amount": "4.00", "transaction_type": TransactionType.WITHDRAW}
+
+        first = api_client.post("/api/async/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="a")
+        second = api_client.post("/api/async/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="a")
+
+        assert second.json() == first.json()
+        assert second["Idempotent-Replayed"] == "true"
+        assert Transaction.objects.count() == 1
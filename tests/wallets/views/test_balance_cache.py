@@ -0,0 +1,222 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import TransactionType
+from wallets.balance_cache import fill_balance, get_balance, get_metrics, invalidate_balances, local_cache
+from wallets.services import cancel_wallet_transactions, wallet_transactions
+
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+
+def get_balance_queries(api_client, wallet, prefix: str = "") -> tuple[str, int]:
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.get(f"/api/{prefix}wallets/{wallet.pk}/balance/")
+    assert response.status_code == 200
+    return response.json()["balance"], len(queries)
+
+
+@pytest.mark.django_db
+class TestBalanceCache:
+    def test_it_serves_balance_from_cache(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+
+        first = get_balance_queries(api_client, wallet)
+        second = get_balance_queries(api_client, wallet)
+        third = get_balance_queries(api_client, wallet)
+
+        assert first == ("10.00", 1)
+        assert second == ("10.00", 0)
+        assert third == ("10.00", 0)
+        assert get_metrics()["misses"] == 1
+        assert get_metrics()["shared_hits"] == 1
+        assert get_metrics()["local_hits"] == 1
+
+    def test_it_serves_async_balance_from_cache(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        get_balance_queries(api_client, wallet)
+
+        assert get_balance_queries(api_client, wallet, prefix="async/") == ("10.00", 0)
+
+    def test_it_writes_through_balances_of_transfer(self, api_client, wallet_owner, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        receiver = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        get_balance_queries(api_client, wallet)
+        get_balance_queries(api_client, receiver)
+        data = {
+            "wallet_id": wallet.pk,
+            "receiver_id": receiver.pk,
+            "amount": "4.00",
+            "transaction_type": TransactionType.TRANSFER,
+        }
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/api/wallets/transactions/", data=data, format="json")
+
+        assert get_balance_queries(api_client, wallet) == ("6.00", 0)
+        assert get_balance_queries(api_client, receiver) == ("4.00", 0)
+        assert get_metrics()["writes"] == 2
+
+    def test_it_writes_through_ledger_balances_of_cancellation(
+        self, api_client, wallet_owner, settings, django_capture_on_commit_callbacks
+    ):
+        settings.WALLETS_LEDGER_ENABLED = True
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        assert get_balance_queries(api_client, wallet) == ("15.00", 0)
+        with django_capture_on_commit_callbacks(execute=True):
+            cancel_wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+
+        assert get_balance_queries(api_client, wallet) == ("10.00", 0)
+
+    def test_it_writes_through_balances_of_batch(self, api_client, wallet_owner, django_capture_on_commit_callbacks):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        get_balance_queries(api_client, wallet)
+        data = [{"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT}] * 2
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.post("/api/wallets/transactions/batch/", data=data, format="json")
+
+        assert get_balance_queries(api_client, wallet) == ("12.00", 0)
+
+    def test_it_invalidates_balance_changed_by_admin(
+        self, api_client, wallet_owner, admin_user, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        get_balance_queries(api_client, wallet)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.patch(f"/api/wallets/{wallet.pk}/", data={"balance": "25.00"}, format="json")
+
+        assert get_balance_queries(api_client, wallet) == ("25.00", 1)
+        assert get_metrics()["invalidations"] == 1
+
+    def test_it_invalidates_balance_of_deleted_wallet(
+        self, api_client, wallet_owner, django_capture_on_commit_callbacks
+    ):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        get_balance_queries(api_client, wallet)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            api_client.delete(f"/api/wallets/{wallet.pk}/")
+
+        assert api_client.get(f"/api/wallets/{wallet.pk}/balance/").status_code == 404
+
+    def test_it_ignores_balance_read_before_change(self, wallet_owner, django_capture_on_commit_callbacks):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        _, version = get_balance(wallet.pk)
+
+        # A transfer commits between the read of the balance and its caching.
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        fill_balance(wallet, version)
+        local_cache.clear()
+
+        cached, current_version = get_balance(wallet.pk)
+        assert (cached.version, cached.balance) == (version + 1, Decimal("15.00"))
+        assert current_version == version + 1
+
+    def test_it_ignores_local_copy_of_balance_changed_by_another_process(
+        self, wallet_owner, django_capture_on_commit_callbacks
+    ):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        stale, _ = get_balance(wallet.pk)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        # This process still holds the copy read before the other process wrote the deposit through.
+        local_cache.set(f"wallet-balance:{wallet.pk}", stale, ttl=60)
+
+        cached, version = get_balance(wallet.pk)
+        assert (cached.version, cached.balance) == (stale.version + 1, Decimal("20.00"))
+        assert version == stale.version + 1
+
+    def test_it_keeps_balance_written_through_during_fill(self, wallet_owner, django_capture_on_commit_callbacks):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        with django_capture_on_commit_callbacks(execute=True):
+            wallet_transactions(wallet.pk, None, Decimal("5.00"), TransactionType.DEPOSIT)
+        _, version = get_balance(wallet.pk)
+
+        # A reader missed the entry once its version was incremented, before it was written
+        # through, and read the balance before the deposit from a lagging replica.
+        fill_balance(wallet, version)
+        local_cache.clear()
+
+        cached, _ = get_balance(wallet.pk)
+        assert cached.balance == Decimal("15.00")
+
+    def test_it_drops_outdated_entry(self, wallet_owner, django_capture_on_commit_callbacks):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        _, version = get_balance(wallet.pk)
+        # The balance is invalidated between the miss and its fill.
+        with django_capture_on_commit_callbacks(execute=True):
+            invalidate_balances([wallet.pk])
+        fill_balance(wallet, version)
+
+        cached, current_version = get_balance(wallet.pk)
+        fill_balance(wallet, current_version)
+
+        assert cached is None
+        assert get_balance(wallet.pk)[0].version == current_version
+
+    def test_it_returns_error_if_user_gets_cached_balance_of_not_his_wallet(self, api_client, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        api_client.force_authenticate(wallet_owner)
+        get_balance_queries(api_client, wallet)
+        api_client.force_authenticate(UserFactory())
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/balance/")
+        async_response = api_client.get(f"/api/async/wallets/{wallet.pk}/balance/")
+
+        assert response.status_code == 404
+        assert async_response.status_code == 404
+
+    def test_it_reads_database_if_cache_is_disabled(self, api_client, wallet_owner, settings):
+        settings.BALANCE_CACHE_ENABLED = False
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        get_balance_queries(api_client, wallet)
+
+        assert get_balance_queries(api_client, wallet) == ("10.00", 1)
+        assert get_balance_queries(api_client, wallet, prefix="async/") == ("10.00", 1)
+
+
+@pytest.mark.django_db
+class TestBalanceCacheMetrics:
+    def test_it_returns_metrics(self, api_client, wallet_owner, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        get_balance_queries(api_client, wallet)
+        get_balance_queries(api_client, wallet)
+
+        response = api_client.get("/api/wallets/balance-cache/metrics/")
+
+        assert response.status_code == 200
+        assert response.data == {
+            "local_hits": 0,
+            "shared_hits": 1,
+            "misses": 1,
+            "writes": 0,
+            "invalidations": 0,
+            "hit_ratio": 0.5,
+        }
+
+    def test_it_returns_error_if_user_is_not_admin(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.get("/api/wallets/balance-cache/metrics/")
+
+        assert response.status_code == 403
@@ -0,0 +1,112 @@
+import re
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+
+def next_link(response) -> str | None:
+    match = re.match(r'<(?P<url>[^>]+)>; rel="next"', response.get("Link", ""))
+    return match["url"] if match else None
+
+
+@pytest.mark.django_db
+class TestTransactionsPagination:
+    def test_it_pages_through_transactions_newest_first(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(balance=Decimal("10.00"))
+        transactions = TransactionFactory.create_batch(
+            5, wallet=wallet, receiver=None, transaction_type=TransactionType.DEPOSIT
+        )
+        # Rows sharing created_at are ordered by id.
+        Transaction.objects.filter(id__in=[transaction.id for transaction in transactions[1:4]]).update(
+            created_at=timezone.now()
+        )
+        expected = list(Transaction.objects.order_by("-created_at", "-id").values_list("id", flat=True))
+
+        ids = []
+        url = "/api/wallets/transactions/?limit=2"
+        while url:
+            response = api_client.get(url)
+            assert response.status_code == 200
+            assert len(response.data) <= 2
+            ids.extend(item["id"] for item in response.data)
+            url = next_link(response)
+
+        assert ids == expected
+
+    def test_deep_page_uses_neither_offset_nor_count(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(balance=Decimal("10.00"))
+        TransactionFactory.create_batch(3, wallet=wallet, receiver=None, transaction_type=TransactionType.DEPOSIT)
+        first_page = api_client.get("/api/wallets/transactions/?limit=1")
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(next_link(first_page))
+
+        assert len(response.data) == 1
+        assert "X-Total-Count" not in response
+        sql = " ".join(query["sql"] for query in queries.captured_queries).upper()
+        assert "OFFSET" not in sql
+        assert "COUNT(" not in sql
+
+    def test_it_returns_count_if_requested(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(balance=Decimal("10.00"))
+        TransactionFactory.create_batch(3, wallet=wallet, receiver=None, transaction_type=TransactionType.DEPOSIT)
+
+        response = api_client.get("/api/wallets/transactions/?limit=2&count=true")
+
+        assert response["X-Total-Count"] == "3"
+        assert len(response.data) == 2
+
+    def test_it_returns_last_page_without_next_link(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(balance=Decimal("10.00"))
+        TransactionFactory.create_batch(2, wallet=wallet, receiver=None, transaction_type=TransactionType.DEPOSIT)
+
+        response = api_client.get("/api/wallets/transactions/?limit=2")
+
+        assert len(response.data) == 2
+        assert "Link" not in response
+
+    def test_it_returns_error_if_cursor_is_invalid(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+
+        response = api_client.get("/api/wallets/transactions/?cursor=broken")
+
+        assert response.status_code == 404
+        assert response.data["detail"] == "Invalid cursor"
+
+
+@pytest.mark.django_db
+class TestWalletsPagination:
+    @pytest.mark.parametrize("prefix", ["/api/wallets/", "/api/async/wallets/"])
+    def test_it_pages_through_wallets_oldest_first(self, api_client, wallet_owner, settings, prefix):
+        settings.API_PAGE_SIZE = 2
+        api_client.force_authenticate(wallet_owner)
+        wallets = WalletFactory.create_batch(5, owner=wallet_owner)
+
+        ids = []
+        url = prefix
+        while url:
+            response = api_client.get(url)
+            ids.extend(item["id"] for item in response.json())
+            url = next_link(response)
+
+        assert ids == [wallet.id for wallet in wallets]
+
+    def test_it_limits_page_size(self, api_client, wallet_owner, settings):
+        settings.API_MAX_PAGE_SIZE = 3
+        api_client.force_authenticate(wallet_owner)
+        WalletFactory.create_batch(5, owner=wallet_owner)
+
+        response = api_client.get("/api/wallets/?limit=100")
+
+        assert len(response.data) == 3
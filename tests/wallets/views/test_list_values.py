@@ -0,0 +1,71 @@
+from decimal import Decimal
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import TransactionType
+from wallets.services import wallet_transactions
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+URLS = ["/api/wallets/", "/api/async/wallets/", "/api/wallets/transactions/"]
+
+
+def get_both_ways(api_client, settings, url: str) -> tuple[bytes, bytes]:
+    """Bodies of the list served from values rows and by the serializers."""
+    settings.API_VALUES_LISTS_ENABLED = True
+    values_response = api_client.get(url)
+    settings.API_VALUES_LISTS_ENABLED = False
+    serializer_response = api_client.get(url)
+    assert values_response.status_code == serializer_response.status_code == 200
+    assert values_response.get("Link") == serializer_response.get("Link")
+    return values_response.content, serializer_response.content
+
+
+@pytest.mark.django_db
+class TestValuesLists:
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    @pytest.mark.parametrize("url", URLS)
+    def test_it_returns_same_body_as_serializers(self, api_client, wallet_owner, settings, ledger_enabled, url):
+        api_client.force_authenticate(wallet_owner)
+        wallet, hot_wallet = WalletFactory.create_batch(2, owner=wallet_owner, balance=Decimal("100.00"))
+        call_command("shard_wallet_balance", hot_wallet.pk, shards=4)
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        wallet_transactions(wallet.pk, None, Decimal("0.55"), TransactionType.WITHDRAW)
+        TransactionFactory(wallet=wallet, receiver=None, transaction_type=TransactionType.WITHDRAW)
+        TransactionFactory(wallet=wallet, receiver=hot_wallet, transaction_type=TransactionType.TRANSFER)
+        TransactionFactory(
+            wallet=hot_wallet,
+            receiver=None,
+            amount=Decimal("12345678901234567.89"),
+            transaction_type=TransactionType.DEPOSIT,
+        )
+
+        values_body, serializer_body = get_both_ways(api_client, settings, f"{url}?limit=2")
+
+        assert values_body == serializer_body
+        assert values_body != b"[]"
+
+    @pytest.mark.parametrize("url", URLS)
+    def test_it_pages_as_serializers(self, api_client, admin_user, settings, url):
+        api_client.force_authenticate(admin_user)
+        TransactionFactory.create_batch(3, transaction_type=TransactionType.TRANSFER)
+        settings.API_VALUES_LISTS_ENABLED = True
+        next_url = api_client.get(f"{url}?limit=2")["Link"][1:].split(">")[0]
+
+        values_body, serializer_body = get_both_ways(api_client, settings, next_url)
+
+        assert values_body == serializer_body
+
+    def test_it_reads_transactions_with_their_wallets_in_one_query(self, api_client, admin_user, settings):
+        settings.API_VALUES_LISTS_ENABLED = True
+        api_client.force_authenticate(admin_user)
+        TransactionFactory.create_batch(5, transaction_type=TransactionType.TRANSFER)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get("/api/wallets/transactions/")
+
+        assert len(response.data) == 5
+        # The balances come with the transactions, without a query per wallet.
+        assert not [query for query in queries if query["sql"].startswith('SELECT "wallets_wallet"')]
@@ -0,0 +1,149 @@
+import base64
+import json
+import random
+from datetime import datetime, time
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from django.utils import timezone
+from django_extended.constants import TransactionType, UserRole
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from users.models import User
+from wallets.models import Transaction, Wallet
+from wallets.partitions import add_months, create_partitions, get_partition_name
+from wallets.views import TransactionListCreateAPIView, TransactionRetrieveUpdateAPIView
+
+USERS = 200
+WALLETS_PER_USER = 3
+TRANSACTIONS = 50_000
+TRANSACTION_TYPES = [TransactionType.DEPOSIT] * 10 + [TransactionType.WITHDRAW] * 5 + [TransactionType.TRANSFER] * 5
+TRANSACTION_TYPES.append(TransactionType.CANCELLATION)
+
+
+@pytest.fixture(scope="module")
+def dataset(django_db_setup, django_db_blocker):
+    """A year of transactions of a few hundred wallets in monthly partitions, with fresh planner statistics."""
+    rng = random.Random(8)
+    now = timezone.now()
+    with django_db_blocker.unblock():
+        # Bulk created without the signals of the users, which would drop them from the cache outside the tests.
+        admin, *users = User.objects.bulk_create(
+            [
+                User(email="plans-admin@example.com", role=UserRole.ADMIN),
+                *(User(email=f"plans-{index}@example.com") for index in range(USERS)),
+            ]
+        )
+        wallets = Wallet.objects.bulk_create(
+            Wallet(owner=user, name=f"wallet {index}", balance=Decimal("100.00"))
+            for user in users
+            for index in range(WALLETS_PER_USER)
+        )
+        transactions = []
+        for _ in range(TRANSACTIONS):
+            transaction_type = rng.choice(TRANSACTION_TYPES)
+            transactions.append(
+                Transaction(
+                    wallet=rng.choice(wallets),
+                    receiver=rng.choice(wallets) if transaction_type == TransactionType.TRANSFER else None,
+                    amount=Decimal(rng.randint(10, 10_000)) / 100,
+                    transaction_type=transaction_type,
+                )
+            )
+        Transaction.objects.bulk_create(transactions, batch_size=5000)
+        # created_at is set on insert, so the transactions are spread over the last twelve months afterwards.
+        since = add_months(now.date().replace(day=1), -11)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE wallets_transaction SET created_at = %s::date + (id * 7919 %% %s) * interval '1 second'",
+                [since, int((now - datetime.combine(since, time(), tzinfo=now.tzinfo)).total_seconds())],
+            )
+        partitions = create_partitions(since, now.date())
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE users, wallets_wallet, wallets_transaction")
+        middle = Transaction.objects.order_by("-created_at", "-id")[TRANSACTIONS // 2]
+        yield {"admin": admin, "owner": users[0], "middle": middle}
+        with connection.cursor() as cursor:
+            cursor.execute("TRUNCATE users, wallets_wallet, wallets_transaction CASCADE")
+            for name in partitions:
+                cursor.execute(f"DROP TABLE {name}")
+
+
+def get_view_queryset(view_class, user: User, params: dict | None = None, **kwargs) -> QuerySet:
+    """The queryset a view reads for a GET request, including the page limits or the object lookup."""
+    request = Request(APIRequestFactory().get("/", params or {}))
+    request.user = user
+    view = view_class(request=request, args=(), kwargs=kwargs, format_kwarg=None)
+    queryset = view.filter_queryset(view.get_queryset())
+    if view.lookup_field in kwargs:
+        return queryset.filter(**{view.lookup_field: kwargs[view.lookup_field]})
+    return view.pagination_class().get_page_queryset(queryset, request, view)
+
+
+def get_cursor(transaction: Transaction) -> str:
+    return base64.urlsafe_b64encode(f"{transaction.created_at.isoformat()}|{transaction.id}".encode()).decode()
+
+
+def get_seq_scans(plan: dict) -> list[str]:
+    scans = [plan["Relation Name"]] if plan["Node Type"] == "Seq Scan" else []
+    for subplan in plan.get("Plans", []):
+        scans.extend(get_seq_scans(subplan))
+    return scans
+
+
+def get_scanned_transactions(queryset: QuerySet) -> list[str]:
+    """The partitions of the transaction table with rows that the plan of ``queryset`` reads sequentially."""
+    plan = json.loads(queryset.explain(format="json"))[0]["Plan"]
+    with connection.cursor() as cursor:
+        # Scanning the empty partitions of the next months costs nothing.
+        cursor.execute(
+            "SELECT relname FROM pg_class WHERE relname = ANY(%s) AND relname LIKE 'wallets_transaction%%' "
+            "AND reltuples > 0",
+            [get_seq_scans(plan)],
+        )
+        return [name for (name,) in cursor.fetchall()]
+
+
+CASES = {
+    "admin list": lambda data: get_view_queryset(TransactionListCreateAPIView, data["admin"]),
+    "admin list, deep page": lambda data: get_view_queryset(
+        TransactionListCreateAPIView, data["admin"], {"cursor": get_cursor(data["middle"])}
+    ),
+    "admin list by type": lambda data: get_view_queryset(
+        TransactionListCreateAPIView, data["admin"], {"transaction_type": TransactionType.CANCELLATION}
+    ),
+    "owner list": lambda data: get_view_queryset(TransactionListCreateAPIView, data["owner"]),
+    "owner list, deep page": lambda data: get_view_queryset(
+        TransactionListCreateAPIView, data["owner"], {"cursor": get_cursor(data["middle"])}
+    ),
+    "owner list by type": lambda data: get_view_queryset(
+        TransactionListCreateAPIView, data["owner"], {"transaction_type": TransactionType.TRANSFER}
+    ),
+    "admin retrieve": lambda data: get_view_queryset(
+        TransactionRetrieveUpdateAPIView, data["admin"], pk=data["middle"].pk
+    ),
+    "owner retrieve": lambda data: get_view_queryset(
+        TransactionRetrieveUpdateAPIView, data["owner"], pk=data["middle"].pk
+    ),
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("case", CASES)
+def test_view_queryset_does_not_scan_transactions_table(dataset, case):
+    queryset = CASES[case](dataset)
+
+    assert get_scanned_transactions(queryset) == [], queryset.explain()
+
+
+@pytest.mark.django_db
+def test_deep_page_reads_only_partitions_up_to_cursor(dataset):
+    queryset = CASES["admin list, deep page"](dataset)
+    cursor_partition = get_partition_name(dataset["middle"].created_at.date())
+
+    plan = queryset.explain()
+
+    assert cursor_partition in plan
+    assert get_partition_name(timezone.now().date()) not in plan
@@ -0,0 +1,147 @@
+from decimal import Decimal
+
+import pytest
+from django_extended.constants import TransactionType
+from wallets.ledger import get_ledger_balance
+from wallets import views
+from wallets.models import LedgerEntry, Transaction, Wallet
+
+from tests.users.factories import UserFactory
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.mark.django_db
+class TestPost:
+    def test_it_applies_all_transactions(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        user = UserFactory()
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        wallet2 = WalletFactory(owner=user, balance=Decimal("0.00"))
+        data = [
+            {"wallet_id": wallet1.pk, "amount": "100.00", "transaction_type": TransactionType.DEPOSIT},
+            {
+                "wallet_id": wallet1.pk,
+                "receiver_id": wallet2.pk,
+                "amount": "30.00",
+                "transaction_type": TransactionType.TRANSFER,
+            },
+            {"wallet_id": wallet1.pk, "amount": "20.00", "transaction_type": TransactionType.WITHDRAW},
+        ]
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=data, format="json")
+
+        assert response.status_code == 201
+        assert response.data["created"] == 3
+        assert response.data["failed"] == 0
+        assert [result["index"] for result in response.data["results"]] == [0, 1, 2]
+        wallet1.refresh_from_db()
+        wallet2.refresh_from_db()
+        assert wallet1.balance == Decimal("50.00")
+        assert wallet2.balance == Decimal("30.00")
+        assert Transaction.objects.count() == 3
+
+    def test_it_reports_errors_per_item(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        user = UserFactory()
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet2 = WalletFactory(owner=user, balance=Decimal("100.00"))
+        data = [
+            {"wallet_id": wallet1.pk, "amount": "5.00", "transaction_type": TransactionType.WITHDRAW},
+            {"wallet_id": wallet1.pk, "amount": "6.00", "transaction_type": TransactionType.WITHDRAW},
+            {"wallet_id": wallet2.pk, "amount": "1.00", "transaction_type": TransactionType.WITHDRAW},
+            {"wallet_id": 0, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT},
+            {"wallet_id": wallet1.pk, "amount": "0.0", "transaction_type": TransactionType.DEPOSIT},
+        ]
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=data, format="json")
+
+        assert response.status_code == 207
+        assert response.data["created"] == 1
+        results = response.data["results"]
+        assert "id" in results[0]
+        assert results[1]["errors"] == {"amount": ["There are not enough funds on the balance, enter a smaller amount"]}
+        assert results[2]["errors"] == {"wallet_id": ["The user must be the owner of the wallet."]}
+        assert results[3]["errors"] == {"wallet_id": ["The wallet does not exist."]}
+        assert results[4]["errors"] == {"amount": ["Insufficient transfer amount, the minimum amount is 0.1"]}
+        wallet1.refresh_from_db()
+        wallet2.refresh_from_db()
+        assert wallet1.balance == Decimal("5.00")
+        assert wallet2.balance == Decimal("100.00")
+
+    def test_it_writes_ledger_entries_if_ledger_is_enabled(self, api_client, wallet_owner, settings):
+        settings.WALLETS_LEDGER_ENABLED = True
+        api_client.force_authenticate(wallet_owner)
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = [
+            {
+                "wallet_id": wallet1.pk,
+                "receiver_id": wallet2.pk,
+                "amount": "10.00",
+                "transaction_type": TransactionType.TRANSFER,
+            },
+            {"wallet_id": wallet1.pk, "amount": "1.00", "transaction_type": TransactionType.WITHDRAW},
+        ]
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=data, format="json")
+
+        assert response.status_code == 207
+        assert LedgerEntry.objects.count() == 2
+        assert get_ledger_balance(wallet1.pk) == Decimal("0.00")
+        assert get_ledger_balance(wallet2.pk) == Decimal("10.00")
+
+    @pytest.mark.parametrize("ledger_enabled", [False, True])
+    def test_it_reports_receiver_deleted_after_validation(
+        self, api_client, wallet_owner, settings, monkeypatch, ledger_enabled
+    ):
+        settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+        api_client.force_authenticate(wallet_owner)
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+        wallet2 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        validate = views.validate_transactions_batch
+
+        def validate_and_delete_receiver(user, data):
+            validated = validate(user, data)
+            Wallet.objects.filter(id=wallet2.pk).delete()
+            return validated
+
+        monkeypatch.setattr(views, "validate_transactions_batch", validate_and_delete_receiver)
+        data = [
+            {
+                "wallet_id": wallet1.pk,
+                "receiver_id": wallet2.pk,
+                "amount": "5.00",
+                "transaction_type": TransactionType.TRANSFER,
+            },
+        ]
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=data, format="json")
+
+        assert response.status_code == 207
+        assert response.data["results"][0]["errors"] == {"receiver_id": ["The wallet does not exist."]}
+        assert LedgerEntry.objects.count() == 0
+        wallet1.refresh_from_db()
+        assert wallet1.balance == Decimal("10.00")
+
+    def test_it_returns_error_if_data_is_not_list(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.post("/api/wallets/transactions/batch/", data={}, format="json")
+
+        assert response.status_code == 400
+        assert response.data["non_field_errors"] == ["Expected a non-empty list of transactions."]
+
+    def test_it_returns_error_if_batch_is_too_large(self, api_client, wallet_owner, settings):
+        settings.WALLETS_TRANSACTION_BATCH_MAX_SIZE = 1
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner)
+        item = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": TransactionType.DEPOSIT}
+
+        response = api_client.post("/api/wallets/transactions/batch/", data=[item, item], format="json")
+
+        assert response.status_code == 400
+
+    def test_it_returns_error_if_user_is_not_auth(self, api_client):
+        response = api_client.post("/api/wallets/transactions/batch/", data=[], format="json")
+
+        assert response.status_code == 401
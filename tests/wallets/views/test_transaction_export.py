@@ -0,0 +1,123 @@
+import base64
+import csv
+import io
+import json
+from decimal import Decimal
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient
+from django_extended.constants import TransactionType
+from wallets.models import Transaction
+
+from tests.wallets.factories import TransactionFactory, WalletFactory
+
+
+def read_csv(response) -> list[dict]:
+    return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+
+async def read_async_content(response) -> bytes:
+    return b"".join([chunk async for chunk in response.streaming_content])
+
+
+@pytest.mark.django_db
+class TestWalletTransactionsExport:
+    def test_it_exports_sent_and_received_transactions_as_csv(self, api_client, wallet_owner, settings):
+        settings.WALLETS_EXPORT_CHUNK_SIZE = 2
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner)
+        sent = TransactionFactory.create_batch(
+            3, wallet=wallet, receiver=None, amount=Decimal("1.50"), transaction_type=TransactionType.WITHDRAW
+        )
+        received = TransactionFactory(receiver=wallet, transaction_type=TransactionType.TRANSFER)
+        TransactionFactory(transaction_type=TransactionType.TRANSFER)
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/transactions/export/?format=csv")
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response["Content-Type"] == "text/csv; charset=utf-8"
+        assert response["Content-Disposition"] == f'attachment; filename="wallet-{wallet.pk}-transactions.csv"'
+        rows = read_csv(response)
+        assert [int(row["id"]) for row in rows] == [transaction.id for transaction in [*sent, received]]
+        assert rows[0] == {
+            "id": str(sent[0].id),
+            "created_at": sent[0].created_at.isoformat().replace("+00:00", "Z"),
+            "wallet_id": str(wallet.id),
+            "receiver_id": "",
+            "amount": "1.50",
+            "transaction_type": TransactionType.WITHDRAW,
+        }
+
+    def test_it_exports_ndjson(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner)
+        transaction = TransactionFactory(
+            wallet=wallet, amount=Decimal("12345678901234567.89"), transaction_type=TransactionType.TRANSFER
+        )
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/transactions/export/?format=ndjson")
+
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {
+                "id": transaction.id,
+                "created_at": transaction.created_at.isoformat().replace("+00:00", "Z"),
+                "wallet_id": wallet.id,
+                "receiver_id": transaction.receiver_id,
+                "amount": "12345678901234567.89",
+                "transaction_type": TransactionType.TRANSFER,
+            }
+        ]
+
+    def test_it_returns_not_found_for_wallet_of_other_user(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory()
+
+        response = api_client.get(f"/api/wallets/{wallet.pk}/transactions/export/")
+
+        assert response.status_code == 404
+
+
+@pytest.mark.django_db
+class TestTransactionsExport:
+    def test_it_exports_all_transactions_for_admin(self, api_client, admin_user):
+        api_client.force_authenticate(admin_user)
+        transactions = TransactionFactory.create_batch(3, transaction_type=TransactionType.TRANSFER)
+
+        response = api_client.get("/api/wallets/transactions/export/", HTTP_ACCEPT="text/csv")
+
+        assert response["Content-Disposition"] == 'attachment; filename="transactions.csv"'
+        assert [int(row["id"]) for row in read_csv(response)] == [transaction.id for transaction in transactions]
+
+    def test_it_streams_pages_asynchronously_over_asgi(self, api_client, admin_user, settings):
+        settings.WALLETS_EXPORT_CHUNK_SIZE = 2
+        admin_user.set_password("secret")
+        admin_user.save()
+        transactions = TransactionFactory.create_batch(5, transaction_type=TransactionType.TRANSFER)
+        # The pages continue after the rows created at the same time.
+        Transaction.objects.filter(pk__in=[transaction.pk for transaction in transactions[1:4]]).update(
+            created_at=transactions[1].created_at
+        )
+        api_client.force_authenticate(admin_user)
+        credentials = base64.b64encode(f"{admin_user.email}:secret".encode()).decode()
+
+        response = async_to_sync(AsyncClient().get)(
+            "/api/wallets/transactions/export/?format=csv", AUTHORIZATION=f"Basic {credentials}"
+        )
+
+        assert response.status_code == 200
+        assert response.is_async
+        content = async_to_sync(read_async_content)(response)
+        rows = list(csv.DictReader(io.StringIO(content.decode())))
+        assert [int(row["id"]) for row in rows] == [transaction.id for transaction in transactions]
+        assert rows == read_csv(api_client.get("/api/wallets/transactions/export/?format=csv"))
+
+    def test_it_forbids_wallet_owner(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.get("/api/wallets/transactions/export/?format=ndjson")
+
+        assert response.status_code == 403
@@ -0,0 +1,117 @@
+import threading
+from decimal import Decimal
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django_extended.constants import TransactionType
+from rest_framework.test import APIClient
+from wallets.idempotency import local_cache
+from wallets.models import IdempotencyKey, Transaction
+
+from tests.wallets.factories import WalletFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_idempotency_caches():
+    local_cache.clear()
+    cache.clear()
+
+
+@pytest.mark.django_db
+class TestPost:
+    def test_it_replays_response_of_repeated_request(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.DEPOSIT}
+
+        first = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+        second = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert first.status_code == 201
+        assert second.status_code == 201
+        assert second.data == first.data
+        assert second["Idempotent-Replayed"] == "true"
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal("10.00")
+        assert Transaction.objects.count() == 1
+
+    def test_it_replays_response_stored_in_database(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.DEPOSIT}
+        first = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+        local_cache.clear()
+        cache.clear()
+
+        second = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert second.status_code == 201
+        assert second.data == first.data
+        assert Transaction.objects.count() == 1
+
+    def test_it_returns_error_if_key_is_reused_with_different_request(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.DEPOSIT}
+        api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        data["amount"] = "20.00"
+        response = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert response.status_code == 422
+        assert Transaction.objects.count() == 1
+
+    def test_it_does_not_store_failed_request(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.WITHDRAW}
+
+        response = api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert response.status_code == 400
+        assert not IdempotencyKey.objects.exists()
+
+    def test_it_runs_request_again_if_key_expired(self, api_client, wallet_owner, settings):
+        settings.IDEMPOTENCY_KEY_TTL = 0
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.DEPOSIT}
+        api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        api_client.post("/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1")
+
+        assert Transaction.objects.count() == 2
+        assert IdempotencyKey.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentPost:
+    def test_it_moves_money_once_for_concurrent_duplicates(self, wallet_owner):
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        data = {"wallet_id": wallet.pk, "amount": "10.00", "transaction_type": TransactionType.DEPOSIT}
+        barrier = threading.Barrier(6)
+        statuses = []
+
+        def post() -> None:
+            client = APIClient()
+            client.force_authenticate(wallet_owner)
+            try:
+                barrier.wait()
+                response = client.post(
+                    "/api/wallets/transactions/", data=data, format="json", HTTP_IDEMPOTENCY_KEY="key-1"
+                )
+                statuses.append(response.status_code)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=post) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert statuses == [201] * 6
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal("10.00")
+        assert Transaction.objects.count() == 1
@@ -281,6 +281,7 @@ class TestPost:
 
 @pytest.mark.django_db
 class TestGet:
+    @pytest.mark.query_budget(2)
     def test_it_returns_transaction(self, api_client, wallet_owner):
         api_client.force_authenticate(wallet_owner)
         user = UserFactory()
@@ -313,6 +314,7 @@ class TestGet:
         assert response.status_code == 200
         assert len(response.data) == 4
 
+    @pytest.mark.query_budget(2)
     def test_it_users_transactions_if_auth_user_is_admin(self, api_client, wallet_owner, admin_user):
         api_client.force_authenticate(admin_user)
         user = UserFactory()
@@ -455,3 +457,55 @@ class TestGet:
 
         assert response.status_code == 200
         assert Decimal(response.data[0]["wallet_balance"]) == Decimal("100")
+
+    def test_it_returns_incoming_transfers_of_users_wallets(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        user = UserFactory()
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        other_wallet = WalletFactory(owner=user, balance=Decimal("100.00"))
+        incoming = TransactionFactory(
+            wallet=other_wallet,
+            receiver=wallet,
+            transaction_type=TransactionType.TRANSFER,
+            amount=Decimal("10.0"),
+        )
+        TransactionFactory(
+            wallet=other_wallet,
+            receiver=None,
+            transaction_type=TransactionType.WITHDRAW,
+            amount=Decimal("10.0"),
+        )
+
+        response = api_client.get("/api/wallets/transactions/")
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data] == [incoming.id]
+
+    def test_it_filters_transactions_by_type(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        deposit = TransactionFactory(
+            wallet=wallet,
+            receiver=None,
+            transaction_type=TransactionType.DEPOSIT,
+            amount=Decimal("10.0"),
+        )
+        TransactionFactory(
+            wallet=wallet,
+            receiver=None,
+            transaction_type=TransactionType.WITHDRAW,
+            amount=Decimal("10.0"),
+        )
+
+        response = api_client.get(f"/api/wallets/transactions/?transaction_type={TransactionType.DEPOSIT}")
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data] == [deposit.id]
+
+    def test_it_returns_error_if_transaction_type_is_unknown(self, api_client, wallet_owner):
+        api_client.force_authenticate(wallet_owner)
+
+        response = api_client.get("/api/wallets/transactions/?transaction_type=REFUND")
+
+        assert response.status_code == 400
+        assert response.data["transaction_type"] == ['"REFUND" is not a valid choice.']
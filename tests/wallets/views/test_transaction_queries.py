@@ -0,0 +1,41 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django_extended.constants import TransactionType
+
+from tests.wallets.factories import WalletFactory
+
+# Queries of one created transaction, savepoints and the daily summary upsert included.
+QUERY_BUDGETS = {
+    (False, TransactionType.DEPOSIT): 9,
+    (False, TransactionType.WITHDRAW): 9,
+    (False, TransactionType.TRANSFER): 9,
+    (True, TransactionType.DEPOSIT): 12,
+    (True, TransactionType.WITHDRAW): 18,
+    (True, TransactionType.TRANSFER): 19,
+}
+WALLET_ROWS_SELECT = 'SELECT "wallets_wallet"."id", "wallets_wallet"."created_at"'
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(("ledger_enabled", "transaction_type"), QUERY_BUDGETS)
+def test_it_creates_transaction_within_query_budget(
+    api_client, wallet_owner, settings, ledger_enabled, transaction_type
+):
+    settings.WALLETS_LEDGER_ENABLED = ledger_enabled
+    api_client.force_authenticate(wallet_owner)
+    wallet = WalletFactory(owner=wallet_owner, balance=Decimal("10.00"))
+    data = {"wallet_id": wallet.pk, "amount": "1.00", "transaction_type": transaction_type}
+    if transaction_type == TransactionType.TRANSFER:
+        data["receiver_id"] = WalletFactory(owner=wallet_owner).pk
+
+    with CaptureQueriesContext(connection) as queries:
+        response = api_client.post("/api/wallets/transactions/", data=data, format="json")
+
+    assert response.status_code == 201
+    assert len(queries) <= QUERY_BUDGETS[ledger_enabled, transaction_type]
+    # The wallets are read once by the validation; without the ledger their rows are then locked and updated.
+    wallet_reads = [query for query in queries if query["sql"].startswith(WALLET_ROWS_SELECT)]
+    assert len(wallet_reads) == (1 if ledger_enabled else 2)
@@ -149,9 +149,11 @@ class TestPatch:
 
     def test_it_allows_admin_user_to_cancel_deposit_transaction(self, api_client, admin_user, wallet_owner):
         api_client.force_authenticate(admin_user)
-        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        # The balance includes the deposit, the cancellation takes it back.
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("1100.00"))
         transaction = TransactionFactory(
             wallet=wallet,
+            receiver=None,
             transaction_type=TransactionType.DEPOSIT,
             amount=Decimal("1000.0"),
         )
@@ -169,9 +171,10 @@ class TestPatch:
 
     def test_it_allows_admin_user_to_cancel_withdraw_transaction(self, api_client, admin_user, wallet_owner):
         api_client.force_authenticate(admin_user)
-        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
         transaction = TransactionFactory(
             wallet=wallet,
+            receiver=None,
             transaction_type=TransactionType.WITHDRAW,
             amount=Decimal("100.0"),
         )
@@ -190,8 +193,8 @@ class TestPatch:
     def test_it_allows_admin_user_to_cancel_transfer_transaction(self, api_client, admin_user, wallet_owner):
         api_client.force_authenticate(admin_user)
         user = UserFactory()
-        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
-        wallet2 = WalletFactory(owner=user, balance=Decimal("100.00"))
+        wallet1 = WalletFactory(owner=wallet_owner, balance=Decimal("0.00"))
+        wallet2 = WalletFactory(owner=user, balance=Decimal("200.00"))
         transaction = TransactionFactory(
             wallet=wallet1,
             receiver=wallet2,
@@ -213,6 +216,47 @@ class TestPatch:
         transaction.refresh_from_db()
         assert transaction.transaction_type == TransactionType.CANCELLATION
 
+    def test_it_returns_error_if_cancelled_deposit_was_spent(self, api_client, admin_user, wallet_owner):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        transaction = TransactionFactory(
+            wallet=wallet,
+            receiver=None,
+            transaction_type=TransactionType.DEPOSIT,
+            amount=Decimal("1000.0"),
+        )
+        data = {
+            "transaction_type": TransactionType.CANCELLATION,
+        }
+
+        response = api_client.patch(f"/api/wallets/transactions/{transaction.pk}/", data=data, format="json")
+
+        assert response.status_code == 400
+        wallet.refresh_from_db()
+        transaction.refresh_from_db()
+        assert wallet.balance == Decimal("100")
+        assert transaction.transaction_type == TransactionType.DEPOSIT
+
+    def test_it_returns_error_if_cancellation_changes_amount(self, api_client, admin_user, wallet_owner):
+        api_client.force_authenticate(admin_user)
+        wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
+        transaction = TransactionFactory(
+            wallet=wallet,
+            receiver=None,
+            transaction_type=TransactionType.DEPOSIT,
+            amount=Decimal("10.0"),
+        )
+        data = {
+            "amount": Decimal("30.0"),
+            "transaction_type": TransactionType.CANCELLATION,
+        }
+
+        response = api_client.patch(f"/api/wallets/transactions/{transaction.pk}/", data=data, format="json")
+
+        assert response.status_code == 400
+        wallet.refresh_from_db()
+        assert wallet.balance == Decimal("100")
+
     def test_it_returns_error_if_user_want_to_cancel_transaction(self, api_client, wallet_owner):
         api_client.force_authenticate(wallet_owner)
         wallet = WalletFactory(owner=wallet_owner, balance=Decimal("100.00"))
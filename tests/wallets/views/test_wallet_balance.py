@@ -7,6 +7,7 @@ from tests.wallets.factories import WalletFactory
 
 @pytest.mark.django_db
 class TestGet:
+    @pytest.mark.query_budget(1)
     def test_it_returns_active_user_balance(
         self,
         api_client,
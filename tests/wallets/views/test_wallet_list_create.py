@@ -54,6 +54,7 @@ class TestPost:
 
 @pytest.mark.django_db
 class TestGet:
+    @pytest.mark.query_budget(1)
     def test_it_returns_wallets_list_if_user_is_admin(self, api_client, wallet_owner, admin_user):
         api_client.force_authenticate(admin_user)
         WalletFactory(owner=wallet_owner)
@@ -76,6 +77,7 @@ class TestGet:
         assert response.status_code == 200
         assert len(response.data) == 0
 
+    @pytest.mark.query_budget(1)
     def test_it_returns_wallets_list_of_owner(self, api_client, admin_user, wallet_owner):
         api_client.force_authenticate(wallet_owner)
         WalletFactory(owner=wallet_owner)